@@ -1,10 +1,28 @@
 # fastgame.py
 
 import streamlit as st
-import random
-from datetime import datetime
-import csv
+import functools
 import io
+import os
+
+from baseball_stats.baseout import BASE_LABELS
+from baseball_stats.client import SharedGame
+from baseball_stats.columnar import COLUMNAR_FORMATS, columnar_available, columnar_bytes
+from baseball_stats.game import GameState
+from baseball_stats.importer import format_error_report
+from baseball_stats.leaders import LEADERBOARDS
+from baseball_stats.optimize import optimize_lineup
+from baseball_stats.profiling import Profiler
+from baseball_stats.simulate import simulate_lineup
+from baseball_stats.snapshot import snapshot_bytes
+from baseball_stats.storage import SQLiteStorage
+from baseball_stats.store import STAT_MAX
+from baseball_stats.summary import (
+    SUMMARY_HEADERS,
+    build_summary_rows,
+    generate_export_filename,
+)
+from baseball_stats.tables import TABLE_PAGE_SIZES, page_count
 
 # ----------------------------------------
 # Default selectable players (always shown)
@@ -12,373 +30,132 @@ import io
 DEFAULT_PLAYERS = ["Jnana", "Nevan", "Theo"]
 
 # ----------------------------------------
-# Helper functions
+# Durable storage (opt-in: BASEBALL_STATS_DB=path keeps the game on disk,
+# and every session on that database scores the same game). Unset, each
+# session keeps its own game in memory.
 # ----------------------------------------
+STATS_DB_PATH = os.environ.get("BASEBALL_STATS_DB", "")
 
-def calculate_batting_average(s, d, t, hr, ab):
-    hits = s + d + t + hr
-    return hits / ab if ab > 0 else 0.0
-
-def format_batting_average(avg):
-    return f".{int(round(avg * 1000)):03d}"
-
-def calculate_ip(outs):
-    return outs / 3.0
-
-def format_ip(ip):
-    # One decimal place, e.g., 3.0, 4.2
-    return f"{ip:.1f}"
-
-def calculate_era(er, outs):
-    ip = calculate_ip(outs)
-    return (9.0 * er / ip) if ip > 0 else 0.0
-
-def calculate_whip(bb, h, outs):
-    ip = calculate_ip(outs)
-    return ((bb + h) / ip) if ip > 0 else 0.0
-
-def calculate_obp(s, d, t, hr, bb, ab):
-    hits = s + d + t + hr
-    denom = ab + bb
-    return hits / denom if denom > 0 else 0.0
-
-def calculate_slg(s, d, t, hr, ab):
-    total_bases = s + 2 * d + 3 * t + 4 * hr
-    return total_bases / ab if ab > 0 else 0.0
-
-def format_three_decimal_rate(val):
-    # Format like .375, .900, etc.
-    return f".{int(round(val * 1000)):03d}"
-
-def format_rate(val):
-    return f"{val:.2f}"
-
-def format_summary_table(stats):
-    headers = [
-        "Player",
-        # Hitting (MLB-style abbreviations)
-        "AB", "1B", "2B", "3B", "HR",
-        "SB", "RBI", "BB", "K", "AVG", "OBP", "SLG", "OPS",
-        # Pitching
-        "IP", "ER", "K (P)", "BB (P)", "H (P)", "ERA", "WHIP"
-    ]
-
-    augmented_rows = []
-    for p in stats:
-        s = p.get("Singles", 0)
-        d = p.get("Doubles", 0)
-        t = p.get("Triples", 0)
-        hr = p.get("Home Runs", 0)
-        ab = p.get("At Bats", 0)
-        bb_h = p.get("Walks", 0)
-
-        avg = calculate_batting_average(s, d, t, hr, ab)
-        obp = calculate_obp(s, d, t, hr, bb_h, ab)
-        slg = calculate_slg(s, d, t, hr, ab)
-        ops = obp + slg
-
-        avg_str = format_batting_average(avg)
-        obp_str = format_three_decimal_rate(obp)
-        slg_str = format_three_decimal_rate(slg)
-        ops_str = format_three_decimal_rate(ops)
-
-        pitch_outs = p.get("Pitch_Outs", 0)
-        er = p.get("Pitch_ER", 0)
-        k_p = p.get("Pitch_K", 0)
-        bb_p = p.get("Pitch_BB", 0)
-        h_p = p.get("Pitch_H", 0)
-
-        ip = calculate_ip(pitch_outs)
-        era = calculate_era(er, pitch_outs)
-        whip = calculate_whip(bb_p, h_p, pitch_outs)
-
-        row = {
-            "Player": p.get("Player", ""),
-            "AB": ab,
-            "1B": s,
-            "2B": d,
-            "3B": t,
-            "HR": hr,
-            "SB": p.get("Stolen Bases", 0),
-            "RBI": p.get("RBIs", 0),
-            "BB": bb_h,
-            "K": p.get("Strikeouts", 0),
-            "AVG": avg_str,
-            "OBP": obp_str,
-            "SLG": slg_str,
-            "OPS": ops_str,
-            "IP": format_ip(ip),
-            "ER": er,
-            "K (P)": k_p,
-            "BB (P)": bb_p,
-            "H (P)": h_p,
-            "ERA": format_rate(era),
-            "WHIP": format_rate(whip),
-        }
-        augmented_rows.append(row)
-
-    header_row = dict(zip(headers, headers))
-    col_widths = [
-        max(len(str(row.get(h, h))) for row in augmented_rows + [header_row])
-        for h in headers
-    ]
-
-    def row_fmt(row_dict):
-        return " | ".join(
-            f"{str(row_dict.get(h, '')).ljust(w)}"
-            for h, w in zip(headers, col_widths)
-        )
+# ----------------------------------------
+# Shared scoring server (BASEBALL_STATS_SERVER=host:port, started with
+# `python -m baseball_stats serve`): every session scores the same game
+# ----------------------------------------
+SCORING_SERVER = os.environ.get("BASEBALL_STATS_SERVER", "")
+SHARED_REFRESH_SECONDS = 1.0
 
-    table = [row_fmt(header_row)]
-    table.append("-+-".join("-" * w for w in col_widths))
-    for row in augmented_rows:
-        table.append(row_fmt(row))
-
-    return "\n".join(table)
-
-def merge_or_add_player(stats, new_entry):
-    new_name = new_entry["Player"].strip().lower()
-    for player in stats:
-        if player["Player"].strip().lower() == new_name:
-            for key in [
-                # Hitting
-                "At Bats", "Singles", "Doubles", "Triples",
-                "Home Runs", "Stolen Bases", "RBIs", "Walks", "Strikeouts",
-                # Pitching
-                "Pitch_Outs", "Pitch_ER", "Pitch_K", "Pitch_BB", "Pitch_H"
-            ]:
-                player[key] += new_entry.get(key, 0)
-            return "merged"
-    stats.append(new_entry)
-    return "added"
-
-def generate_export_filename(stats):
-    names = [p["Player"].replace(" ", "_") for p in stats]
-    name_part = "_".join(names) if names else "no_players"
-    rand = random.randint(1, 1_000_000)
-    date = datetime.now().strftime("%m-%d-%y")
-    return f"{name_part}_stats_{rand}_{date}.txt"
-
-def build_export_text(stats):
-    lines = []
-    lines.append("Baseball Stats Log\n")
-
-    for p in stats:
-        lines.append(f"Player: {p['Player']}")
-        # Hitting (MLB labels)
-        ab = p.get("At Bats", 0)
-        s = p.get("Singles", 0)
-        d = p.get("Doubles", 0)
-        t = p.get("Triples", 0)
-        hr = p.get("Home Runs", 0)
-        sb = p.get("Stolen Bases", 0)
-        rbi = p.get("RBIs", 0)
-        bb_h = p.get("Walks", 0)
-        k_h = p.get("Strikeouts", 0)
-
-        avg = calculate_batting_average(s, d, t, hr, ab)
-        obp = calculate_obp(s, d, t, hr, bb_h, ab)
-        slg = calculate_slg(s, d, t, hr, ab)
-        ops = obp + slg
-
-        lines.append(f"AB: {ab}")
-        lines.append(f"1B: {s}")
-        lines.append(f"2B: {d}")
-        lines.append(f"3B: {t}")
-        lines.append(f"HR: {hr}")
-        lines.append(f"SB: {sb}")
-        lines.append(f"RBI: {rbi}")
-        lines.append(f"BB: {bb_h}")
-        lines.append(f"K: {k_h}")
-        lines.append(f"AVG: {format_batting_average(avg)}")
-        lines.append(f"OBP: {format_three_decimal_rate(obp)}")
-        lines.append(f"SLG: {format_three_decimal_rate(slg)}")
-        lines.append(f"OPS: {format_three_decimal_rate(ops)}")
-
-        # Pitching
-        pitch_outs = p.get("Pitch_Outs", 0)
-        er = p.get("Pitch_ER", 0)
-        k_p = p.get("Pitch_K", 0)
-        bb_p = p.get("Pitch_BB", 0)
-        h_p = p.get("Pitch_H", 0)
-
-        ip = calculate_ip(pitch_outs)
-        era = calculate_era(er, pitch_outs)
-        whip = calculate_whip(bb_p, h_p, pitch_outs)
-
-        lines.append(f"IP: {format_ip(ip)}")
-        lines.append(f"ER (P): {er}")
-        lines.append(f"K (P): {k_p}")
-        lines.append(f"BB (P): {bb_p}")
-        lines.append(f"H (P): {h_p}")
-        lines.append(f"ERA: {format_rate(era)}")
-        lines.append(f"WHIP: {format_rate(whip)}\n")
-
-    lines.append("Summary Table:\n")
-    lines.append(format_summary_table(stats))
-
-    return "\n".join(lines)
+# ----------------------------------------
+# Profiling (opt-in: BASEBALL_STATS_PROFILE=1 shows a debug panel;
+# BASEBALL_STATS_PROFILE_LOG=path also appends one JSON line per rerun)
+# ----------------------------------------
+PROFILE_ENABLED = os.environ.get("BASEBALL_STATS_PROFILE", "") not in ("", "0")
+PROFILE_LOG_PATH = os.environ.get("BASEBALL_STATS_PROFILE_LOG") or None
 
 # ----------------------------------------
-# Fast Tap helpers
+# Helper functions
 # ----------------------------------------
 
-def get_player_by_name(name):
-    for p in st.session_state.stats:
-        if p["Player"].strip().lower() == name.strip().lower():
-            return p
-    return None
-
-def ensure_player_fields(player):
-    for key in [
-        # Hitting
-        "At Bats", "Singles", "Doubles", "Triples", "Home Runs",
-        "Stolen Bases", "RBIs", "Walks", "Strikeouts",
-        # Pitching
-        "Pitch_Outs", "Pitch_ER", "Pitch_K", "Pitch_BB", "Pitch_H"
-    ]:
-        player.setdefault(key, 0)
-
-def record_fast_tap_play(player_name, play_type, mode="hitting"):
-    player = get_player_by_name(player_name)
-
-    if player is None:
-        player = {
-            "Player": player_name,
-            # Hitting
-            "At Bats": 0,
-            "Singles": 0,
-            "Doubles": 0,
-            "Triples": 0,
-            "Home Runs": 0,
-            "Stolen Bases": 0,
-            "RBIs": 0,
-            "Walks": 0,
-            "Strikeouts": 0,
-            # Pitching
-            "Pitch_Outs": 0,
-            "Pitch_ER": 0,
-            "Pitch_K": 0,
-            "Pitch_BB": 0,
-            "Pitch_H": 0,
-        }
-        st.session_state.stats.append(player)
-
-    ensure_player_fields(player)
-
-    ab_delta = 0
-    pitch_outs_delta = 0
-    stat_deltas = {}
-
-    if mode == "hitting":
-        if play_type == "Single":
-            ab_delta = 1
-            stat_deltas["Singles"] = 1
-        elif play_type == "Double":
-            ab_delta = 1
-            stat_deltas["Doubles"] = 1
-        elif play_type == "Triple":
-            ab_delta = 1
-            stat_deltas["Triples"] = 1
-        elif play_type == "Home Run":
-            ab_delta = 1
-            stat_deltas["Home Runs"] = 1
-        elif play_type == "Walk":
-            stat_deltas["Walks"] = 1
-        elif play_type == "Strikeout":
-            ab_delta = 1
-            stat_deltas["Strikeouts"] = 1
-        elif play_type == "RBI":
-            stat_deltas["RBIs"] = 1
-        elif play_type == "Stolen Base":
-            stat_deltas["Stolen Bases"] = 1
-        elif play_type == "Out":
-            ab_delta = 1
-
-        player["At Bats"] += ab_delta
-
-    elif mode == "pitching":
-        if play_type == "Pitch Strikeout":
-            pitch_outs_delta = 1
-            stat_deltas["Pitch_K"] = 1
-        elif play_type == "Pitch Walk":
-            stat_deltas["Pitch_BB"] = 1
-        elif play_type == "Pitch Hit Allowed":
-            stat_deltas["Pitch_H"] = 1
-        elif play_type == "Pitch Earned Run":
-            stat_deltas["Pitch_ER"] = 1
-        elif play_type == "Pitch Out":
-            pitch_outs_delta = 1
-        elif play_type == "Pitch Inning Complete":
-            pitch_outs_delta = 3
-
-        player["Pitch_Outs"] += pitch_outs_delta
-
-    for k, v in stat_deltas.items():
-        player[k] += v
-
-    st.session_state.last_play = {
-        "player_name": player_name,
-        "mode": mode,
-        "ab_delta": ab_delta,
-        "pitch_outs_delta": pitch_outs_delta,
-        "stat_deltas": stat_deltas,
-        "batter_index_before": st.session_state.current_batter_index,
-    }
-
-    # Auto-advance still tied to hitting / lineup
-    if mode == "hitting" and st.session_state.auto_advance and st.session_state.lineup:
-        st.session_state.current_batter_index = (
-            st.session_state.current_batter_index + 1
-        ) % len(st.session_state.lineup)
-
-def undo_last_play():
-    lp = st.session_state.last_play
-    if not lp:
-        st.warning("No play to undo.")
-        return
-
-    player = get_player_by_name(lp["player_name"])
-    if player is None:
-        st.session_state.last_play = None
-        return
-
-    player["At Bats"] -= lp.get("ab_delta", 0)
-    player["Pitch_Outs"] -= lp.get("pitch_outs_delta", 0)
-    for k, v in lp["stat_deltas"].items():
-        player[k] -= v
-
-    # Restore batter index only for hitting plays
-    if lp.get("mode") == "hitting":
-        st.session_state.current_batter_index = lp["batter_index_before"]
-
-    st.session_state.last_play = None
-    st.success(f"Undid last play for {lp['player_name']}.")
+@st.cache_resource
+def open_game(path):
+    # One game per database file for the server: every session scores into
+    # the same play log and journal (GameState serializes them with its
+    # lock). Separate logs would overwrite each other's journal rows.
+    return GameState.restore(SQLiteStorage(path))
+
+@st.cache_resource
+def get_profiler(enabled, log_path):
+    # Shared by every session, so percentiles cover all reruns.
+    return Profiler(enabled=enabled, log_path=log_path)
+
+def load_game():
+    # The shared game when a scoring server is configured, else the
+    # database's game (restored from disk on first use), else a fresh game
+    # of this session's own.
+    if SCORING_SERVER:
+        host, _, port = SCORING_SERVER.rpartition(":")
+        return SharedGame.connect(host or "127.0.0.1", int(port))
+    if not STATS_DB_PATH:
+        return GameState()
+    return open_game(STATS_DB_PATH)
+
+def render_stats_table(key):
+    # Paged Current Stats table: sorting and filtering run server-side and
+    # only the visible page is formatted and sent to the browser.
+    col_filter, col_sort, col_order, col_size = st.columns([3, 2, 1, 1])
+    with col_filter:
+        query = st.text_input("Filter players:", key=f"{key}_filter")
+    with col_sort:
+        sort_by = st.selectbox(
+            "Sort by:", ["Roster order"] + SUMMARY_HEADERS, key=f"{key}_sort"
+        )
+    with col_order:
+        descending = st.checkbox("Descending", key=f"{key}_desc")
+    with col_size:
+        page_size = st.selectbox(
+            "Rows:", TABLE_PAGE_SIZES, index=1, key=f"{key}_page_size"
+        )
+
+    # Page from the last rerun, clamped once the new total is known
+    page = st.session_state.get(f"{key}_page", 1) - 1
+    rows, total = game.summary_page(
+        page=page,
+        page_size=page_size,
+        sort_by=None if sort_by == "Roster order" else sort_by,
+        descending=descending,
+        query=query,
+    )
+    pages = page_count(total, page_size)
+    page = min(page, pages - 1)
+
+    if rows:
+        st.dataframe(rows, hide_index=True)
+    else:
+        st.info("No players match.")
+
+    col_page, col_info = st.columns([1, 3])
+    with col_page:
+        st.number_input(
+            "Page:", min_value=1, max_value=pages, value=page + 1, key=f"{key}_page"
+        )
+    with col_info:
+        first = page * page_size + 1 if total else 0
+        st.caption(
+            f"Showing {first}–{min((page + 1) * page_size, total)} of {total} players"
+        )
+
+def import_box_scores(game, files):
+    # Returns [(file name, ImportReport or the error that stopped the file)].
+    results = []
+    for f in files:
+        text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+        try:
+            results.append((f.name, game.import_csv(text)))
+        except ValueError as e:
+            results.append((f.name, e))
+    return results
 
 # ----------------------------------------
 # Streamlit App
 # ----------------------------------------
 
+profiler = get_profiler(PROFILE_ENABLED, PROFILE_LOG_PATH)
+profiler.start_run()
+
 st.title("⚾ Unified Baseball Stats & Game Mode")
 
-if "stats" not in st.session_state:
-    st.session_state.stats = []
+# Stats, play log, lineup and current batter, restored from disk if saved
+# (and then shared with the other sessions on the same database)
+if "game" not in st.session_state:
+    st.session_state.game = load_game()
 
-if "lineup" not in st.session_state:
-    st.session_state.lineup = []
+game = st.session_state.game
+# Changes other scorekeepers made since this session's last rerun
+game.sync()
+
+record_play = profiler.wrap("record_fast_tap_play", game.record_fast_tap_play)
 
 if "lineup_select" not in st.session_state:
     st.session_state.lineup_select = []
 
-if "current_batter_index" not in st.session_state:
-    st.session_state.current_batter_index = 0
-
-if "last_play" not in st.session_state:
-    st.session_state.last_play = None
-
-if "auto_advance" not in st.session_state:
-    st.session_state.auto_advance = True
-
 if "fast_mode" not in st.session_state:
     st.session_state.fast_mode = "Hitting"
 
@@ -388,47 +165,101 @@ if "add_merge_selector" not in st.session_state:
 if "add_new_name_input" not in st.session_state:
     st.session_state.add_new_name_input = ""
 
-# Tabs
-tab_lineup, tab_add_merge, tab_game, tab_export, tab_faq = st.tabs([
-    "📝 Set Lineup",
-    "➕ Add / Merge Players",
-    "⚡ Game Mode (Fast Tap)",
-    "📤 Export Summary File",
-    "❓ FAQ / Formulas"
-])
-
 # ----------------------------------------
 # TAB 1 — Set Lineup
 # ----------------------------------------
-with tab_lineup:
+def use_optimized_lineup(order):
+    game.lineup = order
+    game.current_batter_index = 0
+    st.session_state.optimized_lineup = None
+
+def render_lineup_tab():
     st.header("Set Lineup")
 
-    added_players = [p["Player"] for p in st.session_state.stats]
+    added_players = game.stats.names
     all_players = sorted(set(DEFAULT_PLAYERS + added_players))
 
     col1, col2 = st.columns([1, 3])
 
     with col1:
         if st.button("💾 Save Lineup"):
-            st.session_state.lineup = st.session_state.lineup_select
-            st.session_state.current_batter_index = 0
+            game.lineup = st.session_state.lineup_select
+            game.current_batter_index = 0
             st.success("Lineup saved.")
 
     with col2:
         st.session_state.lineup_select = st.multiselect(
             "Select players for the lineup (alphabetical):",
             options=all_players,
-            default=st.session_state.lineup
+            default=game.lineup
         )
 
+    if game.lineup:
+        with st.expander("🎲 Simulate Saved Lineup"):
+            st.caption(
+                "Plays whole games of the saved lineup, in batting order, from each "
+                "hitter's recorded walks, hits, strikeouts and outs."
+            )
+            n_games = st.select_slider(
+                "Games to simulate:",
+                options=[1_000, 10_000, 100_000, 1_000_000],
+                value=10_000,
+                key="sim_games"
+            )
+            if st.button("Simulate"):
+                with st.spinner("Simulating..."), profiler.section("simulate lineup"):
+                    result = simulate_lineup(game.stats, game.lineup, n_games=n_games, jobs=0)
+                st.metric("Expected runs per game", f"{result.runs_per_game:.2f}")
+                rate = result.games * result.innings / max(result.seconds, 1e-9)
+                st.caption(
+                    f"± {result.std_error:.3f} over {result.games:,} games of "
+                    f"{result.innings} innings, in {result.seconds:.2f} s "
+                    f"({rate:,.0f} half-innings/s)."
+                )
+                st.bar_chart(
+                    {"Share of games": result.distribution / result.games},
+                    x_label="Runs",
+                )
+
+    if len(game.lineup) > 1:
+        with st.expander("🧮 Optimize Batting Order"):
+            st.caption(
+                "Searches batting orders of the saved lineup for the most expected "
+                "runs per game, using the same model as the simulator."
+            )
+            if st.button("Find Best Order"):
+                with st.spinner("Searching orders..."), profiler.section("optimize lineup"):
+                    st.session_state.optimized_lineup = (
+                        list(game.lineup), optimize_lineup(game.stats, game.lineup, jobs=0)
+                    )
+            saved = st.session_state.get("optimized_lineup")
+            # Only while it's still for the saved lineup
+            if saved and saved[0] == game.lineup:
+                result = saved[1]
+                st.metric(
+                    "Expected runs per game",
+                    f"{result.runs_per_game:.2f}",
+                    delta=f"{result.runs_per_game - result.current_runs_per_game:+.2f} vs saved order",
+                )
+                st.dataframe(
+                    [{"#": i + 1, "Player": name} for i, name in enumerate(result.lineup)],
+                    hide_index=True,
+                )
+                st.caption(
+                    f"{result.evaluated:,} orders evaluated in {result.seconds:.2f} s."
+                )
+                if result.lineup != game.lineup:
+                    st.button("Use This Order", on_click=use_optimized_lineup,
+                              args=(result.lineup,))
+
 # ----------------------------------------
 # TAB 2 — Add / Merge Players
 # ----------------------------------------
-with tab_add_merge:
+def render_add_merge_tab():
     st.header("Add or Update Player Stats")
 
-    lineup_names = st.session_state.lineup
-    existing_names = [p["Player"] for p in st.session_state.stats]
+    lineup_names = game.lineup
+    existing_names = game.stats.names
     combined_names = sorted(set(lineup_names + existing_names))
 
     name_options = [
@@ -457,29 +288,29 @@ with tab_add_merge:
         name = selected_option.strip()
 
     # Hitting inputs (labels kept descriptive for data entry)
-    ab = st.number_input("At Bats", min_value=0, step=1)
-    s = st.number_input("Singles", min_value=0, step=1)
-    d = st.number_input("Doubles", min_value=0, step=1)
-    t = st.number_input("Triples", min_value=0, step=1)
-    hr = st.number_input("Home Runs", min_value=0, step=1)
-    sb = st.number_input("Stolen Bases", min_value=0, step=1)
-    rbis = st.number_input("RBIs", min_value=0, step=1)
-    walks = st.number_input("Walks", min_value=0, step=1)
-    strikeouts = st.number_input("Strikeouts", min_value=0, step=1)
+    ab = st.number_input("At Bats", min_value=0, max_value=STAT_MAX, step=1)
+    s = st.number_input("Singles", min_value=0, max_value=STAT_MAX, step=1)
+    d = st.number_input("Doubles", min_value=0, max_value=STAT_MAX, step=1)
+    t = st.number_input("Triples", min_value=0, max_value=STAT_MAX, step=1)
+    hr = st.number_input("Home Runs", min_value=0, max_value=STAT_MAX, step=1)
+    sb = st.number_input("Stolen Bases", min_value=0, max_value=STAT_MAX, step=1)
+    rbis = st.number_input("RBIs", min_value=0, max_value=STAT_MAX, step=1)
+    walks = st.number_input("Walks", min_value=0, max_value=STAT_MAX, step=1)
+    strikeouts = st.number_input("Strikeouts", min_value=0, max_value=STAT_MAX, step=1)
 
     st.subheader("Pitching Stats (optional)")
 
-    pitch_outs = st.number_input("Pitching Outs", min_value=0, step=1)
-    pitch_er = st.number_input("Earned Runs (Pitching)", min_value=0, step=1)
-    pitch_k = st.number_input("Strikeouts (Pitching)", min_value=0, step=1)
-    pitch_bb = st.number_input("Walks (Pitching)", min_value=0, step=1)
-    pitch_h = st.number_input("Hits Allowed (Pitching)", min_value=0, step=1)
+    pitch_outs = st.number_input("Pitching Outs", min_value=0, max_value=STAT_MAX, step=1)
+    pitch_er = st.number_input("Earned Runs (Pitching)", min_value=0, max_value=STAT_MAX, step=1)
+    pitch_k = st.number_input("Strikeouts (Pitching)", min_value=0, max_value=STAT_MAX, step=1)
+    pitch_bb = st.number_input("Walks (Pitching)", min_value=0, max_value=STAT_MAX, step=1)
+    pitch_h = st.number_input("Hits Allowed (Pitching)", min_value=0, max_value=STAT_MAX, step=1)
 
     if st.button("Add / Merge Player Stats"):
         if not name:
             st.error("Please select a player or enter a new player name.")
         else:
-            is_new = get_player_by_name(name) is None
+            is_new = game.get_player_by_name(name) is None
 
             total_offense = ab + s + d + t + hr + sb + rbis + walks + strikeouts
             if is_new and total_offense == 0 and pitch_outs == 0 and pitch_er == 0 and pitch_k == 0 and pitch_bb == 0 and pitch_h == 0:
@@ -506,79 +337,147 @@ with tab_add_merge:
                     "Pitch_BB": pitch_bb,
                     "Pitch_H": pitch_h,
                 }
-                result = merge_or_add_player(st.session_state.stats, entry)
+                try:
+                    result = game.record_merge_entry(entry)
+                except ValueError as e:
+                    # e.g. totals that no longer fit a stat column
+                    st.error(str(e))
+                    result = None
 
                 # Auto-add to lineup alphabetically if not already present
-                if name not in st.session_state.lineup:
-                    st.session_state.lineup.append(name)
-                    st.session_state.lineup = sorted(st.session_state.lineup)
+                if result is not None and name not in game.lineup:
+                    game.lineup.append(name)
+                    game.lineup = sorted(game.lineup)
 
                 if result == "added":
                     st.success(f"Added stats for {name}")
-                else:
+                elif result == "merged":
                     st.success(f"Merged stats for {name}")
 
-    if st.session_state.stats:
+    with st.expander("Bulk import box scores (CSV)"):
+        st.caption(
+            "Use the CSV layout from the Export tab, or a Player column plus "
+            "raw counting stat columns (At Bats, Singles, ..., Pitch_H)."
+        )
+        uploaded_files = st.file_uploader(
+            "CSV files:",
+            type="csv",
+            accept_multiple_files=True,
+            key="bulk_import_files"
+        )
+        if uploaded_files and st.button("Import CSV Files"):
+            for file_name, report in import_box_scores(game, uploaded_files):
+                if isinstance(report, Exception):
+                    st.error(f"{file_name}: {report}")
+                    continue
+                st.success(
+                    f"{file_name}: imported {report.rows_imported} of "
+                    f"{report.rows_read} rows ({report.players_added} new players)."
+                )
+                if report.errors:
+                    st.warning(f"{file_name}: skipped {len(report.errors)} rows.")
+                    st.dataframe([e._asdict() for e in report.errors[:500]])
+                    st.download_button(
+                        label="Download Error Report",
+                        data=format_error_report(report.errors),
+                        file_name=file_name.replace(".csv", "_errors.csv"),
+                        mime="text/csv",
+                        key=f"import_errors_{file_name}"
+                    )
+
+    if game.stats:
+        with st.expander("Rename or remove a player"):
+            edit_target = st.selectbox(
+                "Player:",
+                options=game.stats.names,
+                key="roster_edit_target"
+            )
+            edit_new_name = st.text_input(
+                "New name (for rename):",
+                key="roster_edit_new_name"
+            ).strip()
+
+            col_rename, col_remove = st.columns(2)
+            with col_rename:
+                if st.button("Rename Player"):
+                    if not edit_new_name:
+                        st.error("Please enter a new name.")
+                    else:
+                        try:
+                            game.rename_player(edit_target, edit_new_name)
+                        except ValueError as e:
+                            st.error(str(e))
+                        else:
+                            st.success(f"Renamed {edit_target} to {edit_new_name}.")
+            with col_remove:
+                if st.button("Remove Player"):
+                    game.remove_player(edit_target)
+                    st.success(f"Removed {edit_target}.")
+
+    if game.stats:
         st.subheader("Current Stats")
-        display = []
-        for p in st.session_state.stats:
-            ensure_player_fields(p)
-            s_val = p["Singles"]
-            d_val = p["Doubles"]
-            t_val = p["Triples"]
-            hr_val = p["Home Runs"]
-            ab_val = p["At Bats"]
-            bb_h = p["Walks"]
-
-            avg = calculate_batting_average(s_val, d_val, t_val, hr_val, ab_val)
-            obp = calculate_obp(s_val, d_val, t_val, hr_val, bb_h, ab_val)
-            slg = calculate_slg(s_val, d_val, t_val, hr_val, ab_val)
-            ops = obp + slg
-
-            pitch_outs = p.get("Pitch_Outs", 0)
-            er = p.get("Pitch_ER", 0)
-            k_p = p.get("Pitch_K", 0)
-            bb_p = p.get("Pitch_BB", 0)
-            h_p = p.get("Pitch_H", 0)
-
-            ip = calculate_ip(pitch_outs)
-            era = calculate_era(er, pitch_outs)
-            whip = calculate_whip(bb_p, h_p, pitch_outs)
-
-            display.append({
-                "Player": p["Player"],
-                "AB": ab_val,
-                "1B": s_val,
-                "2B": d_val,
-                "3B": t_val,
-                "HR": hr_val,
-                "SB": p["Stolen Bases"],
-                "RBI": p["RBIs"],
-                "BB": bb_h,
-                "K": p["Strikeouts"],
-                "AVG": format_batting_average(avg),
-                "OBP": format_three_decimal_rate(obp),
-                "SLG": format_three_decimal_rate(slg),
-                "OPS": format_three_decimal_rate(ops),
-                "IP": format_ip(ip),
-                "ER": er,
-                "K (P)": k_p,
-                "BB (P)": bb_p,
-                "H (P)": h_p,
-                "ERA": format_rate(era),
-                "WHIP": format_rate(whip),
-            })
-        st.table(display)
+        with profiler.section("table: Current Stats"):
+            render_stats_table("current_stats")
 
 # ----------------------------------------
 # TAB 3 — Game Mode (Fast Tap)
 # ----------------------------------------
-with tab_game:
+
+# Tap buttons, one list per column
+HITTING_BUTTONS = [
+    ["Single", "Home Run", "RBI"],
+    ["Double", "Walk", "Stolen Base"],
+    ["Triple", "Strikeout", "Out"],
+]
+PITCHING_BUTTONS = [
+    ["Pitch Strikeout", "Pitch Walk"],
+    ["Pitch Hit Allowed", "Pitch Earned Run"],
+    ["Pitch Out", "Pitch Inning Complete"],
+]
+
+# Larger rosters only show the lineup in the Live Summary
+LIVE_SUMMARY_MAX_ROWS = 50
+
+def record_tap(play_type, mode):
+    # Button callback: runs before the panel re-renders, so the panel and
+    # summary already show the play.
+    lineup = game.lineup
+    if lineup:
+        batter = lineup[game.current_batter_index % len(lineup)]
+        record_play(batter, play_type, mode=mode)
+
+def render_game_tab():
     st.header("Game Mode (Fast Tap)")
 
-    if not st.session_state.lineup:
+    if not game.lineup:
         st.warning("No lineup set. Go to Set Lineup tab.")
     else:
+        render_fast_tap_panel()
+
+    with st.expander("Finish game"):
+        st.caption(
+            "Saves everything recorded since the last finished game (taps, "
+            "Add / Merge entries and imports) as one game in the Season tab."
+        )
+        game_date = st.date_input("Game date:", key="finish_game_date")
+        opponent = st.text_input("Opponent:", key="finish_game_opponent").strip()
+        if st.button("Finish Game"):
+            if not opponent:
+                st.error("Please enter the opponent.")
+            else:
+                try:
+                    info = game.finish_game(game_date, opponent)
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    st.success(f"Saved game vs {info.opponent} on {info.date:%m/%d/%y}.")
+
+@st.fragment(run_every=SHARED_REFRESH_SECONDS if SCORING_SERVER else None)
+def render_fast_tap_panel():
+    # A fragment: widgets in here rerun only this panel, not the script.
+    # On a shared game it also polls for other scorekeepers' plays.
+    with profiler.fragment_run(), profiler.section("fragment: Fast Tap"):
+        game.sync()
         col_mode1, col_mode2 = st.columns(2)
         with col_mode1:
             if st.button("Hitting Mode"):
@@ -589,238 +488,254 @@ with tab_game:
 
         st.write(f"Current Mode: **{st.session_state.fast_mode}**")
 
-        st.session_state.auto_advance = st.checkbox(
+        game.auto_advance = st.checkbox(
             "Auto-advance to next batter (hitting only)",
-            value=st.session_state.auto_advance
+            value=game.auto_advance
         )
 
-        lineup = st.session_state.lineup
-        st.session_state.current_batter_index %= len(lineup)
-        current_batter = lineup[st.session_state.current_batter_index]
+        lineup = game.lineup
+        game.current_batter_index %= len(lineup)
 
         selected_batter = st.selectbox(
             "Player at the plate / pitching:",
             options=lineup,
-            index=st.session_state.current_batter_index,
+            index=game.current_batter_index,
         )
 
-        if selected_batter != current_batter:
-            st.session_state.current_batter_index = lineup.index(selected_batter)
-            current_batter = selected_batter
+        if selected_batter != lineup[game.current_batter_index]:
+            game.current_batter_index = lineup.index(selected_batter)
 
         mode = "hitting" if st.session_state.fast_mode == "Hitting" else "pitching"
-
-        if mode == "hitting":
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("Single"):
-                    record_fast_tap_play(current_batter, "Single", mode="hitting")
-                    st.rerun()
-                if st.button("Home Run"):
-                    record_fast_tap_play(current_batter, "Home Run", mode="hitting")
-                    st.rerun()
-                if st.button("RBI"):
-                    record_fast_tap_play(current_batter, "RBI", mode="hitting")
-                    st.rerun()
-
-            with col2:
-                if st.button("Double"):
-                    record_fast_tap_play(current_batter, "Double", mode="hitting")
-                    st.rerun()
-                if st.button("Walk"):
-                    record_fast_tap_play(current_batter, "Walk", mode="hitting")
-                    st.rerun()
-                if st.button("Stolen Base"):
-                    record_fast_tap_play(current_batter, "Stolen Base", mode="hitting")
-                    st.rerun()
-
-            with col3:
-                if st.button("Triple"):
-                    record_fast_tap_play(current_batter, "Triple", mode="hitting")
-                    st.rerun()
-                if st.button("Strikeout"):
-                    record_fast_tap_play(current_batter, "Strikeout", mode="hitting")
-                    st.rerun()
-                if st.button("Out"):
-                    record_fast_tap_play(current_batter, "Out", mode="hitting")
-                    st.rerun()
-
-        else:  # pitching mode
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("Pitch Strikeout"):
-                    record_fast_tap_play(current_batter, "Pitch Strikeout", mode="pitching")
-                    st.rerun()
-                if st.button("Pitch Walk"):
-                    record_fast_tap_play(current_batter, "Pitch Walk", mode="pitching")
-                    st.rerun()
-            with col2:
-                if st.button("Pitch Hit Allowed"):
-                    record_fast_tap_play(current_batter, "Pitch Hit Allowed", mode="pitching")
-                    st.rerun()
-                if st.button("Pitch Earned Run"):
-                    record_fast_tap_play(current_batter, "Pitch Earned Run", mode="pitching")
-                    st.rerun()
-            with col3:
-                if st.button("Pitch Out"):
-                    record_fast_tap_play(current_batter, "Pitch Out", mode="pitching")
-                    st.rerun()
-                if st.button("Pitch Inning Complete"):
-                    record_fast_tap_play(current_batter, "Pitch Inning Complete", mode="pitching")
-                    st.rerun()
-
-        if st.button("Undo Last Play"):
-            undo_last_play()
-            st.rerun()
-
-        if st.session_state.stats:
+        buttons = HITTING_BUTTONS if mode == "hitting" else PITCHING_BUTTONS
+
+        for col, labels in zip(st.columns(3), buttons):
+            with col:
+                for label in labels:
+                    st.button(label, on_click=record_tap, args=(label, mode))
+
+        col_undo, col_redo = st.columns(2)
+        with col_undo:
+            st.button(
+                "Undo Last Play",
+                on_click=game.undo_last_play,
+                disabled=not game.play_log.can_undo
+            )
+        with col_redo:
+            st.button(
+                "Redo Play",
+                on_click=game.redo_last_play,
+                disabled=not game.play_log.can_redo
+            )
+
+        render_base_out_state()
+
+        if game.stats:
             st.subheader("Live Summary")
-            display = []
-            for p in st.session_state.stats:
-                ensure_player_fields(p)
-                s_val = p["Singles"]
-                d_val = p["Doubles"]
-                t_val = p["Triples"]
-                hr_val = p["Home Runs"]
-                ab_val = p["At Bats"]
-                bb_h = p["Walks"]
-
-                avg = calculate_batting_average(s_val, d_val, t_val, hr_val, ab_val)
-                obp = calculate_obp(s_val, d_val, t_val, hr_val, bb_h, ab_val)
-                slg = calculate_slg(s_val, d_val, t_val, hr_val, ab_val)
-                ops = obp + slg
-
-                pitch_outs = p.get("Pitch_Outs", 0)
-                er = p.get("Pitch_ER", 0)
-                k_p = p.get("Pitch_K", 0)
-                bb_p = p.get("Pitch_BB", 0)
-                h_p = p.get("Pitch_H", 0)
-
-                ip = calculate_ip(pitch_outs)
-                era = calculate_era(er, pitch_outs)
-                whip = calculate_whip(bb_p, h_p, pitch_outs)
-
-                display.append({
-                    "Player": p["Player"],
-                    "AB": ab_val,
-                    "1B": s_val,
-                    "2B": d_val,
-                    "3B": t_val,
-                    "HR": hr_val,
-                    "SB": p["Stolen Bases"],
-                    "RBI": p["RBIs"],
-                    "BB": bb_h,
-                    "K": p["Strikeouts"],
-                    "AVG": format_batting_average(avg),
-                    "OBP": format_three_decimal_rate(obp),
-                    "SLG": format_three_decimal_rate(slg),
-                    "OPS": format_three_decimal_rate(ops),
-                    "IP": format_ip(ip),
-                    "ER": er,
-                    "K (P)": k_p,
-                    "BB (P)": bb_p,
-                    "H (P)": h_p,
-                    "ERA": format_rate(era),
-                    "WHIP": format_rate(whip),
-                })
-            st.table(display)
+            with profiler.section("table: Live Summary"):
+                if len(game.stats) <= LIVE_SUMMARY_MAX_ROWS:
+                    st.dataframe(game.summary_rows(), hide_index=True)
+                else:
+                    st.caption(
+                        f"Showing the lineup; all {len(game.stats)} players "
+                        "are in the Add / Merge tab."
+                    )
+                    st.dataframe(game.summary_rows(lineup), hide_index=True)
+
+def render_base_out_state():
+    # Inferred from the hitting taps (baseball_stats/baseout.py)
+    tracker = game.base_out
+    state = tracker.state
+    outs = "1 out" if state.outs == 1 else f"{state.outs} outs"
+    runs = "1 run" if state.runs == 1 else f"{state.runs} runs"
+    line = f"**Inning {state.inning}** · {outs} · {BASE_LABELS[state.bases]} · {runs} this inning"
+    expected = tracker.expected_runs()
+    if expected is not None:
+        line += f" · {expected:.2f} more expected"
+    st.markdown(line)
+    if tracker.last_runs:
+        st.caption(
+            f"Last play scored {tracker.last_runs} run(s); tap RBI to credit the batter."
+        )
+
+    with st.expander("Run Expectancy (24 base-out states)"):
+        matrix, counts = tracker.matrix()
+        table = {"Runners": list(BASE_LABELS)}
+        for outs in range(3):
+            table[f"{outs} out" if outs == 1 else f"{outs} outs"] = [
+                f"{matrix[outs, bases]:.2f} ({counts[outs, bases]})" if counts[outs, bases] else "—"
+                for bases in range(8)
+            ]
+        st.dataframe(table, hide_index=True)
+        st.caption(
+            f"Average runs scored from each state to the end of the inning "
+            f"(times seen), over {tracker.innings} finished half-innings. "
+            "Runners move a fixed number of bases per hit; outs don't advance them."
+        )
 
 # ----------------------------------------
 # TAB 4 — Export Summary File (TXT + CSV)
 # ----------------------------------------
-with tab_export:
+def render_export_tab():
     st.header("Export Summary File")
 
-    if not st.session_state.stats:
+    if not game.stats:
         st.warning("No stats available to export.")
     else:
-        # TXT Export
-        export_text = build_export_text(st.session_state.stats)
-        filename_txt = generate_export_filename(st.session_state.stats)
+        # Exports are built only when a download button is clicked
+        filename_txt = generate_export_filename(game.stats)
 
+        # TXT Export
         st.subheader("Download TXT Summary")
         st.download_button(
             label="Download TXT File",
-            data=export_text,
+            data=functools.partial(profiler.wrap("export: txt", game.export), "txt"),
             file_name=filename_txt,
             mime="text/plain"
         )
 
         # CSV Export
-        csv_buffer = io.StringIO()
-        writer = csv.writer(csv_buffer)
-
-        writer.writerow([
-            # Hitting (MLB abbreviations)
-            "Player", "AB", "1B", "2B", "3B", "HR",
-            "SB", "RBI", "BB", "K", "AVG", "OBP", "SLG", "OPS",
-            # Pitching
-            "IP", "ER", "K (P)", "BB (P)", "H (P)", "ERA", "WHIP"
-        ])
-
-        for p in st.session_state.stats:
-            ensure_player_fields(p)
-            s_val = p["Singles"]
-            d_val = p["Doubles"]
-            t_val = p["Triples"]
-            hr_val = p["Home Runs"]
-            ab_val = p["At Bats"]
-            bb_h = p["Walks"]
-
-            avg = calculate_batting_average(s_val, d_val, t_val, hr_val, ab_val)
-            obp = calculate_obp(s_val, d_val, t_val, hr_val, bb_h, ab_val)
-            slg = calculate_slg(s_val, d_val, t_val, hr_val, ab_val)
-            ops = obp + slg
-
-            pitch_outs = p.get("Pitch_Outs", 0)
-            er = p.get("Pitch_ER", 0)
-            k_p = p.get("Pitch_K", 0)
-            bb_p = p.get("Pitch_BB", 0)
-            h_p = p.get("Pitch_H", 0)
-
-            ip = calculate_ip(pitch_outs)
-            era = calculate_era(er, pitch_outs)
-            whip = calculate_whip(bb_p, h_p, pitch_outs)
-
-            writer.writerow([
-                p["Player"],
-                ab_val,
-                s_val,
-                d_val,
-                t_val,
-                hr_val,
-                p["Stolen Bases"],
-                p["RBIs"],
-                bb_h,
-                p["Strikeouts"],
-                format_batting_average(avg),
-                format_three_decimal_rate(obp),
-                format_three_decimal_rate(slg),
-                format_three_decimal_rate(ops),
-                format_ip(ip),
-                er,
-                k_p,
-                bb_p,
-                h_p,
-                format_rate(era),
-                format_rate(whip),
-            ])
-
-        csv_data = csv_buffer.getvalue()
         filename_csv = filename_txt.replace(".txt", ".csv")
 
         st.subheader("Download CSV Summary")
         st.download_button(
             label="Download CSV File",
-            data=csv_data,
+            data=functools.partial(profiler.wrap("export: csv", game.export), "csv"),
             file_name=filename_csv,
             mime="text/csv"
         )
 
+        # Typed columnar files for analytics (needs pyarrow)
+        if columnar_available():
+            st.subheader("Download Parquet / Arrow")
+            st.caption("Raw counting stats as integers plus AVG/OBP/SLG/OPS/IP/ERA/WHIP as numbers.")
+            for kind, label in (("parquet", "Parquet"), ("arrow", "Arrow IPC")):
+                extension, mime = COLUMNAR_FORMATS[kind]
+                st.download_button(
+                    label=f"Download {label} File",
+                    data=functools.partial(
+                        profiler.wrap(f"export: {kind}", columnar_bytes), game.stats, kind
+                    ),
+                    file_name=filename_txt.replace(".txt", extension),
+                    mime=mime,
+                    key=f"download_{kind}"
+                )
+
+        # Binary snapshot (stats + play log) that Restore below loads back
+        if not SCORING_SERVER:
+            st.subheader("Download Snapshot")
+            st.download_button(
+                label="Download Snapshot File",
+                data=functools.partial(profiler.wrap("export: snapshot", snapshot_bytes), game),
+                file_name=filename_txt.replace(".txt", ".bbsnap"),
+                mime="application/octet-stream"
+            )
+
+    if not SCORING_SERVER:
+        st.subheader("Restore Snapshot")
+        snapshot_file = st.file_uploader(
+            "Snapshot file:",
+            type="bbsnap",
+            key="snapshot_file"
+        )
+        if snapshot_file and st.button("Replace Current Stats"):
+            try:
+                with profiler.section("load snapshot"):
+                    snap = game.load_snapshot(snapshot_file.getvalue())
+            except (ValueError, KeyError) as e:
+                st.error(f"Could not load {snapshot_file.name}: {e}")
+            else:
+                st.success(
+                    f"Loaded {len(snap.stats)} players and {snap.cursor} plays "
+                    f"from {snapshot_file.name}."
+                )
+
+# ----------------------------------------
+# TAB 5 — Season / Career (finished games)
+# ----------------------------------------
+def render_season_tab():
+    st.header("Season / Career")
+
+    season = game.season
+    if not len(season):
+        st.info("No finished games yet. Use Finish game in the Game Mode tab.")
+    else:
+        games = season.games()
+        st.caption(f"{len(games)} games, {games[0].date:%m/%d/%y} to {games[-1].date:%m/%d/%y}")
+
+        view = st.radio(
+            "View:",
+            ["Career", "Season", "Single game", "Split"],
+            horizontal=True,
+            key="season_view"
+        )
+
+        if view == "Career":
+            totals = season.career()
+        elif view == "Season":
+            year = st.selectbox("Season:", season.seasons()[::-1])
+            totals = season.season(year)
+        elif view == "Single game":
+            info = st.selectbox(
+                "Game:",
+                games[::-1],
+                format_func=lambda g: f"{g.date:%m/%d/%y} vs {g.opponent}"
+            )
+            totals = season.game(info.game_id)
+            if st.button("Delete Game"):
+                game.delete_game(info.game_id)
+                st.rerun()
+        else:
+            dates = st.date_input(
+                "Date range:",
+                value=(games[0].date, games[-1].date)
+            )
+            start = dates[0] if dates else None
+            end = dates[1] if len(dates) > 1 else None
+            opponent = st.selectbox("Opponent:", ["All opponents"] + season.opponents())
+            totals = season.split(
+                start, end, None if opponent == "All opponents" else opponent
+            )
+
+        if totals:
+            st.table(build_summary_rows(totals))
+        else:
+            st.info("No games match.")
+
+# ----------------------------------------
+# TAB 6 — Leaderboards
+# ----------------------------------------
+def render_leaders_tab():
+    st.header("Leaderboards")
+
+    if not game.stats:
+        st.warning("No stats yet.")
+    else:
+        col_pa, col_ip, col_k = st.columns(3)
+        with col_pa:
+            min_pa = st.number_input("Min PA (AVG / OPS):", min_value=0, step=1,
+                                     value=game.leaders.min_pa)
+        with col_ip:
+            min_ip = st.number_input("Min IP (ERA / WHIP):", min_value=0.0, step=1.0,
+                                     value=float(game.leaders.min_ip))
+        with col_k:
+            top_k = st.number_input("Show top:", min_value=1, max_value=100, value=10)
+        game.leaders.set_qualifiers(min_pa, min_ip)
+
+        board_names = list(LEADERBOARDS)
+        for i in range(0, len(board_names), 2):
+            for col, board in zip(st.columns(2), board_names[i:i + 2]):
+                with col:
+                    st.subheader(LEADERBOARDS[board].title)
+                    rows = game.leaderboard(board, top_k)
+                    if rows:
+                        st.dataframe(rows, hide_index=True)
+                    else:
+                        st.caption("No qualified players.")
+
 # ----------------------------------------
-# TAB 5 — FAQ / Formulas
+# TAB 7 — FAQ / Formulas
 # ----------------------------------------
-with tab_faq:
+def render_faq_tab():
     st.header("FAQ / Formulas")
 
     st.subheader("Hitting Formulas")
@@ -839,3 +754,54 @@ with tab_faq:
         "- **ERA** = (ER × 9) ÷ IP\n"
         "- **WHIP** = (BB + H) ÷ IP\n"
     )
+
+# ----------------------------------------
+# Tabs: only the selected tab's body runs on a rerun (switching tabs
+# triggers one), so a tap in Game Mode never rebuilds the other views.
+# ----------------------------------------
+TABS = [
+    ("📝 Set Lineup", render_lineup_tab),
+    ("➕ Add / Merge Players", render_add_merge_tab),
+    ("⚡ Game Mode (Fast Tap)", render_game_tab),
+    ("📤 Export Summary File", render_export_tab),
+    ("📅 Season / Career", render_season_tab),
+    ("🏆 Leaderboards", render_leaders_tab),
+    ("❓ FAQ / Formulas", render_faq_tab),
+]
+
+tab_containers = st.tabs(
+    [label for label, _ in TABS],
+    key="active_tab",
+    on_change="rerun"
+)
+for tab, (label, render) in zip(tab_containers, TABS):
+    if tab.open:
+        with tab, profiler.section(f"tab: {label}"):
+            render()
+
+# ----------------------------------------
+# Profiling panel (only when enabled)
+# ----------------------------------------
+if profiler.enabled:
+    with st.expander("🔧 Profiling"):
+        st.caption(
+            f"Reruns: {profiler.counters['reruns']} "
+            f"(interrupted by st.rerun: {profiler.counters['reruns interrupted']}), "
+            f"fragment reruns: {profiler.counters['fragment reruns']}. "
+            "Latencies cover the last "
+            f"{profiler.window} samples per section."
+        )
+        st.dataframe(profiler.summary_rows())
+        col_json, col_reset = st.columns(2)
+        with col_json:
+            st.download_button(
+                label="Download Profile JSON",
+                data=profiler.to_json,
+                file_name="profile.json",
+                mime="application/json"
+            )
+        with col_reset:
+            if st.button("Reset Profile"):
+                profiler.reset()
+
+profiler.end_run()
@@ -0,0 +1,76 @@
+# baseball_stats
+#
+# Stats engine behind the Streamlit app (app.py) and headless jobs. Nothing
+# here imports Streamlit, and submodules load on first attribute access, so
+# `import baseball_stats` stays cheap; NumPy is only paid for by code that
+# touches the store.
+
+import importlib
+
+_EXPORTS = {
+    # formulas
+    "calculate_batting_average": "formulas",
+    "calculate_era": "formulas",
+    "calculate_ip": "formulas",
+    "calculate_obp": "formulas",
+    "calculate_slg": "formulas",
+    "calculate_whip": "formulas",
+    "format_batting_average": "formulas",
+    "format_ip": "formulas",
+    "format_rate": "formulas",
+    "format_three_decimal_rate": "formulas",
+    # store / rates
+    "STAT_FIELDS": "store",
+    "StatsStore": "store",
+    "name_key": "store",
+    "batch_rate_stats": "rates",
+    "batch_format_rates": "formatting",
+    # play log / storage
+    "PLAY_DELTAS": "playlog",
+    "PlayEvent": "playlog",
+    "PlayLog": "playlog",
+    "make_play_event": "playlog",
+    "SQLiteStorage": "storage",
+    # import / export
+    "import_csv": "importer",
+    "SUMMARY_HEADERS": "summary",
+    "build_export_text": "summary",
+    "build_summary_rows": "summary",
+    "format_summary_table": "summary",
+    "generate_export_filename": "summary",
+    "iter_export_csv": "summary",
+    "iter_export_text": "summary",
+    "iter_record_batches": "columnar",
+    "write_arrow": "columnar",
+    "write_parquet": "columnar",
+    "load_snapshot": "snapshot",
+    "save_snapshot": "snapshot",
+    # simulation
+    "BaseOutTracker": "baseout",
+    "outcome_probabilities": "simulate",
+    "simulate_lineup": "simulate",
+    "optimize_lineup": "optimize",
+    # leaderboards
+    "LEADERBOARDS": "leaders",
+    "LeaderboardIndex": "leaders",
+    # state / season
+    "GameState": "game",
+    "merge_or_add_player": "game",
+    "GameInfo": "season",
+    "SeasonBook": "season",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
@@ -0,0 +1,212 @@
+# baseout.py
+#
+# Inning / base-out state for the lineup's half-innings, driven by the
+# Fast Tap hitting plays. Each play moves the runners (simulate.py's base
+# table), adds outs and runs, and the third out starts the next inning.
+# Every finished half-inning feeds a 24-state run-expectancy matrix: for
+# each base-out state the inning passed through, the runs scored from
+# there to the end of the inning.
+#
+# Updates are per event: an open inning keeps the states it visited, and
+# closing it adds one run total per visit to the matrix sums. Every event
+# pushes an undo frame, so undo/redo in Game Mode move the state and the
+# matrix back and forth with the play log. When the log starts a new
+# history, the tracker's state is saved with the journal (to_state), and a
+# restart replays the journal's events on top of it.
+#
+# Inferred, not scored: runners move a fixed number of bases, outs never
+# advance runners, and a stolen base moves the lead runner with an open
+# base ahead (a runner on third steals home only if nobody else can go).
+# RBIs are still tapped by hand.
+
+from collections import namedtuple
+
+import numpy as np
+
+from .simulate import (
+    DOUBLE,
+    HOME_RUN,
+    NEXT_BASES,
+    OUT,
+    OUTS_MADE,
+    RUNS_SCORED,
+    SINGLE,
+    STRIKEOUT,
+    TRIPLE,
+    WALK,
+)
+
+# Hitting play types that move the state -> simulate outcome
+PLAY_OUTCOMES = {
+    "Walk": WALK,
+    "Single": SINGLE,
+    "Double": DOUBLE,
+    "Triple": TRIPLE,
+    "Home Run": HOME_RUN,
+    "Strikeout": STRIKEOUT,
+    "Out": OUT,
+}
+STOLEN_BASE = "Stolen Base"
+
+# Runners on (bit 0 = first, bit 1 = second, bit 2 = third)
+BASE_LABELS = (
+    "Bases empty", "1st", "2nd", "1st & 2nd",
+    "3rd", "1st & 3rd", "2nd & 3rd", "Loaded",
+)
+
+# runs: scored so far this half-inning
+BaseOutState = namedtuple("BaseOutState", ["inning", "outs", "bases", "runs"])
+
+START_STATE = BaseOutState(1, 0, 0, 0)
+
+
+def _steal(bases):
+    # -> (bases, runs); the lead runner with an open base ahead moves up
+    for base in (1, 0):
+        if bases >> base & 1 and not bases >> (base + 1) & 1:
+            return bases ^ (1 << base) | (1 << (base + 1)), 0
+    if bases & 4:
+        return bases & ~4, 1
+    return bases, 0
+
+
+def advance(state, play_type):
+    # -> (state after the play, runs scored on it), or None if the play
+    # doesn't move the state (RBI, a steal with nobody on, ...).
+    # A third out rolls over to the next inning with the bases empty.
+    outcome = PLAY_OUTCOMES.get(play_type)
+    if outcome is not None:
+        bases = int(NEXT_BASES[outcome, state.bases])
+        runs = int(RUNS_SCORED[outcome, state.bases])
+        outs = state.outs + int(OUTS_MADE[outcome, state.bases])
+    elif play_type == STOLEN_BASE and state.bases:
+        bases, runs = _steal(state.bases)
+        outs = state.outs
+    else:
+        return None
+    if outs >= 3:
+        return BaseOutState(state.inning + 1, 0, 0, 0), runs
+    return BaseOutState(state.inning, outs, bases, state.runs + runs), runs
+
+
+def state_index(state):
+    return state.outs * 8 + state.bases
+
+
+# prev: state before the event; visits: how many visits the open inning
+# had; closed: the finished inning's visits if the event ended it.
+_Frame = namedtuple("_Frame", ["prev", "visits", "closed", "runs"])
+
+
+class BaseOutTracker:
+    def __init__(self):
+        self.state = START_STATE
+        # (state index, runs so far) each time the open inning entered a state
+        self._visits = [(0, 0)]
+        # Per state: runs to the end of the inning, summed over finished
+        # innings, and how many visits that sum covers
+        self._run_sums = np.zeros(24)
+        self._visit_counts = np.zeros(24, dtype=np.int64)
+        self.innings = 0  # finished half-innings in the matrix
+        self._frames = []
+
+    @classmethod
+    def from_events(cls, events, state=None):
+        # Replays a play log once (startup / loading a snapshot), starting
+        # from a saved to_state() if given.
+        tracker = cls() if state is None else cls.from_state(state)
+        for event in events:
+            tracker.apply(event)
+        return tracker
+
+    def to_state(self):
+        # JSON-ready state and matrix; undo frames aren't included.
+        return {
+            "state": list(self.state),
+            "visits": [list(visit) for visit in self._visits],
+            "run_sums": self._run_sums.tolist(),
+            "visit_counts": self._visit_counts.tolist(),
+            "innings": self.innings,
+        }
+
+    @classmethod
+    def from_state(cls, data):
+        tracker = cls()
+        tracker.state = BaseOutState(*data["state"])
+        tracker._visits = [tuple(visit) for visit in data["visits"]]
+        tracker._run_sums = np.array(data["run_sums"], dtype=np.float64)
+        tracker._visit_counts = np.array(data["visit_counts"], dtype=np.int64)
+        tracker.innings = data["innings"]
+        return tracker
+
+    @property
+    def last_runs(self):
+        # Runs the last applied event brought in, or None if it didn't
+        # move the state
+        frame = self._frames[-1] if self._frames else None
+        return frame.runs if frame is not None else None
+
+    def apply(self, event):
+        # One frame per event (None for plays that don't move the state),
+        # so undo() stays aligned with the play log.
+        moved = advance(self.state, event.play_type) if event.mode == "hitting" else None
+        if moved is None:
+            self._frames.append(None)
+            return None
+        state, runs = moved
+        closed = None
+        if state.inning != self.state.inning:
+            closed = self._visits
+            self._close(closed, self.state.runs + runs, 1)
+            self._visits = [(0, 0)]
+        else:
+            self._visits.append((state_index(state), state.runs))
+        self._frames.append(_Frame(self.state, len(self._visits), closed, runs))
+        self.state = state
+        return runs
+
+    def undo(self):
+        frame = self._frames.pop() if self._frames else None
+        if frame is None:
+            return
+        if frame.closed is not None:
+            self._close(frame.closed, frame.prev.runs + frame.runs, -1)
+            self._visits = frame.closed
+        else:
+            del self._visits[frame.visits - 1:]
+        self.state = frame.prev
+
+    def _close(self, visits, total, sign):
+        # Adds (sign=1) or removes (sign=-1) a finished inning's visits.
+        index = np.array([i for i, _ in visits], dtype=np.intp)
+        before = np.array([r for _, r in visits], dtype=np.float64)
+        np.add.at(self._run_sums, index, sign * (total - before))
+        np.add.at(self._visit_counts, index, sign)
+        self.innings += sign
+
+    def checkpoint(self):
+        # The play log started a new history (roster edit, import): keep
+        # the state and the matrix, but earlier events can't be undone.
+        self._frames.clear()
+
+    def new_game(self):
+        # Drops the unfinished inning and starts over in the first. Like
+        # checkpoint(), so the play log must start a new history too.
+        self.state = START_STATE
+        self._visits = [(0, 0)]
+        self._frames.clear()
+
+    def matrix(self):
+        # -> (expected runs, visits), each [outs, bases]; states never seen
+        # in a finished inning are NaN.
+        counts = self._visit_counts.reshape(3, 8)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            expected = self._run_sums.reshape(3, 8) / counts
+        return np.where(counts > 0, expected, np.nan), counts.copy()
+
+    def expected_runs(self, state=None):
+        # Matrix value for a state (default: the current one), or None
+        state = self.state if state is None else state
+        index = state_index(state)
+        count = self._visit_counts[index]
+        return float(self._run_sums[index] / count) if count else None
@@ -0,0 +1,246 @@
+# bench.py
+#
+# Reproducible benchmarks for the stats hot paths: table formatting, the
+# TXT/CSV exports, Add/Merge and the Fast Tap path. Rosters and play
+# streams are synthetic and seeded, so two runs time the same work.
+# Results are written as JSON for comparing runs:
+#
+#   python -m baseball_stats bench --out before.json
+#   python -m baseball_stats bench --out after.json --compare before.json
+
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from .game import GameState, merge_or_add_player
+from .playlog import PLAY_DELTAS
+from .store import HITTING_FIELDS, PITCHING_FIELDS, STAT_FIELDS, StatsStore
+from .summary import build_export_text, format_summary_table, iter_export_csv
+
+DEFAULT_SIZES = (10, 1_000, 100_000, 1_000_000)
+MERGE_ENTRIES = 1_000
+TAP_PLAYS = 5_000
+LINEUP_SIZE = 9
+
+
+# ----------------------------------------
+# Synthetic data
+# ----------------------------------------
+
+def synthetic_roster(n_players, seed=0):
+    # Plausible season lines: hits never exceed at bats, so the rate
+    # formatters see the same value ranges as real data.
+    rng = np.random.default_rng(seed)
+    ab = rng.integers(0, 600, n_players)
+    hits = rng.binomial(ab, 0.26)
+    singles = rng.binomial(hits, 0.68)
+    doubles = rng.binomial(hits - singles, 0.6)
+    triples = rng.binomial(hits - singles - doubles, 0.15)
+    columns = {
+        "At Bats": ab,
+        "Singles": singles,
+        "Doubles": doubles,
+        "Triples": triples,
+        "Home Runs": hits - singles - doubles - triples,
+    }
+    for field in HITTING_FIELDS[5:]:
+        columns[field] = rng.integers(0, 120, n_players)
+    columns["Pitch_Outs"] = rng.integers(0, 600, n_players)
+    for field in PITCHING_FIELDS[1:]:
+        columns[field] = rng.integers(0, 150, n_players)
+    names = [f"Player {i:07d}" for i in range(n_players)]
+    return StatsStore.from_columns(names, columns)
+
+
+def synthetic_entries(stats, n_entries, seed=0):
+    # Add/Merge form entries: about half hit existing players, half are new.
+    rng = random.Random(seed)
+    names = stats.names
+    entries = []
+    for i in range(n_entries):
+        if names and rng.random() < 0.5:
+            name = rng.choice(names)
+        else:
+            name = f"New Player {i:07d}"
+        entry = {field: rng.randint(0, 5) for field in STAT_FIELDS}
+        entry["Player"] = name
+        entries.append(entry)
+    return entries
+
+
+def synthetic_plays(lineup, pitcher, n_plays, seed=0):
+    # (player, mode, play_type) stream: mostly hitting plays for the
+    # lineup, with pitching plays for one pitcher mixed in.
+    rng = random.Random(seed)
+    hitting = list(PLAY_DELTAS["hitting"])
+    pitching = list(PLAY_DELTAS["pitching"])
+    plays = []
+    for i in range(n_plays):
+        if rng.random() < 0.3:
+            plays.append((pitcher, "pitching", rng.choice(pitching)))
+        else:
+            plays.append((lineup[i % len(lineup)], "hitting", rng.choice(hitting)))
+    return plays
+
+
+# ----------------------------------------
+# Cases: setup(n_players, seed) -> state, run(state) -> ops, where ops
+# is players formatted, entries merged or plays tapped
+# ----------------------------------------
+
+def _setup_roster(n_players, seed):
+    return synthetic_roster(n_players, seed)
+
+
+def _run_summary_table(stats):
+    format_summary_table(stats)
+    return len(stats)
+
+
+def _run_export_text(stats):
+    build_export_text(stats)
+    return len(stats)
+
+
+def _run_export_csv(stats):
+    "".join(iter_export_csv(stats))
+    return len(stats)
+
+
+def _setup_merge(n_players, seed):
+    stats = synthetic_roster(n_players, seed)
+    return stats, synthetic_entries(stats, MERGE_ENTRIES, seed)
+
+
+def _run_merge(state):
+    stats, entries = state
+    for entry in entries:
+        merge_or_add_player(stats, entry)
+    return len(entries)
+
+
+def _setup_fast_tap(n_players, seed):
+    game = GameState(synthetic_roster(max(n_players, LINEUP_SIZE + 1), seed))
+    names = game.stats.names
+    game.lineup = names[:LINEUP_SIZE]
+    plays = synthetic_plays(game.lineup, names[LINEUP_SIZE], TAP_PLAYS, seed)
+    return game, plays
+
+
+def _run_fast_tap(state):
+    game, plays = state
+    for player, mode, play_type in plays:
+        game.record_fast_tap_play(player, play_type, mode=mode)
+    return len(plays)
+
+
+CASES = {
+    "format_summary_table": (_setup_roster, _run_summary_table),
+    "build_export_text": (_setup_roster, _run_export_text),
+    "iter_export_csv": (_setup_roster, _run_export_csv),
+    "merge_or_add_player": (_setup_merge, _run_merge),
+    "record_fast_tap_play": (_setup_fast_tap, _run_fast_tap),
+}
+
+
+# ----------------------------------------
+# Runner
+# ----------------------------------------
+
+def run_case(name, n_players, repeat=3, budget=10.0, seed=0):
+    # Times up to `repeat` runs (stopping early once `budget` seconds are
+    # spent, but always at least one), each on freshly built state, then
+    # one more run under tracemalloc for peak memory. Setup is excluded
+    # from both.
+    setup, run = CASES[name]
+    times = []
+    spent = 0.0
+    ops = 0
+    while len(times) < repeat and (not times or spent < budget):
+        state = setup(n_players, seed)
+        start = time.perf_counter()
+        ops = run(state)
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        spent += elapsed
+        del state
+
+    state = setup(n_players, seed)
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del state
+
+    best = min(times)
+    return {
+        "case": name,
+        "players": n_players,
+        "ops": ops,
+        "runs": len(times),
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "per_op_us": best / ops * 1e6,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, cases=None, repeat=3, budget=10.0,
+                   seed=0, progress=None):
+    results = []
+    for n_players in sizes:
+        for name in cases or CASES:
+            result = run_case(name, n_players, repeat=repeat, budget=budget, seed=seed)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def format_result(result, baseline=None):
+    line = (
+        f"{result['case']:<22} {result['players']:>9,} players  "
+        f"best {result['best_s'] * 1000:>10.2f} ms  "
+        f"{result['per_op_us']:>12.2f} us/op  "
+        f"peak {result['peak_bytes'] / 2**20:>8.1f} MiB"
+    )
+    if baseline is not None:
+        line += f"  x{result['best_s'] / baseline['best_s']:.2f} vs baseline"
+    return line
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def baseline_lookup(report):
+    return {(r["case"], r["players"]): r for r in report["results"]}
+
+
+def write_results(report, path):
+    text = json.dumps(report, indent=2) + "\n"
+    if path == "-":
+        sys.stdout.write(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
@@ -0,0 +1,381 @@
+# cli.py
+#
+# Headless command line entry point:
+#
+#   python -m baseball_stats aggregate games/ --txt season.txt --csv season.csv --jobs 0
+#   python -m baseball_stats aggregate games/ --parquet season.parquet
+#   python -m baseball_stats bench --out results.json
+#   python -m baseball_stats serve --port 8765 --db baseball_stats.db
+#   python -m baseball_stats ingest replay.csv --port 8765
+#   python -m baseball_stats simulate --snapshot game.bbsnap --games 1000000 --jobs 0
+#   python -m baseball_stats optimize --snapshot game.bbsnap
+#
+# Game files (CSV, in any layout import_csv accepts) are aggregated with
+# merge_or_add_player semantics and written as the same TXT / CSV reports
+# the Export tab produces. With --jobs, each game file is parsed in its own
+# worker process and the per-file totals are reduced in input order, so
+# the output does not depend on the number of workers.
+
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import bench
+from .columnar import COLUMNAR_WRITERS
+from .game import GameState
+from .importer import format_error_report, import_csv
+from .optimize import OPTIMIZE_STARTS, optimize_lineup
+from .ingest import INGEST_BATCH_EVENTS, INGEST_WINDOW, ingest_plays, read_replay
+from .server import DEFAULT_HOST, DEFAULT_PORT, INGEST_MAX_EVENTS, run_server
+from .simulate import simulate_lineup
+from .storage import SQLiteStorage
+from .store import StatsStore
+from .summary import iter_export_csv, iter_export_text
+
+
+def find_game_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(
+                    os.path.join(root, name)
+                    for name in sorted(names)
+                    if name.lower().endswith(".csv")
+                )
+        else:
+            files.append(path)
+    return files
+
+
+def load_game_file(path):
+    # Worker: one game file -> (path, names, columns, report) or
+    # (path, None, None, error message).
+    stats = StatsStore()
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            report = import_csv(stats, f)
+    except (OSError, ValueError) as e:
+        return path, None, None, str(e)
+    except csv.Error as e:
+        # e.g. a field over the size limit
+        return path, None, None, f"Malformed CSV: {e}"
+    return path, stats.names, stats.columns(), report
+
+
+def aggregate(paths, jobs=1):
+    # -> (stats, [(path, ImportReport or error message)])
+    files = find_game_files(paths)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(files) // (jobs * 4))
+            results = list(pool.map(load_game_file, files, chunksize=chunksize))
+    else:
+        results = map(load_game_file, files)
+
+    stats = StatsStore()
+    reports = []
+    for path, names, columns, report in results:
+        if names is not None:
+            stats.merge_columns(names, columns)
+        reports.append((path, report))
+    return stats, reports
+
+
+def _write(path, chunks):
+    if path == "-":
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def cmd_aggregate(args):
+    stats, reports = aggregate(args.inputs, jobs=args.jobs)
+
+    failed = 0
+    row_errors = []
+    for path, report in reports:
+        if isinstance(report, str):
+            failed += 1
+            print(f"{path}: {report}", file=sys.stderr)
+            continue
+        if report.errors:
+            print(f"{path}: skipped {len(report.errors)} of {report.rows_read} rows",
+                  file=sys.stderr)
+            row_errors.extend(
+                (f"{path}:{e.line}", e.player, e.message) for e in report.errors
+            )
+    print(f"Aggregated {len(reports) - failed} files, {len(stats)} players.",
+          file=sys.stderr)
+
+    if args.errors:
+        _write(args.errors, [format_error_report(row_errors)])
+    if args.csv:
+        _write(args.csv, iter_export_csv(stats))
+    for kind, writer in COLUMNAR_WRITERS.items():
+        path = getattr(args, kind)
+        if path:
+            try:
+                writer(stats, sys.stdout.buffer if path == "-" else path)
+            except ImportError as e:
+                print(e, file=sys.stderr)
+                return 1
+    if args.txt or not (args.csv or args.parquet or args.arrow):
+        _write(args.txt or "-", iter_export_text(stats))
+    return 1 if failed else 0
+
+
+def cmd_bench(args):
+    baseline = None
+    if args.compare:
+        baseline = bench.baseline_lookup(bench.load_results(args.compare))
+
+    def progress(result):
+        key = (result["case"], result["players"])
+        print(bench.format_result(result, baseline and baseline.get(key)),
+              file=sys.stderr)
+
+    report = bench.run_benchmarks(
+        sizes=args.sizes,
+        cases=args.cases,
+        repeat=args.repeat,
+        budget=args.budget,
+        seed=args.seed,
+        progress=progress,
+    )
+    if args.out:
+        bench.write_results(report, args.out)
+    return 0
+
+
+def cmd_serve(args):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    game = GameState.restore(SQLiteStorage(args.db)) if args.db else GameState()
+    try:
+        run_server(game, host=args.host, port=args.port)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_ingest(args):
+    if args.synthetic:
+        lineup = [f"Batter {i + 1}" for i in range(bench.LINEUP_SIZE)]
+        plays = (
+            (player, play_type, mode)
+            for player, mode, play_type in bench.synthetic_plays(
+                lineup, "Pitcher", args.synthetic, seed=args.seed
+            )
+        )
+    elif args.replay:
+        plays = read_replay(args.replay)
+    else:
+        print("Give a replay file or --synthetic N.", file=sys.stderr)
+        return 2
+    if not 1 <= args.batch <= INGEST_MAX_EVENTS:
+        # The server refuses bigger batches outright
+        print(f"--batch must be 1 to {INGEST_MAX_EVENTS}.", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    try:
+        result = asyncio.run(ingest_plays(
+            plays, host=args.host, port=args.port,
+            batch_events=args.batch, window=args.window,
+        ))
+    except OSError as e:
+        print(f"Ingest failed: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    for message in result.errors:
+        print(f"Batch refused: {message}", file=sys.stderr)
+    for index, message in result.rejected[:20]:
+        print(f"play {index + 1}: {message}", file=sys.stderr)
+    print(f"Sent {result.sent} plays: {result.accepted} accepted, "
+          f"{len(result.rejected)} rejected in {elapsed:.2f} s "
+          f"({result.sent / elapsed:,.0f} plays/s).", file=sys.stderr)
+    return 1 if result.rejected or result.errors else 0
+
+
+def _load_state(args):
+    # GameState from --snapshot or --db (for commands that read stats).
+    if args.snapshot:
+        game = GameState()
+        game.load_snapshot(args.snapshot)
+        return game
+    if args.db:
+        return GameState.restore(SQLiteStorage(args.db))
+    return GameState()
+
+
+def cmd_simulate(args):
+    try:
+        game = _load_state(args)
+    except (OSError, ValueError) as e:
+        print(f"Could not load stats: {e}", file=sys.stderr)
+        return 1
+    lineup = [name.strip() for name in args.lineup.split(",")] if args.lineup else game.lineup
+    try:
+        result = simulate_lineup(
+            game.stats, lineup, n_games=args.games, innings=args.innings,
+            jobs=args.jobs, seed=args.seed,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    half_innings = result.games * result.innings
+    print(f"Lineup: {', '.join(lineup)}")
+    print(f"Expected runs per game: {result.runs_per_game:.3f} "
+          f"(± {result.std_error:.3f}, {result.games:,} games)")
+    print(f"{half_innings:,} half-innings in {result.seconds:.2f} s "
+          f"({half_innings / result.seconds:,.0f}/s).", file=sys.stderr)
+    return 0
+
+
+def cmd_optimize(args):
+    try:
+        game = _load_state(args)
+    except (OSError, ValueError) as e:
+        print(f"Could not load stats: {e}", file=sys.stderr)
+        return 1
+    lineup = [name.strip() for name in args.lineup.split(",")] if args.lineup else game.lineup
+    try:
+        result = optimize_lineup(
+            game.stats, lineup, innings=args.innings, starts=args.starts,
+            jobs=args.jobs, seed=args.seed,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for slot, name in enumerate(result.lineup, 1):
+        print(f"{slot}. {name}")
+    print(f"Expected runs per game: {result.runs_per_game:.3f} "
+          f"(given order: {result.current_runs_per_game:.3f})")
+    print(f"{result.evaluated:,} orders evaluated in {result.seconds:.2f} s.", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m baseball_stats",
+        description="Headless baseball stats jobs.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    agg = sub.add_parser(
+        "aggregate",
+        help="Aggregate game CSV files into TXT/CSV reports.",
+    )
+    agg.add_argument("inputs", nargs="+", help="Game CSV files or directories.")
+    agg.add_argument("--txt", help="Write the TXT report here ('-' for stdout).")
+    agg.add_argument("--csv", help="Write the CSV report here ('-' for stdout).")
+    agg.add_argument("--parquet", help="Write typed stats as Parquet here (needs pyarrow).")
+    agg.add_argument("--arrow", help="Write typed stats as an Arrow IPC file here (needs pyarrow).")
+    agg.add_argument("--errors", help="Write skipped rows to this CSV file.")
+    agg.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Worker processes, one game file each (0 = all cores).",
+    )
+    agg.set_defaults(func=cmd_aggregate)
+
+    ben = sub.add_parser(
+        "bench",
+        help="Time the table, export, merge and Fast Tap paths on synthetic rosters.",
+    )
+    ben.add_argument(
+        "--sizes", type=int, nargs="+", default=list(bench.DEFAULT_SIZES),
+        help="Roster sizes (players) to benchmark.",
+    )
+    ben.add_argument(
+        "--cases", nargs="+", choices=list(bench.CASES),
+        help="Only run these cases (default: all).",
+    )
+    ben.add_argument("--repeat", type=int, default=3, help="Timed runs per case.")
+    ben.add_argument(
+        "--budget", type=float, default=10.0,
+        help="Stop repeating a case after this many seconds.",
+    )
+    ben.add_argument("--seed", type=int, default=0, help="Synthetic data seed.")
+    ben.add_argument("--out", help="Write JSON results here ('-' for stdout).")
+    ben.add_argument("--compare", help="Earlier JSON results to compare against.")
+    ben.set_defaults(func=cmd_bench)
+
+    srv = sub.add_parser(
+        "serve",
+        help="Run a shared scoring server that several app sessions can join.",
+    )
+    srv.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on.")
+    srv.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on.")
+    srv.add_argument("--db", help="SQLite file to keep the game in (default: memory only).")
+    srv.set_defaults(func=cmd_serve)
+
+    ing = sub.add_parser(
+        "ingest",
+        help="Feed plays into a running scoring server in batches.",
+    )
+    ing.add_argument("replay", nargs="?",
+                     help="CSV of player, play_type[, mode] rows to replay.")
+    ing.add_argument("--synthetic", type=int, metavar="N",
+                     help="Send N synthetic plays instead of a replay file.")
+    ing.add_argument("--seed", type=int, default=0, help="Synthetic play seed.")
+    ing.add_argument("--host", default=DEFAULT_HOST, help="Scoring server address.")
+    ing.add_argument("--port", type=int, default=DEFAULT_PORT, help="Scoring server port.")
+    ing.add_argument("--batch", type=int, default=INGEST_BATCH_EVENTS,
+                     help=f"Plays per batch (at most {INGEST_MAX_EVENTS}).")
+    ing.add_argument("--window", type=int, default=INGEST_WINDOW,
+                     help="Batches in flight before waiting for acks.")
+    ing.set_defaults(func=cmd_ingest)
+
+    sim = sub.add_parser(
+        "simulate",
+        help="Monte Carlo expected runs for a batting lineup.",
+    )
+    sim.add_argument("--snapshot", help="Stats and lineup from a snapshot file.")
+    sim.add_argument("--db", help="Stats and lineup from a SQLite journal.")
+    sim.add_argument("--lineup",
+                     help="Comma-separated batting order (default: the saved lineup).")
+    sim.add_argument("--games", type=int, default=100_000, help="Games to simulate.")
+    sim.add_argument("--innings", type=int, default=9, help="Innings per game.")
+    sim.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Worker processes (0 = all cores).",
+    )
+    sim.add_argument("--seed", type=int, default=0, help="Random seed.")
+    sim.set_defaults(func=cmd_simulate)
+
+    opt = sub.add_parser(
+        "optimize",
+        help="Search batting orders of a lineup for the most expected runs.",
+    )
+    opt.add_argument("--snapshot", help="Stats and lineup from a snapshot file.")
+    opt.add_argument("--db", help="Stats and lineup from a SQLite journal.")
+    opt.add_argument("--lineup",
+                     help="Comma-separated players (default: the saved lineup).")
+    opt.add_argument("--innings", type=int, default=9, help="Innings per game.")
+    opt.add_argument("--starts", type=int, default=OPTIMIZE_STARTS,
+                     help="Starting orders for the search.")
+    opt.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Worker processes, one starting order each (0 = all cores).",
+    )
+    opt.add_argument("--seed", type=int, default=0, help="Seed for random starting orders.")
+    opt.set_defaults(func=cmd_optimize)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,262 @@
+# client.py
+#
+# Client side of the shared scoring server (server.py). SharedGame is a
+# GameState mirror: reads stay local, writes go to the server, and the
+# deltas the server pushes back are applied by sync() on the caller's own
+# thread, so a Streamlit script never sees the store change mid-run.
+
+import itertools
+import json
+import queue
+import socket
+import threading
+
+from .baseout import BaseOutTracker
+from .game import GameState
+from .playlog import apply_event
+from .server import decode_event, decode_snapshot_stats, dumps
+
+SHARED_UNSUPPORTED = "Not available on a shared game; run it on the scoring server."
+
+
+class ServerConnection:
+    def __init__(self, host, port, timeout=10.0):
+        self.timeout = timeout
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}  # request id -> [threading.Event, response]
+        self._pending_lock = threading.Lock()
+        # Pushed changes, in server order, until the owner applies them
+        self.pushes = queue.Queue()
+        self.closed = False
+        self._reader = threading.Thread(
+            target=self._read_loop, name="scoring-client", daemon=True
+        )
+        self._reader.start()
+
+    def request(self, op, **fields):
+        request_id = next(self._ids)
+        waiter = [threading.Event(), None]
+        with self._pending_lock:
+            self._pending[request_id] = waiter
+        try:
+            with self._send_lock:
+                self._sock.sendall(dumps(dict(fields, id=request_id, op=op)))
+            if not waiter[0].wait(self.timeout):
+                raise ConnectionError(f"No reply to {op!r} from the scoring server.")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+        response = waiter[1]
+        if response is None:
+            raise ConnectionError("Lost connection to the scoring server.")
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response
+
+    def _read_loop(self):
+        try:
+            with self._sock.makefile("rb") as lines:
+                for line in lines:
+                    message = json.loads(line)
+                    if "push" in message:
+                        self.pushes.put(message)
+                        continue
+                    with self._pending_lock:
+                        waiter = self._pending.get(message.get("id"))
+                    if waiter is not None:
+                        waiter[1] = message
+                        waiter[0].set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.closed = True
+            with self._pending_lock:
+                for waiter in self._pending.values():
+                    waiter[0].set()
+
+    def close(self):
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+
+class RemoteLogView:
+    # The parts of a PlayLog the app reads, as last reported by the server.
+    def __init__(self, seq=0, can_undo=False, can_redo=False):
+        self.seq = seq
+        self.can_undo = can_undo
+        self.can_redo = can_redo
+
+
+class SharedGame(GameState):
+    def __init__(self, connection):
+        self.connection = None  # lineup/batter setters stay local until set
+        super().__init__()
+        self.version = 0
+        self._load(connection.request("snapshot"))
+        self.connection = connection
+
+    @classmethod
+    def connect(cls, host, port, timeout=10.0):
+        return cls(ServerConnection(host, port, timeout=timeout))
+
+    # ----------------------------------------
+    # Shared lineup / current batter
+    # ----------------------------------------
+
+    @property
+    def lineup(self):
+        return self._lineup
+
+    @lineup.setter
+    def lineup(self, names):
+        self._lineup = list(names)
+        if self.connection is not None and self._lineup != self._server_lineup:
+            self._request("lineup", lineup=self._lineup)
+
+    @property
+    def current_batter_index(self):
+        return self._current_batter_index
+
+    @current_batter_index.setter
+    def current_batter_index(self, index):
+        self._current_batter_index = index
+        if self.connection is not None and index != self._server_batter:
+            self._request("batter", current_batter_index=index)
+
+    # ----------------------------------------
+    # Pushed changes
+    # ----------------------------------------
+
+    def sync(self):
+        # Applies pushed changes in order; a gap in versions (missed
+        # pushes) falls back to a fresh snapshot.
+        changed = False
+        while True:
+            try:
+                push = self.connection.pushes.get_nowait()
+            except queue.Empty:
+                break
+            if push["version"] <= self.version:
+                continue
+            if push["version"] != self.version + 1:
+                self._load(self.connection.request("snapshot"))
+            else:
+                self._apply_push(push)
+                self.version = push["version"]
+            changed = True
+        return changed
+
+    def _apply_push(self, push):
+        kind = push["push"]
+        if kind == "play":
+            event = decode_event(push["event"])
+            row = apply_event(self.stats, event, push["sign"])
+            if push["sign"] > 0:
+                self.base_out.apply(event)
+            else:
+                self.base_out.undo()
+            self._invalidate(row)
+            self._set_batter(push["current_batter_index"])
+            self.play_log = RemoteLogView(*push["log"])
+        elif kind == "plays":
+            # A batch from an ingest feed
+            invalidate = self._invalidate
+            for data in push["events"]:
+                event = decode_event(data)
+                invalidate(apply_event(self.stats, event))
+                self.base_out.apply(event)
+            self._set_batter(push["current_batter_index"])
+            self.play_log = RemoteLogView(*push["log"])
+        elif kind == "lineup":
+            self._lineup = list(push["lineup"])
+            self._server_lineup = list(push["lineup"])
+            if "current_batter_index" in push:
+                self._set_batter(push["current_batter_index"])
+        elif kind == "batter":
+            self._set_batter(push["current_batter_index"])
+        elif kind == "reset":
+            self._load_snapshot(push["snapshot"])
+
+    def _set_batter(self, index):
+        self._current_batter_index = self._server_batter = index
+
+    def _load(self, response):
+        self._load_snapshot(response["snapshot"])
+        self.version = response["version"]
+
+    def _load_snapshot(self, snapshot):
+        self.stats = decode_snapshot_stats(snapshot)
+        self._invalidate_all()
+        # The snapshot carries no plays, only the server's tracker state
+        self.base_out = BaseOutTracker.from_state(snapshot["base_out"])
+        self._lineup = list(snapshot["lineup"])
+        self._server_lineup = list(snapshot["lineup"])
+        self._set_batter(snapshot["current_batter_index"])
+        self.play_log = RemoteLogView(*snapshot["log"])
+
+    def _request(self, op, **fields):
+        response = self.connection.request(op, **fields)
+        self.sync()
+        return response
+
+    # ----------------------------------------
+    # Writes (sent to the server, applied when pushed back)
+    # ----------------------------------------
+
+    def record_fast_tap_play(self, player_name, play_type, mode="hitting"):
+        response = self._request(
+            "tap",
+            player=player_name,
+            play_type=play_type,
+            mode=mode,
+            auto_advance=self.auto_advance,
+        )
+        return decode_event(response["event"])
+
+    def _log_op(self, op):
+        try:
+            response = self._request(op, seq=self.play_log.seq)
+        except ValueError:
+            # Someone else played since our last sync; show their play
+            # instead of undoing it blind.
+            self.sync()
+            return None
+        return decode_event(response["event"]) if response["event"] else None
+
+    def undo_last_play(self):
+        return self._log_op("undo")
+
+    def redo_last_play(self):
+        return self._log_op("redo")
+
+    def record_merge_entry(self, entry):
+        return self._request("merge", entry=entry)["result"]
+
+    def rename_player(self, old_name, new_name):
+        self._request("rename", old_name=old_name, new_name=new_name)
+
+    def remove_player(self, name):
+        self._request("remove", name=name)
+
+    def import_csv(self, source):
+        raise ValueError(SHARED_UNSUPPORTED)
+
+    def finish_game(self, day, opponent):
+        raise ValueError(SHARED_UNSUPPORTED)
+
+    def delete_game(self, game_id):
+        raise ValueError(SHARED_UNSUPPORTED)
+
+    def save_snapshot(self, target):
+        raise ValueError(SHARED_UNSUPPORTED)
+
+    def load_snapshot(self, source):
+        raise ValueError(SHARED_UNSUPPORTED)
@@ -0,0 +1,113 @@
+# columnar.py
+#
+# Typed columnar exports for analytics: Arrow IPC and Parquet. Unlike the
+# CSV export, counting stats stay integers and the rates are float64
+# columns, so nothing has to be parsed back from ".375". Rows go out in
+# record batches of COLUMNAR_BATCH_ROWS players, so memory stays bounded
+# however big the roster is.
+#
+# pyarrow is optional: the rest of the package works without it and
+# these functions raise ImportError with an install hint.
+#
+#   with open("season.parquet", "wb") as f:
+#       write_parquet(game.stats, f)
+
+import importlib.util
+import io
+import os
+
+from .rates import RATE_FIELDS, batch_rate_stats
+from .store import STAT_DTYPE, STAT_FIELDS
+
+COLUMNAR_BATCH_ROWS = 65_536
+# Export kind -> (file extension, MIME type)
+COLUMNAR_FORMATS = {
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def columnar_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "Arrow/Parquet export needs pyarrow: pip install pyarrow"
+        ) from None
+    return pyarrow
+
+
+def columnar_schema():
+    # Player, the raw counting stats (store names) and the rates.
+    pa = _pyarrow()
+    return pa.schema(
+        [pa.field("Player", pa.string(), nullable=False)]
+        + [pa.field(field, pa.from_numpy_dtype(STAT_DTYPE), nullable=False)
+           for field in STAT_FIELDS]
+        + [pa.field(name, pa.float64(), nullable=False) for name in RATE_FIELDS]
+    )
+
+
+def iter_record_batches(stats, batch_rows=COLUMNAR_BATCH_ROWS):
+    pa = _pyarrow()
+    schema = columnar_schema()
+    cols = stats.columns()
+    size = len(stats)
+    for start in range(0, size, batch_rows):
+        stop = min(start + batch_rows, size)
+        # Column slices are views; pyarrow wraps them without copying.
+        chunk = {field: col[start:stop] for field, col in cols.items()}
+        rates = batch_rate_stats(chunk)
+        arrays = [pa.array([stats.name_at(row) for row in range(start, stop)],
+                           type=pa.string())]
+        arrays += [pa.array(chunk[field]) for field in STAT_FIELDS]
+        arrays += [pa.array(rates[name]) for name in RATE_FIELDS]
+        yield pa.record_batch(arrays, schema=schema)
+
+
+def _open_sink(sink):
+    if isinstance(sink, (str, os.PathLike)):
+        return open(sink, "wb")
+    return None
+
+
+def write_arrow(stats, sink, batch_rows=COLUMNAR_BATCH_ROWS):
+    # Arrow IPC file format; sink is a path or a writable binary file.
+    pa = _pyarrow()
+    f = _open_sink(sink)
+    try:
+        with pa.ipc.new_file(f or sink, columnar_schema()) as writer:
+            for batch in iter_record_batches(stats, batch_rows):
+                writer.write_batch(batch)
+    finally:
+        if f is not None:
+            f.close()
+
+
+def write_parquet(stats, sink, batch_rows=COLUMNAR_BATCH_ROWS, compression="zstd"):
+    # One Parquet row group per record batch.
+    _pyarrow()
+    import pyarrow.parquet as pq
+
+    f = _open_sink(sink)
+    try:
+        with pq.ParquetWriter(f or sink, columnar_schema(), compression=compression) as writer:
+            for batch in iter_record_batches(stats, batch_rows):
+                writer.write_batch(batch, row_group_size=batch_rows)
+    finally:
+        if f is not None:
+            f.close()
+
+
+COLUMNAR_WRITERS = {"parquet": write_parquet, "arrow": write_arrow}
+
+
+def columnar_bytes(stats, kind):
+    # Whole file in memory, for download buttons.
+    buffer = io.BytesIO()
+    COLUMNAR_WRITERS[kind](stats, buffer)
+    return buffer.getvalue()
@@ -0,0 +1,43 @@
+# derived.py
+#
+# Per-player cache of derived display rows (rates + formatted strings).
+# Writers mark the rows they touched as stale; reads only rebuild those.
+
+class DerivedRowCache:
+    def __init__(self, build_rows):
+        # build_rows(stats, row_ids) -> list of display dicts, one per row id
+        self._build_rows = build_rows
+        self._rows = []
+        self._stale = set()
+
+    def invalidate(self, row):
+        self._stale.add(row)
+
+    def invalidate_all(self):
+        self._rows = []
+        self._stale.clear()
+
+    def rows(self, stats, row_ids=None):
+        # All rows, or just row_ids (only those are rebuilt if stale).
+        size = len(stats)
+        cached = len(self._rows)
+        if cached > size:
+            del self._rows[size:]
+        elif cached < size:
+            # New players are always built on first read.
+            self._stale.update(range(cached, size))
+            self._rows.extend([None] * (size - cached))
+
+        if row_ids is None:
+            stale = sorted(row for row in self._stale if row < size)
+            self._stale.clear()
+        else:
+            stale = sorted(set(row_ids) & self._stale)
+            self._stale.difference_update(stale)
+        if stale:
+            for row, built in zip(stale, self._build_rows(stats, stale)):
+                self._rows[row] = built
+
+        if row_ids is None:
+            return list(self._rows)
+        return [self._rows[row] for row in row_ids]
@@ -0,0 +1,94 @@
+# formatting.py
+#
+# Column-at-a-time versions of the display formatters in formulas.py, for
+# the table builders and exports. Rate columns take few distinct strings
+# (.000 through 1.000+, IP in tenths, ERA/WHIP in hundredths), so each
+# column is rounded in one NumPy pass and its strings are looked up in
+# tables built once at import; every row with the same value shares one
+# string object. Output matches the scalar formatters exactly.
+
+import numpy as np
+
+from .formulas import format_ip, format_rate, format_three_decimal_rate
+
+# Shorter columns (a tap's few dirty rows) are cheaper to format one by one
+SMALL_COLUMN = 32
+
+
+def _table(fmt, scale, size):
+    return np.array([fmt(k / scale) for k in range(size)], dtype=object)
+
+
+# .000 - 5.000 (the highest possible OPS), 0.0 - 999.9 IP, 0.00 - 99.99
+_THOUSANDTHS = _table(format_three_decimal_rate, 1000, 5_001)
+_TENTHS = _table(format_ip, 10, 10_000)
+_HUNDREDTHS = _table(format_rate, 100, 10_000)
+
+
+def format_distinct(values, fmt):
+    # fmt(value) for a whole float column -> list of str, calling fmt once
+    # per distinct value. Values are grouped by bit pattern, so -0.0 and
+    # 0.0 stay apart.
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if len(values) < SMALL_COLUMN:
+        return [fmt(v) for v in values.tolist()]
+    bits, inverse = np.unique(values.view(np.int64), return_inverse=True)
+    strings = np.array([fmt(v) for v in bits.view(np.float64).tolist()], dtype=object)
+    return strings[inverse].tolist()
+
+
+def _format_fixed(values, fmt, scale, table, rounds_scaled):
+    # Rows whose value rounds to k units of 1/scale get table[k]; the
+    # rest (out of range, NaN, ...) go through format_distinct.
+    # rounds_scaled: fmt is literally int(round(v * scale)), so np.rint
+    # of the same product agrees everywhere. Otherwise fmt is "%.Nf",
+    # which rounds the exact decimal value, and anything within a hair of
+    # a half (or -0.0, printed "-0.00") is left to fmt.
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < SMALL_COLUMN:
+        return [fmt(v) for v in values.tolist()]
+    scaled = values * scale
+    keys = np.rint(scaled)
+    lookup = (keys >= 0) & (keys < len(table))
+    if not rounds_scaled:
+        lookup &= ~np.signbit(values)
+        with np.errstate(invalid="ignore"):  # inf - inf
+            lookup &= np.abs(scaled - np.floor(scaled) - 0.5) > 1e-6
+    if lookup.all():
+        return table[keys.astype(np.intp)].tolist()
+
+    out = np.empty(len(values), dtype=object)
+    out[lookup] = table[keys[lookup].astype(np.intp)]
+    rest = ~lookup
+    out[rest] = format_distinct(values[rest], fmt)
+    return out.tolist()
+
+
+def format_thousandths(values, fmt=format_three_decimal_rate):
+    # .375-style rates (format_batting_average prints the same way)
+    return _format_fixed(values, fmt, 1000, _THOUSANDTHS, True)
+
+
+def format_ip_column(values):
+    return _format_fixed(values, format_ip, 10, _TENTHS, False)
+
+
+def format_rate_column(values):
+    return _format_fixed(values, format_rate, 100, _HUNDREDTHS, False)
+
+
+# Rate stat (rates.RATE_FIELDS) -> column formatter
+RATE_COLUMN_FORMATS = {
+    "AVG": format_thousandths,
+    "OBP": format_thousandths,
+    "SLG": format_thousandths,
+    "OPS": format_thousandths,
+    "IP": format_ip_column,
+    "ERA": format_rate_column,
+    "WHIP": format_rate_column,
+}
+
+
+def batch_format_rates(rates):
+    # {rate: float column} from batch_rate_stats -> {rate: list of str}
+    return {name: RATE_COLUMN_FORMATS[name](col) for name, col in rates.items()}
@@ -0,0 +1,51 @@
+# formulas.py
+#
+# Scalar stat formulas and display formatters (pure Python, no NumPy).
+
+
+def calculate_batting_average(s, d, t, hr, ab):
+    hits = s + d + t + hr
+    return hits / ab if ab > 0 else 0.0
+
+
+def format_batting_average(avg):
+    return f".{int(round(avg * 1000)):03d}"
+
+
+def calculate_ip(outs):
+    return outs / 3.0
+
+
+def format_ip(ip):
+    # One decimal place, e.g., 3.0, 4.2
+    return f"{ip:.1f}"
+
+
+def calculate_era(er, outs):
+    ip = calculate_ip(outs)
+    return (9.0 * er / ip) if ip > 0 else 0.0
+
+
+def calculate_whip(bb, h, outs):
+    ip = calculate_ip(outs)
+    return ((bb + h) / ip) if ip > 0 else 0.0
+
+
+def calculate_obp(s, d, t, hr, bb, ab):
+    hits = s + d + t + hr
+    denom = ab + bb
+    return hits / denom if denom > 0 else 0.0
+
+
+def calculate_slg(s, d, t, hr, ab):
+    total_bases = s + 2 * d + 3 * t + 4 * hr
+    return total_bases / ab if ab > 0 else 0.0
+
+
+def format_three_decimal_rate(val):
+    # Format like .375, .900, etc.
+    return f".{int(round(val * 1000)):03d}"
+
+
+def format_rate(val):
+    return f"{val:.2f}"
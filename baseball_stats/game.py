@@ -0,0 +1,378 @@
+# game.py
+#
+# GameState: the explicit state object behind the app and headless jobs.
+# It owns the stats store, the play log, the derived-row cache, the lineup
+# and the current batter, and exposes the stat-mutating operations that
+# used to live in app.py on top of st.session_state. Finished games go to a
+# SeasonBook; whatever was recorded since the last finished game (taps,
+# Add/Merge entries, imports) is the current game's line.
+#
+# One GameState can be shared by several threads (app sessions scoring
+# into the same database): its operations hold `lock`.
+#
+# Only the store, play log and season model are imported with this module.
+# The summary rows, tables, leaderboards and base-out tracker load when
+# the first GameState is built (every instance uses them); import,
+# snapshots and exports load on first use. So importing GameState costs
+# little beyond NumPy, but constructing one loads most of the package.
+
+import functools
+import threading
+
+from .derived import DerivedRowCache
+from .playlog import MERGE_MODE, PlayLog, make_play_event
+from .season import SeasonBook, game_line
+from .store import STAT_FIELDS, StatsStore, name_key
+
+
+def merge_or_add_player(stats, new_entry):
+    return stats.merge_or_add(new_entry)
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class GameState:
+    def __init__(self, stats=None, play_log=None, season=None, game_base=None,
+                 base_out=None):
+        from .baseout import BaseOutTracker
+        from .leaders import LeaderboardIndex
+        from .summary import build_summary_rows
+        from .tables import SummaryTableView
+
+        self.lock = threading.RLock()
+        self.stats = stats if stats is not None else StatsStore()
+        self.play_log = play_log if play_log is not None else PlayLog(base=self.stats)
+        self.season = season if season is not None else SeasonBook()
+        # Totals when the current game started
+        self.game_base = game_base if game_base is not None else self.stats.copy()
+        # Formatted summary rows, rebuilt per touched player
+        self.summary_cache = DerivedRowCache(build_summary_rows)
+        # Sorted / filtered pages over the same cached rows
+        self.table_view = SummaryTableView(self.summary_cache)
+        # Top-K heaps per leaderboard, re-keyed per touched player
+        self.leaders = LeaderboardIndex()
+        # Serialized TXT/CSV exports, keyed by stats version
+        self.export_cache = {}
+        # Inning / base-out state and run expectancy, following the log
+        if base_out is None:
+            base_out = BaseOutTracker.from_events(self.play_log.events)
+        self.base_out = base_out
+        # Saved to the journal when set (see the properties below)
+        self._lineup = []
+        self._current_batter_index = 0
+        self.auto_advance = True
+
+    @classmethod
+    def restore(cls, storage):
+        # Last saved state from a durable journal (storage.SQLiteStorage).
+        from .baseout import BaseOutTracker
+
+        play_log, stats = PlayLog.restore(*storage.load(), journal=storage)
+        games, game_base = storage.load_season()
+        season = SeasonBook()
+        for info, line in games:
+            season.add_game(info.date, info.opponent, line, game_id=info.game_id)
+        lineup, current_batter_index = storage.load_lineup()
+        # The tracker replays only the events after its newest saved state
+        state, events = storage.load_base_out()
+        base_out = BaseOutTracker.from_events(events, state)
+        game = cls(stats, play_log, season, game_base, base_out)
+        game._lineup = lineup
+        game._current_batter_index = current_batter_index
+        return game
+
+    @_locked
+    def save_snapshot(self, target):
+        # Binary snapshot of the stats, play log, lineup and current batter
+        # (snapshot.py); target is a path or a writable binary file.
+        from .snapshot import save_snapshot
+
+        save_snapshot(self, target)
+
+    @_locked
+    def load_snapshot(self, source):
+        # Replaces the stats, play log, lineup and current batter with a
+        # saved snapshot. Finished games stay; the current game restarts
+        # from the loaded totals.
+        from .baseout import BaseOutTracker
+        from .snapshot import load_snapshot
+
+        snap = load_snapshot(source)
+        journal = self._journal
+        self.play_log, self.stats = PlayLog.restore(
+            snap.base, 0, snap.events, snap.cursor, stats=snap.stats
+        )
+        if journal is not None:
+            # Rewrite the journal to match, so a restart comes back here.
+            journal.reset(snap.base)
+            for seq, event in enumerate(snap.events, 1):
+                journal.append(seq, event)
+            journal.set_cursor(snap.cursor)
+            self.play_log.journal = journal
+        self._invalidate_all()
+        self.base_out = BaseOutTracker.from_events(self.play_log.events)
+        self.lineup = snap.lineup
+        self.current_batter_index = snap.current_batter_index
+        self.game_base = self.stats.copy()
+        self._save_game_base()
+        return snap
+
+    def sync(self):
+        # A local game is always current; shared games (client.SharedGame)
+        # apply the server's pushed changes here. Returns True if anything
+        # changed.
+        return False
+
+    @property
+    def _journal(self):
+        return self.play_log.journal
+
+    # ----------------------------------------
+    # Lineup / current batter
+    # ----------------------------------------
+
+    @property
+    def lineup(self):
+        return self._lineup
+
+    @lineup.setter
+    def lineup(self, names):
+        self._lineup = list(names)
+        self._save_lineup()
+
+    @property
+    def current_batter_index(self):
+        return self._current_batter_index
+
+    @current_batter_index.setter
+    def current_batter_index(self, index):
+        if index != self._current_batter_index:
+            self._current_batter_index = index
+            self._save_lineup()
+
+    def _save_lineup(self):
+        if self._journal is not None:
+            self._journal.set_lineup(list(self._lineup), self._current_batter_index)
+
+    # ----------------------------------------
+    # Lookups / derived views
+    # ----------------------------------------
+
+    @_locked
+    def get_player_by_name(self, name):
+        row = self.stats.row_of(name)
+        return self.stats.player(row) if row is not None else None
+
+    @_locked
+    def summary_rows(self, names=None):
+        # Every player, or just `names` (unknown names are skipped).
+        if names is None:
+            return self.summary_cache.rows(self.stats)
+        rows = [self.stats.row_of(name) for name in names]
+        return self.summary_cache.rows(
+            self.stats, [row for row in rows if row is not None]
+        )
+
+    @_locked
+    def summary_page(self, page=0, page_size=50, sort_by=None, descending=False,
+                     query=""):
+        # -> (display rows for one page, number of matching players)
+        return self.table_view.page(
+            self.stats, page, page_size, sort_by, descending, query
+        )
+
+    @_locked
+    def leaderboard(self, board, k=10):
+        return self.leaders.rows(self.stats, board, k)
+
+    @_locked
+    def export(self, kind):
+        # Serialized on demand and cached by store version, so an unchanged
+        # dataset is never serialized twice.
+        version = self.stats.version
+        hit = self.export_cache.get(kind)
+        if hit is None or hit[0] != version:
+            from .summary import EXPORT_FORMATS
+
+            hit = (version, "".join(EXPORT_FORMATS[kind](self.stats)))
+            self.export_cache[kind] = hit
+        return hit[1]
+
+    def _invalidate(self, row):
+        # Derived views keyed by row: summary rows and leaderboards
+        self.summary_cache.invalidate(row)
+        self.leaders.invalidate(row)
+
+    def _invalidate_all(self):
+        self.summary_cache.invalidate_all()
+        self.leaders.invalidate_all()
+
+    # ----------------------------------------
+    # Roster edits
+    # ----------------------------------------
+
+    @_locked
+    def rename_player(self, old_name, new_name):
+        row = self.stats.rename_player(old_name, new_name)
+        self._invalidate(row)
+        self.lineup = [
+            new_name if name_key(n) == name_key(old_name) else n
+            for n in self.lineup
+        ]
+        if old_name in self.game_base:
+            self.game_base.rename_player(old_name, new_name)
+            self._save_game_base()
+        # Logged events refer to players by name, so roster edits start a
+        # new undo history from the current totals.
+        self._reset_history()
+
+    @_locked
+    def remove_player(self, name):
+        self.stats.remove_player(name)
+        self._invalidate_all()
+        self.lineup = [n for n in self.lineup if name_key(n) != name_key(name)]
+        if name in self.game_base:
+            self.game_base.remove_player(name)
+            self._save_game_base()
+        self._reset_history()
+
+    @_locked
+    def record_merge_entry(self, entry):
+        # Checked with the import rules (whole, non-negative counts, hits
+        # within at bats, totals that fit a column); ValueError if not.
+        from .importer import validate_entry
+
+        error = validate_entry(self.stats, entry)
+        if error is not None:
+            raise ValueError(error)
+        result = "merged" if entry["Player"] in self.stats else "added"
+        event = make_play_event(
+            entry["Player"],
+            MERGE_MODE,
+            "Add/Merge",
+            deltas={field: entry.get(field, 0) for field in STAT_FIELDS},
+        )
+        row = self.play_log.append(event, self.stats)
+        self._apply_base_out(event)
+        self._invalidate(row)
+        return result
+
+    @_locked
+    def import_csv(self, source):
+        from .importer import import_csv
+
+        report = import_csv(self.stats, source)
+        self._invalidate_all()
+        # Bulk merges bypass the event log, so history restarts from the new
+        # totals (same as rename / remove).
+        self._reset_history()
+        return report
+
+    def _reset_history(self):
+        # The tracker keeps its state and matrix across the reset; the
+        # journal saves them as the new history's starting point.
+        self.play_log.reset(self.stats)
+        self.base_out.checkpoint()
+        self._save_base_out()
+
+    def _apply_base_out(self, event):
+        # After a play log append; the tracker's state goes with any
+        # snapshot the log just took.
+        self.base_out.apply(event)
+        if self.play_log.at_snapshot:
+            self._save_base_out()
+
+    def _save_base_out(self):
+        if self._journal is not None:
+            self._journal.set_base_out(self.play_log.seq, self.base_out.to_state())
+
+    # ----------------------------------------
+    # Games / season
+    # ----------------------------------------
+
+    @_locked
+    def current_game_line(self):
+        return game_line(self.stats, self.game_base)
+
+    @_locked
+    def finish_game(self, day, opponent):
+        # Files everything recorded since the last finished game as one
+        # game and starts the next one. Undo stops at the game boundary:
+        # plays in a filed game can't be taken back.
+        line = self.current_game_line()
+        if not len(line):
+            raise ValueError("No stats recorded since the last finished game.")
+        info = self.season.add_game(day, opponent, line)
+        self.game_base = self.stats.copy()
+        self.base_out.new_game()
+        self._reset_history()
+        if self._journal is not None:
+            self._journal.save_game(info, line)
+        self._save_game_base()
+        return info
+
+    @_locked
+    def delete_game(self, game_id):
+        # Drops the game from the season rollups; live totals are untouched.
+        info = self.season.remove_game(game_id)
+        if self._journal is not None:
+            self._journal.delete_game(game_id)
+        return info
+
+    def _save_game_base(self):
+        if self._journal is not None:
+            self._journal.set_game_base(self.game_base.copy())
+
+    # ----------------------------------------
+    # Fast Tap
+    # ----------------------------------------
+
+    def _advance_batter(self, from_index):
+        # Auto-advance still tied to hitting / lineup
+        if self.auto_advance and self.lineup:
+            self.current_batter_index = (from_index + 1) % len(self.lineup)
+
+    @_locked
+    def record_fast_tap_play(self, player_name, play_type, mode="hitting"):
+        event = make_play_event(
+            player_name,
+            mode,
+            play_type,
+            batter_index=self.current_batter_index,
+        )
+        row = self.play_log.append(event, self.stats)
+        self._apply_base_out(event)
+        self._invalidate(row)
+        if mode == "hitting":
+            self._advance_batter(self.current_batter_index)
+        return event
+
+    @_locked
+    def undo_last_play(self):
+        event = self.play_log.undo(self.stats)
+        if event is None:
+            return None
+        self.base_out.undo()
+        self._invalidate(self.stats.row_of(event.player))
+        # Restore batter index only for hitting plays
+        if event.mode == "hitting":
+            self.current_batter_index = event.batter_index
+        return event
+
+    @_locked
+    def redo_last_play(self):
+        event = self.play_log.redo(self.stats)
+        if event is None:
+            return None
+        self.base_out.apply(event)
+        self._invalidate(self.stats.row_of(event.player))
+        if event.mode == "hitting":
+            self.current_batter_index = event.batter_index
+            self._advance_batter(event.batter_index)
+        return event
@@ -0,0 +1,252 @@
+# importer.py
+#
+# Bulk CSV import of box scores. Accepts either the exporter's layout
+# ("Player","AB","1B",...,"WHIP"; rate columns are ignored and IP is turned
+# back into outs) or a raw counting-stat layout ("Player","At Bats",...,
+# "Pitch_H"). Rows are read as a stream, validated a batch at a time and
+# merged into the store with one vectorized add per column.
+
+import csv
+import io
+from collections import namedtuple
+from operator import itemgetter
+
+import numpy as np
+
+from .store import COUNT_ABBREVIATIONS, STAT_FIELDS, STAT_MAX, name_key
+
+IMPORT_BATCH_ROWS = 10_000
+
+ImportReport = namedtuple(
+    "ImportReport", ["rows_read", "rows_imported", "players_added", "errors"]
+)
+
+# line is the 1-based line number in the file where the row ends
+RowError = namedtuple("RowError", ["line", "player", "message"])
+
+
+def _header_map(header):
+    # -> (player column, {field: column}, IP column or None)
+    lookup = {name.lower(): field for name, field in COUNT_ABBREVIATIONS.items()}
+    lookup.update({field.lower(): field for field in STAT_FIELDS})
+
+    player_col = None
+    field_cols = {}
+    ip_col = None
+    for i, name in enumerate(header):
+        key = name.strip().lower()
+        if key == "player":
+            player_col = i
+        elif key == "ip":
+            ip_col = i
+        elif key in lookup:
+            field_cols[lookup[key]] = i
+
+    if player_col is None:
+        raise ValueError("CSV is missing a 'Player' column.")
+    if "Pitch_Outs" in field_cols:
+        ip_col = None  # raw outs win over the rounded IP display value
+    return player_col, field_cols, ip_col
+
+
+def _to_values(raw, n_counts, has_ip):
+    # OverflowError for numbers past int64 (or an IP that isn't finite)
+    values = raw[:, :n_counts].astype(np.int64)
+    if has_ip:
+        outs = np.rint(raw[:, n_counts].astype(np.float64) * 3)
+        if not (np.abs(outs) <= STAT_MAX + 1).all():
+            raise OverflowError("IP out of range")
+        values = np.column_stack([values, outs.astype(np.int64)])
+    return values
+
+
+def _parse_batch(cells, n_counts, has_ip):
+    # cells: one tuple of strings per row, the counting stats followed by
+    # IP when has_ip. Returns an int64 matrix (IP converted to outs) plus
+    # {batch index: message} for rows that won't parse.
+    n_rows = len(cells)
+    raw = np.char.strip(np.array(cells, dtype=str).reshape(n_rows, n_counts + has_ip))
+    raw = np.where(raw == "", "0", raw)
+    try:
+        return _to_values(raw, n_counts, has_ip), {}
+    except (ValueError, OverflowError):
+        pass
+
+    # Mask out rows with a non-integer cell, then parse the rest in one go.
+    ok = np.char.isdecimal(np.char.lstrip(raw[:, :n_counts], "+-")).all(axis=1)
+    if has_ip:
+        for i, cell in enumerate(raw[:, n_counts]):
+            try:
+                float(cell)
+            except ValueError:
+                ok[i] = False
+
+    values = np.zeros((n_rows, n_counts + has_ip), dtype=np.int64)
+    too_large = []
+    try:
+        values[ok] = _to_values(raw[ok], n_counts, has_ip)
+    except (ValueError, OverflowError):
+        # isdecimal accepts a few digits int() doesn't, and a number can be
+        # too big even for int64; go row by row.
+        for i in np.flatnonzero(ok):
+            try:
+                values[i] = _to_values(raw[i:i + 1], n_counts, has_ip)
+            except ValueError:
+                ok[i] = False
+            except OverflowError:
+                ok[i] = False
+                too_large.append(int(i))
+    bad = {int(i): "Stats must be whole numbers." for i in np.flatnonzero(~ok)}
+    bad.update((i, f"Stats can't be larger than {STAT_MAX:,}.") for i in too_large)
+    return values, bad
+
+
+def _merged_totals(stats, names, values, fields, ok):
+    # Each row's totals once it and the ok rows before it are merged:
+    # the player's current stats plus a running sum per name.
+    rows = [stats.row_of(name) for name in names]
+    known = [i for i, row in enumerate(rows) if row is not None]
+    totals = np.zeros(values.shape, dtype=np.int64)
+    if known:
+        existing = np.array([rows[i] for i in known], dtype=np.intp)
+        for j, field in enumerate(fields):
+            totals[known, j] = stats.column(field)[existing]
+
+    # Rows grouped by name (stable, so row order within a name is kept);
+    # a cumulative sum minus the sum before each group's first row
+    _, group = np.unique([name_key(name) for name in names], return_inverse=True)
+    order = np.argsort(group, kind="stable")
+    added = np.where(ok[:, None], values, 0)[order]
+    running = np.cumsum(added, axis=0)
+    starts = np.r_[0, np.flatnonzero(np.diff(group[order])) + 1]
+    lengths = np.diff(np.r_[starts, len(names)])
+    running -= np.repeat(running[starts] - added[starts], lengths, axis=0)
+    totals[order] += running
+    return totals
+
+
+def _validate(stats, names, values, fields, bad):
+    col = {field: values[:, j] for j, field in enumerate(fields)}
+    zero = np.zeros(len(names), dtype=np.int64)
+
+    negative = (values < 0).any(axis=1)
+    too_large = (values > STAT_MAX).any(axis=1)
+    hits = (col.get("Singles", zero) + col.get("Doubles", zero)
+            + col.get("Triples", zero) + col.get("Home Runs", zero))
+    too_many_hits = hits > col.get("At Bats", zero)
+    empty = values.sum(axis=1) == 0
+
+    with_stats = {name_key(names[i]) for i in np.flatnonzero(~empty)}
+    for i in np.flatnonzero(negative | too_large | too_many_hits | empty).tolist():
+        if i in bad:
+            continue
+        if negative[i]:
+            bad[i] = "Stats can't be negative."
+        elif too_large[i]:
+            bad[i] = f"Stats can't be larger than {STAT_MAX:,}."
+        elif too_many_hits[i]:
+            bad[i] = "Too many hits for At Bats."
+        elif names[i] not in stats and name_key(names[i]) not in with_stats:
+            bad[i] = "Please enter stats for a new player."
+    for i, name in enumerate(names):
+        if not name and i not in bad:
+            bad[i] = "Missing player name."
+
+    # Rows that would push a player's totals past the column limit. Only
+    # the first such row per player is certain (a rejected row doesn't add
+    # to the ones after it), so reject those and check again.
+    ok = np.ones(len(names), dtype=bool)
+    ok[list(bad)] = False
+    while ok.any():
+        overflow = (_merged_totals(stats, names, values, fields, ok) > STAT_MAX).any(axis=1)
+        first = {}
+        for i in np.flatnonzero(overflow & ok).tolist():
+            first.setdefault(name_key(names[i]), i)
+        if not first:
+            break
+        for i in first.values():
+            bad[i] = f"Totals would be larger than {STAT_MAX:,}."
+            ok[i] = False
+    return bad
+
+
+def validate_entry(stats, entry):
+    # One Add/Merge entry ({"Player": name, field: count, ...}) from outside
+    # the app's form, checked with the import rules. -> error message, or
+    # None if it can be merged. Nothing is changed.
+    name = entry.get("Player")
+    if not isinstance(name, str) or not name.strip():
+        return "Missing player name."
+    values = []
+    for field in STAT_FIELDS:
+        value = entry.get(field, 0)
+        if isinstance(value, bool) or not isinstance(value, int):
+            return "Stats must be whole numbers."
+        values.append(min(max(value, -1), STAT_MAX + 1))  # fits int64
+    bad = _validate(stats, [name.strip()], np.array([values], dtype=np.int64),
+                    STAT_FIELDS, {})
+    return bad.get(0)
+
+
+def format_error_report(errors):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Line", "Player", "Error"])
+    writer.writerows(errors)
+    return buffer.getvalue()
+
+
+def import_csv(stats, source, batch_rows=IMPORT_BATCH_ROWS):
+    # source is a text file object (or any iterable of CSV lines).
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        return ImportReport(0, 0, 0, [])
+
+    player_col, field_cols, ip_col = _header_map(header)
+    fields = list(field_cols)
+    take = [field_cols[f] for f in fields]
+    has_ip = ip_col is not None
+    if has_ip:
+        take.append(ip_col)
+    fields_out = fields + ["Pitch_Outs"] if has_ip else fields
+    width = len(header)
+    pick = itemgetter(*take) if len(take) > 1 else (lambda row: tuple(row[i] for i in take))
+
+    rows_read = rows_imported = players_added = 0
+    errors = []
+
+    def flush(batch):
+        nonlocal rows_imported, players_added
+        names = [name for _, name, _ in batch]
+        values, bad = _parse_batch([cells for _, _, cells in batch], len(fields), has_ip)
+        bad = _validate(stats, names, values, fields_out, bad)
+        for i in sorted(bad):
+            errors.append(RowError(batch[i][0], names[i], bad[i]))
+
+        keep = np.ones(len(batch), dtype=bool)
+        keep[list(bad)] = False
+        if keep.any():
+            kept_names = [n for n, k in zip(names, keep) if k]
+            players_added += stats.merge_columns(
+                kept_names,
+                {field: values[keep, j] for j, field in enumerate(fields_out)},
+            )
+            rows_imported += int(keep.sum())
+
+    batch = []
+    for row in reader:
+        line = reader.line_num
+        if not any(cell.strip() for cell in row):
+            continue
+        rows_read += 1
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        batch.append((line, row[player_col].strip(), pick(row)))
+        if len(batch) >= batch_rows:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    return ImportReport(rows_read, rows_imported, players_added, errors)
@@ -0,0 +1,131 @@
+# ingest.py
+#
+# Asyncio feed client for the scoring server's batched "ingest" op: for
+# automated sources such as a pitch-tracking stand-in or a scripted
+# replay. Plays are sent in batches with a bounded number of batches in
+# flight, so a producer that outruns the server waits for acks instead of
+# piling up memory.
+#
+#   python -m baseball_stats ingest replay.csv --port 8765
+#   python -m baseball_stats ingest --synthetic 100000
+
+import asyncio
+import csv
+import itertools
+import json
+from collections import namedtuple
+
+from .server import DEFAULT_HOST, DEFAULT_PORT, INGEST_MAX_EVENTS, MAX_LINE_BYTES, dumps
+
+INGEST_BATCH_EVENTS = 2_000
+INGEST_WINDOW = 4
+
+# rejected: [(index of the play in the stream, message)], including every
+# play of a batch the server refused; errors: the message for each such
+# batch
+IngestResult = namedtuple("IngestResult", ["sent", "accepted", "rejected", "errors"])
+
+
+class IngestClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 batch_events=INGEST_BATCH_EVENTS, window=INGEST_WINDOW):
+        if not 1 <= batch_events <= INGEST_MAX_EVENTS:
+            raise ValueError(f"Batches must hold 1 to {INGEST_MAX_EVENTS} plays.")
+        self.host = host
+        self.port = port
+        self.batch_events = batch_events
+        self.window = window
+        self.sent = 0
+        self.accepted = 0
+        self.rejected = []
+        self.errors = []
+        self._batch = []
+        self._ids = itertools.count(1)
+        self._in_flight = {}  # request id -> (index of its first play, plays)
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port, limit=MAX_LINE_BYTES
+        )
+        self._slots = asyncio.Semaphore(self.window)
+        self._acks = asyncio.create_task(self._read_acks())
+        return self
+
+    async def send(self, player, play_type, mode="hitting"):
+        self._batch.append([player, play_type, mode])
+        if len(self._batch) >= self.batch_events:
+            await self.flush()
+
+    async def send_many(self, plays):
+        # plays: iterable of (player, play_type) or (player, play_type, mode)
+        for play in plays:
+            await self.send(*play)
+
+    async def flush(self):
+        if not self._batch:
+            return
+        # Waits here while `window` batches are still unacknowledged.
+        await self._slots.acquire()
+        if self._acks.done():
+            raise ConnectionError("Lost connection to the scoring server.")
+        batch, self._batch = self._batch, []
+        request_id = next(self._ids)
+        self._in_flight[request_id] = (self.sent, len(batch))
+        self.sent += len(batch)
+        self._writer.write(dumps({"id": request_id, "op": "ingest", "events": batch}))
+        await self._writer.drain()
+
+    async def _read_acks(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                ack = json.loads(line)
+                batch = self._in_flight.pop(ack.get("id"), None)
+                if batch is None:
+                    continue
+                start, size = batch
+                if ack["ok"]:
+                    self.accepted += ack["accepted"]
+                    self.rejected.extend((start + i, msg) for i, msg in ack["rejected"])
+                else:
+                    # The whole batch was dropped
+                    self.errors.append(ack["error"])
+                    self.rejected.extend((start + i, ack["error"]) for i in range(size))
+                self._slots.release()
+        finally:
+            # Unblock flush()/close() if the server went away.
+            for _ in range(self.window):
+                self._slots.release()
+
+    async def close(self):
+        # Sends what's left and waits for every ack.
+        await self.flush()
+        for _ in range(self.window):
+            await self._slots.acquire()
+        self._writer.close()
+        self._acks.cancel()
+        if self._in_flight:
+            raise ConnectionError(
+                f"{len(self._in_flight)} batches were not acknowledged."
+            )
+        return IngestResult(self.sent, self.accepted, self.rejected, self.errors)
+
+
+async def ingest_plays(plays, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                       batch_events=INGEST_BATCH_EVENTS, window=INGEST_WINDOW):
+    client = await IngestClient(host, port, batch_events, window).connect()
+    await client.send_many(plays)
+    return await client.close()
+
+
+def read_replay(path):
+    # Replay file: CSV rows of player, play_type and optional mode
+    # (default hitting). Blank lines and a "Player" header are skipped.
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            row = [cell.strip() for cell in row]
+            if not any(row) or row[0].lower() == "player":
+                continue
+            yield row[:3]
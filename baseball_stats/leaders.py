@@ -0,0 +1,157 @@
+# leaders.py
+#
+# Leaderboards kept as heap indexes instead of sorting the league on every
+# render. Writers mark the rows they touched (like derived.DerivedRowCache);
+# a read re-keys only those rows, pushes fresh heap entries and skips stale
+# ones lazily, so a tap costs O(log n) per board rather than a full sort.
+
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+from .rates import batch_rate_stats
+from .summary import SUMMARY_RATE_FORMATS
+
+LEADER_MIN_PA = 10
+LEADER_MIN_IP = 3.0
+
+# value(cols, rates) -> array; qualifies(cols, min_pa, min_outs) -> bool array
+Leaderboard = namedtuple(
+    "Leaderboard", ["title", "column", "value", "descending", "qualifies"]
+)
+
+
+def _plate_appearances(cols):
+    return cols["At Bats"].astype(np.int64) + cols["Walks"]
+
+
+def _has_pa(cols, min_pa, min_outs):
+    return _plate_appearances(cols) >= max(min_pa, 1)
+
+
+def _has_ip(cols, min_pa, min_outs):
+    return cols["Pitch_Outs"] >= max(min_outs, 1)
+
+
+def _positive(field):
+    return lambda cols, min_pa, min_outs: cols[field] > 0
+
+
+def _count(field):
+    return lambda cols, rates: cols[field]
+
+
+def _rate(name):
+    return lambda cols, rates: rates[name]
+
+
+LEADERBOARDS = {
+    "HR": Leaderboard("Home Runs", "HR", _count("Home Runs"), True, _positive("Home Runs")),
+    "AVG": Leaderboard("Batting Average", "AVG", _rate("AVG"), True, _has_pa),
+    "OPS": Leaderboard("OPS", "OPS", _rate("OPS"), True, _has_pa),
+    "RBI": Leaderboard("RBIs", "RBI", _count("RBIs"), True, _positive("RBIs")),
+    "SB": Leaderboard("Stolen Bases", "SB", _count("Stolen Bases"), True, _positive("Stolen Bases")),
+    "ERA": Leaderboard("ERA", "ERA", _rate("ERA"), False, _has_ip),
+    "WHIP": Leaderboard("WHIP", "WHIP", _rate("WHIP"), False, _has_ip),
+    "K (P)": Leaderboard("Pitching Strikeouts", "K (P)", _count("Pitch_K"), True, _positive("Pitch_K")),
+}
+
+
+class LeaderboardIndex:
+    def __init__(self, min_pa=LEADER_MIN_PA, min_ip=LEADER_MIN_IP, boards=LEADERBOARDS):
+        self.boards = boards
+        self.min_pa = min_pa
+        self.min_ip = min_ip
+        # board -> heap of (sort key, row, stamp); an entry is live only
+        # while its stamp matches the row's current stamp.
+        self._heaps = None
+        self._stamps = []
+        self._stale = set()
+
+    def invalidate(self, row):
+        self._stale.add(row)
+
+    def invalidate_all(self):
+        self._heaps = None
+        self._stale.clear()
+
+    def set_qualifiers(self, min_pa, min_ip):
+        if (min_pa, min_ip) != (self.min_pa, self.min_ip):
+            self.min_pa = min_pa
+            self.min_ip = min_ip
+            self.invalidate_all()
+
+    def _entries(self, stats, rows):
+        # {board: [(key, row)]} for the qualifying rows among `rows`.
+        cols = {field: col[rows] for field, col in stats.columns().items()}
+        rates = batch_rate_stats(cols)
+        min_outs = int(round(self.min_ip * 3))
+        entries = {}
+        for name, board in self.boards.items():
+            ok = board.qualifies(cols, self.min_pa, min_outs)
+            values = board.value(cols, rates)[ok].tolist()
+            keys = [-v for v in values] if board.descending else values
+            entries[name] = list(zip(keys, rows[ok].tolist()))
+        return entries
+
+    def _rebuild(self, stats):
+        size = len(stats)
+        self._stamps = [0] * size
+        self._heaps = {}
+        for name, pairs in self._entries(stats, np.arange(size)).items():
+            heap = [(key, row, 0) for key, row in pairs]
+            heapq.heapify(heap)
+            self._heaps[name] = heap
+        self._stale.clear()
+
+    def _refresh(self, stats):
+        size = len(stats)
+        if self._heaps is None or len(self._stamps) > size:
+            # First read, or rows were removed and shifted.
+            self._rebuild(stats)
+            return
+        if len(self._stamps) < size:
+            self._stale.update(range(len(self._stamps), size))
+            self._stamps.extend([0] * (size - len(self._stamps)))
+        if not self._stale:
+            return
+
+        rows = np.fromiter(sorted(self._stale), dtype=np.intp, count=len(self._stale))
+        self._stale.clear()
+        stamps = self._stamps
+        for row in rows.tolist():
+            stamps[row] += 1
+        for name, pairs in self._entries(stats, rows).items():
+            heap = self._heaps[name]
+            for key, row in pairs:
+                heapq.heappush(heap, (key, row, stamps[row]))
+            if len(heap) > 2 * size + 64:
+                # Mostly stale entries: compact.
+                heap[:] = [e for e in heap if e[2] == stamps[e[1]]]
+                heapq.heapify(heap)
+
+    def top(self, stats, board, k=10):
+        # -> [(row, value)] best first; pops stale entries for good and
+        # puts the live ones back.
+        self._refresh(stats)
+        heap = self._heaps[board]
+        stamps = self._stamps
+        live = []
+        while heap and len(live) < k:
+            entry = heapq.heappop(heap)
+            if entry[2] == stamps[entry[1]]:
+                live.append(entry)
+        for entry in live:
+            heapq.heappush(heap, entry)
+        descending = self.boards[board].descending
+        return [(row, -key if descending else key) for key, row, _ in live]
+
+    def rows(self, stats, board, k=10):
+        # Display rows for st.dataframe: rank, player and the formatted value.
+        column = self.boards[board].column
+        fmt = SUMMARY_RATE_FORMATS.get(column, str)
+        return [
+            {"Rank": rank, "Player": stats.name_at(row), column: fmt(value)}
+            for rank, (row, value) in enumerate(self.top(stats, board, k), 1)
+        ]
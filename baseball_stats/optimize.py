@@ -0,0 +1,208 @@
+# optimize.py
+#
+# Batting-order optimizer. An order's expected runs come from an exact
+# Markov chain over (outs, bases, batter due up) with the same outcome
+# probabilities and base table as the Monte Carlo simulator, so there is
+# no sampling noise to confuse the search. Every order is evaluated once
+# (memoized), candidates are evaluated in fixed-size batches with one
+# stacked linear solve each, and the search is a multi-start hill climb
+# over swaps and moves instead of all 9! orders. With jobs > 1 the starts
+# run in worker processes.
+
+import functools
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .simulate import NEXT_BASES, OUTCOMES, OUTS_MADE, RUNS_SCORED, outcome_probabilities
+
+OPTIMIZE_STARTS = 4
+# Orders per stacked solve; Q alone is orders x (24 n)^2 floats, ~12 MB
+# for 32 orders of nine.
+EXPECTED_RUNS_CHUNK = 32
+
+OptimizedLineup = namedtuple(
+    "OptimizedLineup",
+    ["lineup", "runs_per_game", "current_runs_per_game", "evaluated", "seconds"],
+)
+
+
+# ----------------------------------------
+# Exact run expectancy
+# ----------------------------------------
+
+@functools.lru_cache(maxsize=16)
+def _chain_structure(n_slots):
+    # Index arrays for every (state, outcome) edge of the half-inning
+    # chain; state = (outs * 8 + bases) * n_slots + slot. The structure
+    # doesn't depend on who bats, only the edge probabilities do.
+    src, slot_of, outcome_of, dst, runs, ends = [], [], [], [], [], []
+    for outs in range(3):
+        for bases in range(8):
+            for slot in range(n_slots):
+                state = (outs * 8 + bases) * n_slots + slot
+                after = (slot + 1) % n_slots
+                for outcome in range(len(OUTCOMES)):
+                    new_outs = outs + OUTS_MADE[outcome, bases]
+                    src.append(state)
+                    slot_of.append(slot)
+                    outcome_of.append(outcome)
+                    runs.append(RUNS_SCORED[outcome, bases])
+                    ends.append(new_outs >= 3)
+                    if new_outs >= 3:
+                        dst.append(after)  # next inning's leadoff slot
+                    else:
+                        dst.append((new_outs * 8 + NEXT_BASES[outcome, bases]) * n_slots + after)
+    return tuple(np.array(a) for a in (src, slot_of, outcome_of, dst, runs, ends))
+
+
+def expected_runs(probs, innings=9, chunk=EXPECTED_RUNS_CHUNK):
+    # probs: [orders, slots, OUTCOMES] -> expected runs per game, per order,
+    # solved `chunk` orders at a time so memory stays flat.
+    probs = np.asarray(probs, dtype=np.float64)
+    return np.concatenate([
+        _expected_runs_chunk(probs[lo:lo + chunk], innings)
+        for lo in range(0, len(probs), chunk)
+    ] or [np.zeros(0)])
+
+
+def _expected_runs_chunk(probs, innings):
+    n_orders, n_slots = probs.shape[:2]
+    n_states = 24 * n_slots
+    src, slot_of, outcome_of, dst, runs, ends = _chain_structure(n_slots)
+    p = probs[:, slot_of, outcome_of]  # [orders, edges]
+
+    # Transient transitions Q, plus per state: expected runs on the next
+    # plate appearance and the chance the inning ends with each leadoff.
+    q = np.zeros((n_orders, n_states, n_states))
+    rhs = np.zeros((n_orders, n_states, 1 + n_slots))
+    order_ix = np.arange(n_orders)[:, None]
+    keep = ~ends
+    np.add.at(q, (order_ix, src[keep], dst[keep]), p[:, keep])
+    np.add.at(rhs, (order_ix, src, 0), p * runs)
+    np.add.at(rhs, (order_ix, src[ends], 1 + dst[ends]), p[:, ends])
+
+    # (I - Q) X = rhs: X[:, state, 0] = runs to the end of the inning,
+    # X[:, state, 1:] = next inning's leadoff distribution.
+    x = np.linalg.solve(np.eye(n_states) - q, rhs)
+    leadoff = np.arange(n_slots)  # states with 0 outs, bases empty
+    inning_runs = x[:, leadoff, 0]  # [orders, leadoff slot]
+    next_leadoff = x[:, leadoff, 1:]  # [orders, leadoff slot, next leadoff]
+
+    due = np.zeros((n_orders, n_slots))
+    due[:, 0] = 1.0
+    total = np.zeros(n_orders)
+    for _ in range(innings):
+        total += (due * inning_runs).sum(axis=1)
+        due = np.einsum("os,ost->ot", due, next_leadoff)
+    return total
+
+
+class _Evaluator:
+    # Memoized expected runs for orders given as tuples of player indices.
+    def __init__(self, probs, innings):
+        self.probs = probs
+        self.innings = innings
+        self.memo = {}
+
+    def __call__(self, orders):
+        todo = [order for order in dict.fromkeys(orders) if order not in self.memo]
+        if todo:
+            values = expected_runs(self.probs[np.array(todo)], self.innings)
+            self.memo.update(zip(todo, values.tolist()))
+        return [self.memo[order] for order in orders]
+
+
+# ----------------------------------------
+# Search
+# ----------------------------------------
+
+def _neighbors(order):
+    # Every order one swap or one move (take a hitter out, reinsert
+    # elsewhere) away.
+    n = len(order)
+    seen = set()
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                continue
+            if i < j:
+                swapped = list(order)
+                swapped[i], swapped[j] = swapped[j], swapped[i]
+                seen.add(tuple(swapped))
+            moved = list(order)
+            moved.insert(j, moved.pop(i))
+            seen.add(tuple(moved))
+    seen.discard(order)
+    return list(seen)
+
+
+def _climb(evaluate, order):
+    # Steepest ascent until no neighbor is better.
+    best = evaluate([order])[0]
+    while True:
+        candidates = _neighbors(order)
+        values = evaluate(candidates)
+        top = int(np.argmax(values))
+        if values[top] <= best + 1e-12:
+            return order, best
+        order, best = candidates[top], values[top]
+
+
+def _climb_task(args):
+    probs, innings, order = args
+    evaluate = _Evaluator(probs, innings)
+    order, value = _climb(evaluate, order)
+    return order, value, len(evaluate.memo)
+
+
+def _start_orders(probs, starts, seed):
+    n = len(probs)
+    current = tuple(range(n))
+    # Classic heuristics: on-base first, then power
+    on_base = probs[:, :5].sum(axis=1)
+    power = probs[:, 1:5] @ np.arange(1, 5)
+    orders = [
+        current,
+        tuple(np.argsort(-on_base, kind="stable").tolist()),
+        tuple(np.argsort(-(on_base + power), kind="stable").tolist()),
+    ]
+    rng = np.random.default_rng(seed)
+    while len(orders) < starts:
+        orders.append(tuple(rng.permutation(n).tolist()))
+    return list(dict.fromkeys(orders))[:max(starts, 1)]
+
+
+def optimize_lineup(stats, lineup, innings=9, starts=OPTIMIZE_STARTS, jobs=1, seed=0):
+    # Best batting order found for the players in `lineup`.
+    if len(lineup) < 2:
+        raise ValueError("Need at least two players to reorder.")
+    start = time.perf_counter()
+    probs = outcome_probabilities(stats, lineup)
+    orders = _start_orders(probs, starts, seed)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs > 1 and len(orders) > 1:
+        tasks = [(probs, innings, order) for order in orders]
+        with ProcessPoolExecutor(max_workers=min(jobs, len(orders))) as pool:
+            results = list(pool.map(_climb_task, tasks))
+        evaluated = sum(count for _, _, count in results)
+    else:
+        # One memo shared by every start
+        evaluate = _Evaluator(probs, innings)
+        results = [_climb(evaluate, order) for order in orders]
+        evaluated = len(evaluate.memo)
+    best_order, best_value = max(results, key=lambda r: r[1])[:2]
+    current = expected_runs(probs[None], innings)[0]
+
+    return OptimizedLineup(
+        lineup=[lineup[i] for i in best_order],
+        runs_per_game=float(best_value),
+        current_runs_per_game=float(current),
+        evaluated=evaluated,
+        seconds=time.perf_counter() - start,
+    )
@@ -0,0 +1,214 @@
+# playlog.py
+#
+# Append-only play-by-play log. Every Fast Tap (and Add/Merge entry) is
+# stored as a compact PlayEvent; player totals are a fold over the log,
+# with periodic store snapshots so a rebuild never replays from zero.
+
+import time
+from collections import namedtuple
+
+from .store import StatsStore
+
+# ----------------------------------------
+# Play types -> counting stat deltas
+# ----------------------------------------
+PLAY_DELTAS = {
+    "hitting": {
+        "Single": {"At Bats": 1, "Singles": 1},
+        "Double": {"At Bats": 1, "Doubles": 1},
+        "Triple": {"At Bats": 1, "Triples": 1},
+        "Home Run": {"At Bats": 1, "Home Runs": 1},
+        "Walk": {"Walks": 1},
+        "Strikeout": {"At Bats": 1, "Strikeouts": 1},
+        "RBI": {"RBIs": 1},
+        "Stolen Base": {"Stolen Bases": 1},
+        "Out": {"At Bats": 1},
+    },
+    "pitching": {
+        "Pitch Strikeout": {"Pitch_Outs": 1, "Pitch_K": 1},
+        "Pitch Walk": {"Pitch_BB": 1},
+        "Pitch Hit Allowed": {"Pitch_H": 1},
+        "Pitch Earned Run": {"Pitch_ER": 1},
+        "Pitch Out": {"Pitch_Outs": 1},
+        "Pitch Inning Complete": {"Pitch_Outs": 3},
+    },
+}
+
+MERGE_MODE = "merge"
+
+# deltas is a tuple of (field, delta) pairs; batter_index is the lineup
+# position before the play.
+PlayEvent = namedtuple(
+    "PlayEvent",
+    ["player", "mode", "play_type", "deltas", "batter_index", "timestamp"],
+)
+
+
+def play_deltas(mode, play_type):
+    return PLAY_DELTAS.get(mode, {}).get(play_type, {})
+
+
+def make_play_event(player, mode, play_type, batter_index=None,
+                    deltas=None, timestamp=None):
+    if deltas is None:
+        deltas = play_deltas(mode, play_type)
+    return PlayEvent(
+        player,
+        mode,
+        play_type,
+        tuple((field, delta) for field, delta in deltas.items() if delta),
+        batter_index,
+        time.time() if timestamp is None else timestamp,
+    )
+
+
+def apply_event(stats, event, sign=1):
+    # All or nothing: if a delta can't be applied, the ones before it (and
+    # a player the event added) are rolled back before the error is raised.
+    size = len(stats)
+    row = stats.ensure_player(event.player)
+    applied = 0
+    try:
+        for field, delta in event.deltas:
+            stats.increment(row, field, sign * delta)
+            applied += 1
+    except Exception:
+        for field, delta in event.deltas[:applied]:
+            stats.increment(row, field, -sign * delta)
+        stats.truncate(size)
+        raise
+    return row
+
+
+class PlayLog:
+    def __init__(self, base=None, snapshot_every=200, max_snapshots=8,
+                 journal=None, base_seq=0):
+        self.snapshot_every = snapshot_every
+        self.max_snapshots = max_snapshots
+        # Optional durable journal (see storage.SQLiteStorage); it is told
+        # about every append/undo/redo/snapshot using global sequence numbers.
+        self.journal = journal
+        self._offset = base_seq  # global seq of the base snapshot
+        self._events = []
+        self._cursor = 0  # events[:cursor] are applied to the live store
+        # position -> StatsStore copy taken after events[:position];
+        # position 0 is the base
+        self._snapshots = {0: base.copy() if base is not None else StatsStore()}
+
+    @classmethod
+    def restore(cls, base, base_seq, events, cursor, journal=None, stats=None,
+                **kwargs):
+        # Rebuild a log from a persisted snapshot plus the events after it.
+        # Returns (log, live stats); passing the live stats when they were
+        # saved too skips the replay. The log keeps `base` itself rather
+        # than a copy, unless it is also the live store.
+        log = cls(base_seq=base_seq, **kwargs)
+        log._snapshots[0] = base.copy() if base is stats else base
+        log._events = list(events)
+        log._cursor = min(max(cursor - base_seq, 0), len(log._events))
+        log.journal = journal
+        return log, stats if stats is not None else log.rebuild()
+
+    def __len__(self):
+        return self._cursor
+
+    @property
+    def seq(self):
+        return self._offset + self._cursor
+
+    @property
+    def events(self):
+        return self._events[:self._cursor]
+
+    @property
+    def base(self):
+        # Totals before the first event (the log's own copy; don't mutate).
+        return self._snapshots[0]
+
+    @property
+    def history(self):
+        # (every event including the redo branch, cursor into it)
+        return list(self._events), self._cursor
+
+    @property
+    def last_event(self):
+        # The most recent applied event (what undo would revert), or None.
+        return self._events[self._cursor - 1] if self._cursor else None
+
+    @property
+    def can_undo(self):
+        return self._cursor > 0
+
+    @property
+    def can_redo(self):
+        return self._cursor < len(self._events)
+
+    @property
+    def at_snapshot(self):
+        # True when a snapshot holds the totals at the cursor
+        return self._cursor in self._snapshots
+
+    def reset(self, stats):
+        # Start a fresh history with the current totals as the base. Used
+        # after roster edits (rename/remove) that events can't express.
+        self._events = []
+        self._cursor = 0
+        self._offset = 0
+        self._snapshots = {0: stats.copy()}
+        if self.journal is not None:
+            self.journal.reset(self._snapshots[0])
+
+    def append(self, event, stats):
+        # Applied first: an event that fails leaves the log untouched.
+        row = apply_event(stats, event)
+        if self._cursor < len(self._events):
+            # A new play after undo drops the redo branch.
+            del self._events[self._cursor:]
+            for pos in [p for p in self._snapshots if p > self._cursor]:
+                del self._snapshots[pos]
+            if self.journal is not None:
+                self.journal.truncate(self.seq)
+        self._events.append(event)
+        self._cursor += 1
+        if self.journal is not None:
+            self.journal.append(self.seq, event)
+        if self._cursor % self.snapshot_every == 0:
+            self._take_snapshot(stats)
+        return row
+
+    def undo(self, stats):
+        if not self.can_undo:
+            return None
+        self._cursor -= 1
+        event = self._events[self._cursor]
+        apply_event(stats, event, sign=-1)
+        if self.journal is not None:
+            self.journal.set_cursor(self.seq)
+        return event
+
+    def redo(self, stats):
+        if not self.can_redo:
+            return None
+        event = self._events[self._cursor]
+        self._cursor += 1
+        apply_event(stats, event)
+        if self.journal is not None:
+            self.journal.set_cursor(self.seq)
+        return event
+
+    def _take_snapshot(self, stats):
+        snapshot = stats.copy()
+        self._snapshots[self._cursor] = snapshot
+        periodic = sorted(p for p in self._snapshots if p > 0)
+        for pos in periodic[:-self.max_snapshots]:
+            del self._snapshots[pos]
+        if self.journal is not None:
+            self.journal.snapshot(self.seq, snapshot)
+
+    def rebuild(self):
+        # Totals as a fold over the log: nearest snapshot, then the tail.
+        pos = max(p for p in self._snapshots if p <= self._cursor)
+        stats = self._snapshots[pos].copy()
+        for event in self._events[pos:self._cursor]:
+            apply_event(stats, event)
+        return stats
@@ -0,0 +1,162 @@
+# profiling.py
+#
+# Opt-in per-rerun instrumentation. Sections are timed with a context
+# manager (or by wrapping a function), grouped per script run, and kept in
+# a sliding window per section for latency percentiles. When disabled,
+# section() hands back a shared no-op context and wrap() returns the
+# function itself, so the instrumented code pays next to nothing.
+
+import functools
+import json
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+
+PROFILE_PERCENTILES = (50, 90, 99)
+
+_NO_OP = nullcontext()
+
+
+def percentile(sorted_values, q):
+    # Nearest-rank percentile of an already sorted, non-empty sequence.
+    rank = max(1, -(-q * len(sorted_values) // 100))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Profiler:
+    def __init__(self, enabled=False, window=1000, log_path=None):
+        self.enabled = enabled
+        self.window = window
+        # Optional JSON-lines log: one line per finished script run.
+        self.log_path = log_path
+        self.counters = Counter()
+        self._samples = {}  # section -> deque of seconds
+        self._lock = threading.Lock()
+        # Each session reruns on its own script thread.
+        self._local = threading.local()
+
+    # ----------------------------------------
+    # Instrumentation
+    # ----------------------------------------
+
+    def section(self, name):
+        if not self.enabled:
+            return _NO_OP
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def wrap(self, name, func):
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with self._timed(name):
+                return func(*args, **kwargs)
+        return timed
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+        run = getattr(self._local, "run", None)
+        if run is not None:
+            run[name] = run.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += n
+
+    # ----------------------------------------
+    # Script runs
+    # ----------------------------------------
+
+    def start_run(self, kind="rerun"):
+        # kind names the run's total section and counter: "rerun" for a
+        # full script run, "fragment rerun" for one fragment on its own.
+        if not self.enabled:
+            return
+        # A run cut short by st.rerun() never reaches end_run().
+        if getattr(self._local, "run", None) is not None:
+            self.end_run(interrupted=True)
+        self._local.run = {}
+        self._local.kind = kind
+        self._local.started = time.perf_counter()
+
+    def end_run(self, interrupted=False):
+        run = getattr(self._local, "run", None)
+        if not self.enabled or run is None:
+            return
+        self._local.run = None
+        kind = self._local.kind
+        total = time.perf_counter() - self._local.started
+        self.record(kind, total)
+        self.count(f"{kind}s")
+        if interrupted:
+            self.count(f"{kind}s interrupted")
+        if self.log_path:
+            line = json.dumps({
+                "ts": time.time(),
+                "kind": kind,
+                "rerun": self.counters[f"{kind}s"],
+                "interrupted": interrupted,
+                "total_ms": total * 1000,
+                "sections_ms": {name: s * 1000 for name, s in run.items()},
+            })
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    @contextmanager
+    def fragment_run(self):
+        # A fragment rerun skips the rest of the script, start_run() and
+        # end_run() included, so it is timed as a run of its own. During a
+        # full script run the fragment is just part of that run.
+        if not self.enabled or getattr(self._local, "run", None) is not None:
+            yield
+            return
+        self.start_run("fragment rerun")
+        try:
+            yield
+        finally:
+            self.end_run()
+
+    # ----------------------------------------
+    # Reports
+    # ----------------------------------------
+
+    def summary_rows(self):
+        # One row per section: sample count and latency percentiles (ms).
+        with self._lock:
+            snapshot = {name: sorted(s) for name, s in self._samples.items()}
+        rows = []
+        for name, values in sorted(snapshot.items()):
+            if not values:
+                continue
+            row = {"Section": name, "Samples": len(values)}
+            for q in PROFILE_PERCENTILES:
+                row[f"p{q} ms"] = round(percentile(values, q) * 1000, 3)
+            row["max ms"] = round(values[-1] * 1000, 3)
+            rows.append(row)
+        return rows
+
+    def to_json(self):
+        return json.dumps(
+            {"counters": dict(self.counters), "sections": self.summary_rows()},
+            indent=2,
+        )
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.counters.clear()
@@ -0,0 +1,46 @@
+# rates.py
+#
+# Vectorized rate stats (AVG/OBP/SLG/OPS/IP/ERA/WHIP) over whole stat
+# columns. Results match the scalar calculate_* helpers in formulas.py
+# exactly: same operation order, and 0.0 wherever the denominator is zero.
+
+import numpy as np
+
+RATE_FIELDS = ("AVG", "OBP", "SLG", "OPS", "IP", "ERA", "WHIP")
+
+
+def _safe_div(num, den):
+    out = np.zeros(np.shape(den), dtype=np.float64)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def batch_rate_stats(columns):
+    s = np.asarray(columns["Singles"], dtype=np.int64)
+    d = np.asarray(columns["Doubles"], dtype=np.int64)
+    t = np.asarray(columns["Triples"], dtype=np.int64)
+    hr = np.asarray(columns["Home Runs"], dtype=np.int64)
+    ab = np.asarray(columns["At Bats"], dtype=np.int64)
+    bb = np.asarray(columns["Walks"], dtype=np.int64)
+
+    hits = s + d + t + hr
+    total_bases = s + 2 * d + 3 * t + 4 * hr
+    obp = _safe_div(hits, ab + bb)
+    slg = _safe_div(total_bases, ab)
+
+    outs = np.asarray(columns["Pitch_Outs"], dtype=np.int64)
+    er = np.asarray(columns["Pitch_ER"], dtype=np.int64)
+    bb_p = np.asarray(columns["Pitch_BB"], dtype=np.int64)
+    h_p = np.asarray(columns["Pitch_H"], dtype=np.int64)
+
+    ip = outs / 3.0
+
+    return {
+        "AVG": _safe_div(hits, ab),
+        "OBP": obp,
+        "SLG": slg,
+        "OPS": obp + slg,
+        "IP": ip,
+        "ERA": _safe_div(9.0 * er, ip),
+        "WHIP": _safe_div(bb_p + h_p, ip),
+    }
@@ -0,0 +1,209 @@
+# season.py
+#
+# Game-scoped stat lines with pre-aggregated rollups. Every finished game
+# is kept as its own line and also added, by delta, into calendar buckets
+# (day, month, season = calendar year) and a running total, both overall
+# and per opponent. Career, season and split queries then combine a
+# handful of buckets instead of re-summing every game.
+
+import datetime
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+
+import numpy as np
+
+from .store import STAT_FIELDS, StatsStore, name_key
+
+GameInfo = namedtuple("GameInfo", ["game_id", "date", "opponent"])
+
+
+def _merge(target, line, sign=1):
+    columns = line.columns()
+    if sign != 1:
+        columns = {field: sign * col for field, col in columns.items()}
+    target.merge_columns(line.names, columns)
+
+
+def _next_month(day):
+    if day.month == 12:
+        return datetime.date(day.year + 1, 1, 1)
+    return datetime.date(day.year, day.month + 1, 1)
+
+
+class CalendarRollup:
+    # Running totals per day, month and year plus an overall total. A date
+    # range query takes whole years, then whole months, then single days,
+    # so it merges at most ~60 buckets plus one per year, however many
+    # games fall inside the range.
+
+    def __init__(self):
+        self.total = StatsStore()
+        self.games = 0
+        self._years = {}  # year -> [games, StatsStore]
+        self._months = {}  # (year, month) -> [games, StatsStore]
+        self._days = {}  # date -> [games, StatsStore]
+        self._dates = []  # sorted dates with at least one game
+
+    def _buckets(self, day):
+        return (
+            (self._years, day.year),
+            (self._months, (day.year, day.month)),
+            (self._days, day),
+        )
+
+    def add(self, day, line, sign=1):
+        _merge(self.total, line, sign)
+        self.games += sign
+        for buckets, key in self._buckets(day):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [0, StatsStore()]
+            bucket[0] += sign
+            if bucket[0] == 0:
+                del buckets[key]
+            else:
+                _merge(bucket[1], line, sign)
+        if sign > 0 and self._days[day][0] == 1:
+            insort(self._dates, day)
+        elif sign < 0 and day not in self._days:
+            del self._dates[bisect_left(self._dates, day)]
+
+    def year(self, year):
+        bucket = self._years.get(year)
+        return bucket[1].copy() if bucket else StatsStore()
+
+    def query(self, start=None, end=None):
+        if start is None and end is None:
+            return self.total.copy()
+        # Clamp to the days that have games so open-ended ranges stay short.
+        lo = bisect_left(self._dates, start) if start else 0
+        hi = bisect_right(self._dates, end) if end else len(self._dates)
+        result = StatsStore()
+        if lo >= hi:
+            return result
+        day, last = self._dates[lo], self._dates[hi - 1]
+
+        one_day = datetime.timedelta(days=1)
+        while day <= last:
+            if day.month == 1 and day.day == 1 and datetime.date(day.year, 12, 31) <= last:
+                bucket = self._years.get(day.year)
+                day = datetime.date(day.year + 1, 1, 1)
+            elif day.day == 1 and _next_month(day) - one_day <= last:
+                bucket = self._months.get((day.year, day.month))
+                day = _next_month(day)
+            else:
+                bucket = self._days.get(day)
+                day += one_day
+            if bucket is not None:
+                _merge(result, bucket[1])
+        return result
+
+
+class SeasonBook:
+    def __init__(self):
+        self._games = {}  # game_id -> (GameInfo, StatsStore line)
+        self._all = CalendarRollup()
+        self._by_opponent = {}  # opponent key -> CalendarRollup
+        self._opponent_names = {}  # opponent key -> display name
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self._games)
+
+    def __contains__(self, game_id):
+        return game_id in self._games
+
+    def games(self):
+        # GameInfo list, oldest first.
+        return sorted((info for info, _ in self._games.values()),
+                      key=lambda info: (info.date, info.game_id))
+
+    def game(self, game_id):
+        return self._games[game_id][1].copy()
+
+    def seasons(self):
+        return sorted(self._all._years)
+
+    def opponents(self):
+        return sorted(self._opponent_names.values(), key=name_key)
+
+    # ----------------------------------------
+    # Updates (rollups change by the game's delta only)
+    # ----------------------------------------
+
+    def add_game(self, day, opponent, line, game_id=None):
+        if game_id is None:
+            game_id = self._next_id
+        elif game_id in self._games:
+            raise ValueError(f"Game {game_id} already exists.")
+        self._next_id = max(self._next_id, game_id + 1)
+
+        opponent = opponent.strip()
+        info = GameInfo(game_id, day, opponent)
+        line = line.copy()
+        self._games[game_id] = (info, line)
+
+        key = name_key(opponent)
+        self._opponent_names.setdefault(key, opponent)
+        rollup = self._by_opponent.get(key)
+        if rollup is None:
+            rollup = self._by_opponent[key] = CalendarRollup()
+        self._all.add(day, line)
+        rollup.add(day, line)
+        return info
+
+    def remove_game(self, game_id):
+        info, line = self._games.pop(game_id)
+        key = name_key(info.opponent)
+        self._all.add(info.date, line, sign=-1)
+        rollup = self._by_opponent[key]
+        rollup.add(info.date, line, sign=-1)
+        if not rollup.games:
+            del self._by_opponent[key]
+            del self._opponent_names[key]
+        return info
+
+    # ----------------------------------------
+    # Queries
+    # ----------------------------------------
+
+    def career(self):
+        return self._all.total.copy()
+
+    def season(self, year):
+        return self._all.year(year)
+
+    def split(self, start=None, end=None, opponent=None):
+        # Totals for games in [start, end] (inclusive, either may be open),
+        # optionally only against one opponent.
+        if opponent is None:
+            return self._all.query(start, end)
+        rollup = self._by_opponent.get(name_key(opponent))
+        if rollup is None:
+            return StatsStore()
+        return rollup.query(start, end)
+
+
+def game_line(stats, base):
+    # What changed in `stats` since `base` (an earlier copy of it), as a
+    # store holding only the players whose totals moved.
+    names = stats.names
+    base_rows = np.fromiter(
+        (-1 if row is None else row for row in map(base.row_of, names)),
+        dtype=np.intp, count=len(names),
+    )
+    known = np.flatnonzero(base_rows >= 0)
+
+    deltas = {}
+    changed = np.zeros(len(names), dtype=bool)
+    for field in STAT_FIELDS:
+        delta = stats.column(field).astype(np.int64)
+        delta[known] -= base.column(field)[base_rows[known]]
+        deltas[field] = delta
+        changed |= delta != 0
+
+    keep = np.flatnonzero(changed)
+    return StatsStore.from_columns(
+        [names[i] for i in keep.tolist()],
+        {field: delta[keep] for field, delta in deltas.items()},
+    )
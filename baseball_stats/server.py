@@ -0,0 +1,375 @@
+# server.py
+#
+# Shared scoring server: one GameState that several app sessions (or
+# devices) read and write at once.
+#
+#   python -m baseball_stats serve --port 8765 --db baseball_stats.db
+#
+# The protocol is newline-delimited JSON over TCP. A client asks for one
+# full snapshot, then gets every change pushed to it as a small delta (a
+# play event and its sign, a lineup change, ...). All writes run on the
+# event loop thread, which makes the server the single writer: plays are
+# applied in arrival order and every push carries a version number one
+# higher than the last. Undo/redo also take an optimistic check: they are
+# refused if the client's view of the play log is stale.
+#
+# Automated feeds send plays in batches ("ingest"). Batches from every
+# connection go through one bounded queue; while it is full the server
+# stops reading from feeds, so TCP pushes back on fast producers. Each
+# batch is acknowledged once, and reaches app sessions as one push.
+
+import asyncio
+import base64
+import json
+import logging
+
+from .playlog import PLAY_DELTAS, PlayEvent
+from .storage import pack_store, unpack_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Lines are one JSON message each; snapshots of big rosters are long.
+MAX_LINE_BYTES = 1 << 26
+# Pushes queued for a client before it is dropped as too slow
+SEND_QUEUE_SIZE = 10_000
+# Ingest batches waiting to be applied before feeds are throttled
+INGEST_QUEUE_BATCHES = 16
+INGEST_MAX_EVENTS = 10_000
+
+
+# ----------------------------------------
+# Wire format
+# ----------------------------------------
+
+def encode_event(event):
+    return [event.player, event.mode, event.play_type,
+            [list(pair) for pair in event.deltas], event.batter_index,
+            event.timestamp]
+
+
+def decode_event(data):
+    player, mode, play_type, deltas, batter_index, timestamp = data
+    return PlayEvent(player, mode, play_type,
+                     tuple(tuple(pair) for pair in deltas), batter_index,
+                     timestamp)
+
+
+def encode_snapshot(game):
+    names, blob = pack_store(game.stats)
+    return {
+        "names": names,
+        "columns": base64.b64encode(blob).decode("ascii"),
+        "lineup": game.lineup,
+        "current_batter_index": game.current_batter_index,
+        "log": log_state(game),
+        "base_out": game.base_out.to_state(),
+    }
+
+
+def decode_snapshot_stats(snapshot):
+    return unpack_store(snapshot["names"], base64.b64decode(snapshot["columns"]))
+
+
+def log_state(game):
+    log = game.play_log
+    return [log.seq, log.can_undo, log.can_redo]
+
+
+def dumps(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+# ----------------------------------------
+# Server
+# ----------------------------------------
+
+class _Client:
+    def __init__(self, writer):
+        self.writer = writer
+        # Only clients that took a snapshot (app sessions) get pushes.
+        self.subscribed = False
+        self.queue = asyncio.Queue(SEND_QUEUE_SIZE)
+        self.task = asyncio.create_task(self._send_loop())
+
+    def send(self, line):
+        try:
+            self.queue.put_nowait(line)
+        except asyncio.QueueFull:
+            # A client this far behind resyncs from a snapshot on reconnect.
+            logger.warning("Dropping slow client %s", self.peer)
+            self.close()
+
+    @property
+    def peer(self):
+        return self.writer.get_extra_info("peername")
+
+    async def _send_loop(self):
+        try:
+            while True:
+                line = await self.queue.get()
+                self.writer.write(line)
+                # Batch whatever else is queued before waiting on the socket.
+                while not self.queue.empty():
+                    self.writer.write(self.queue.get_nowait())
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.writer.close()
+
+    def close(self):
+        self.task.cancel()
+
+
+class ScoringServer:
+    def __init__(self, game, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.game = game
+        self.host = host
+        self.port = port
+        # Bumped by every change; pushes carry it so clients can spot gaps.
+        self.version = 0
+        self._clients = set()
+        self._server = None
+        self._ingest_queue = None
+        self._ingest_task = None
+        self._ops = {
+            "snapshot": self._op_snapshot,
+            "tap": self._op_tap,
+            "undo": self._op_undo,
+            "redo": self._op_redo,
+            "merge": self._op_merge,
+            "rename": self._op_rename,
+            "remove": self._op_remove,
+            "lineup": self._op_lineup,
+            "batter": self._op_batter,
+            "ingest": self._op_ingest,
+        }
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_LINE_BYTES
+        )
+        # port=0 picks a free port (tests); report the real one.
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ingest_queue = asyncio.Queue(INGEST_QUEUE_BATCHES)
+        self._ingest_task = asyncio.create_task(self._run_ingest())
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        for client in list(self._clients):
+            client.close()
+        if self._ingest_task is not None:
+            self._ingest_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        client = _Client(writer)
+        self._clients.add(client)
+        try:
+            while not client.task.done():
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    op = message.get("op")
+                except (ValueError, AttributeError):
+                    client.send(dumps({"id": None, "ok": False, "error": "Bad JSON request."}))
+                    continue
+                if op == "ingest":
+                    # Blocks (and stops reading this feed) while the queue is full.
+                    await self._ingest_queue.put((client, message))
+                    continue
+                if op == "snapshot":
+                    client.subscribed = True
+                client.send(dumps(self.dispatch(message)))
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning("Closing client %s: %s", client.peer, e)
+        finally:
+            self._clients.discard(client)
+            client.close()
+
+    async def _run_ingest(self):
+        while True:
+            client, message = await self._ingest_queue.get()
+            client.send(dumps(self.dispatch(message)))
+            # Let other connections in between batches.
+            await asyncio.sleep(0)
+
+    def dispatch(self, message):
+        # One request -> response dict. Changes are pushed to every
+        # subscribed client (the sender included) before its response is
+        # queued.
+        request_id = message.get("id")
+        try:
+            op = self._ops.get(message.get("op"))
+            if op is None:
+                raise ValueError(f"Unknown op {message.get('op')!r}.")
+            response = op(message)
+        except KeyError as e:
+            return {"id": request_id, "ok": False, "error": f"Missing or unknown {e}."}
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+        response.update(id=request_id, ok=True, version=self.version)
+        return response
+
+    def push(self, kind, **fields):
+        self.version += 1
+        line = dumps(dict(fields, push=kind, version=self.version))
+        for client in list(self._clients):
+            if client.subscribed:
+                client.send(line)
+
+    def _push_play(self, event, sign):
+        self.push(
+            "play",
+            event=encode_event(event),
+            sign=sign,
+            current_batter_index=self.game.current_batter_index,
+            log=log_state(self.game),
+        )
+
+    def _push_reset(self):
+        self.push("reset", snapshot=encode_snapshot(self.game))
+
+    # ----------------------------------------
+    # Ops
+    # ----------------------------------------
+
+    def _op_ingest(self, message):
+        # events: [[player, play_type] or [player, play_type, mode], ...].
+        # Bad entries are skipped and reported by index; the rest apply in
+        # order and go out to app sessions as one push.
+        events = message["events"]
+        if len(events) > INGEST_MAX_EVENTS:
+            raise ValueError(f"Batches are limited to {INGEST_MAX_EVENTS} events.")
+        game = self.game
+        deltas = PLAY_DELTAS
+        applied = []
+        rejected = []
+        for i, item in enumerate(events):
+            try:
+                player, play_type, *rest = item
+                mode = rest.pop() if rest else "hitting"
+                if rest:
+                    raise ValueError
+            except (TypeError, ValueError):
+                rejected.append([i, "Expected [player, play_type(, mode)]."])
+                continue
+            if not isinstance(player, str) or not player.strip():
+                rejected.append([i, "Missing player name."])
+                continue
+            # Type checks first: a list or dict here isn't hashable
+            if (not isinstance(mode, str) or not isinstance(play_type, str)
+                    or play_type not in deltas.get(mode, ())):
+                rejected.append([i, f"Unknown {mode} play {play_type!r}."])
+                continue
+            applied.append(encode_event(game.record_fast_tap_play(player, play_type, mode=mode)))
+        if applied:
+            self.push(
+                "plays",
+                events=applied,
+                current_batter_index=game.current_batter_index,
+                log=log_state(game),
+            )
+        return {"accepted": len(applied), "rejected": rejected}
+
+    def _op_snapshot(self, message):
+        return {"snapshot": encode_snapshot(self.game)}
+
+    def _op_tap(self, message):
+        # Checked before anything changes, like each ingest entry
+        game = self.game
+        player, play_type = message["player"], message["play_type"]
+        mode = message.get("mode", "hitting")
+        if not isinstance(player, str) or not player.strip():
+            raise ValueError("Missing player name.")
+        if not isinstance(mode, str) or play_type not in PLAY_DELTAS.get(mode, {}):
+            raise ValueError(f"Unknown {mode} play {play_type!r}.")
+        if "auto_advance" in message:
+            game.auto_advance = bool(message["auto_advance"])
+        event = game.record_fast_tap_play(player, play_type, mode=mode)
+        self._push_play(event, 1)
+        return {"event": encode_event(event)}
+
+    def _check_log(self, message):
+        # Optimistic check: the client must have seen the latest play.
+        if "seq" in message and message["seq"] != self.game.play_log.seq:
+            raise ValueError("conflict: the play log changed; refresh and retry.")
+
+    def _op_undo(self, message):
+        self._check_log(message)
+        event = self.game.undo_last_play()
+        if event is not None:
+            self._push_play(event, -1)
+        return {"event": encode_event(event) if event else None}
+
+    def _op_redo(self, message):
+        self._check_log(message)
+        event = self.game.redo_last_play()
+        if event is not None:
+            self._push_play(event, 1)
+        return {"event": encode_event(event) if event else None}
+
+    def _op_merge(self, message):
+        # GameState checks the entry with the CSV import rules
+        entry = message["entry"]
+        if not isinstance(entry, dict):
+            raise ValueError("Expected an entry object.")
+        result = self.game.record_merge_entry(entry)
+        self._push_play(self.game.play_log.last_event, 1)
+        return {"result": result}
+
+    def _op_rename(self, message):
+        self.game.rename_player(message["old_name"], message["new_name"])
+        self._push_reset()
+        return {}
+
+    def _op_remove(self, message):
+        self.game.remove_player(message["name"])
+        self._push_reset()
+        return {}
+
+    def _op_lineup(self, message):
+        # Every field is converted before either one is assigned
+        lineup = [str(name) for name in message["lineup"]]
+        index = self.game.current_batter_index
+        if "current_batter_index" in message:
+            index = _batter_index(message["current_batter_index"])
+        self.game.lineup = lineup
+        self.game.current_batter_index = index
+        self.push("lineup", lineup=self.game.lineup,
+                  current_batter_index=self.game.current_batter_index)
+        return {}
+
+    def _op_batter(self, message):
+        self.game.current_batter_index = _batter_index(message["current_batter_index"])
+        self.push("batter", current_batter_index=self.game.current_batter_index)
+        return {}
+
+
+def _batter_index(value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError("current_batter_index must be a whole number >= 0.")
+    return value
+
+
+def run_server(game, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ScoringServer(game, host, port)
+
+    async def main():
+        await server.start()
+        logger.info("Scoring server listening on %s:%s", server.host, server.port)
+        await server.serve_forever()
+
+    asyncio.run(main())
@@ -0,0 +1,205 @@
+# simulate.py
+#
+# Monte Carlo game simulator for a batting lineup. Each hitter's counters
+# (At Bats, Walks, Singles ... Strikeouts) become plate-appearance outcome
+# probabilities, and whole games of the lineup are simulated with NumPy:
+# every step draws one plate appearance for every game still in its half
+# inning, so the per-PA cost is spread over thousands of games at once.
+# Games are split into fixed-size chunks, each with its own seed, and the
+# chunks can run in a process pool; results don't depend on the number of
+# workers.
+#
+# The model is deliberately simple: an average opponent, no stolen bases,
+# errors or double plays, runners move a fixed number of bases per hit
+# (BASE_ADVANCE) and a game is exactly `innings` innings.
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Plate-appearance outcomes, in probability column order
+OUTCOMES = ("Walk", "Single", "Double", "Triple", "Home Run", "Strikeout", "Out")
+WALK, SINGLE, DOUBLE, TRIPLE, HOME_RUN, STRIKEOUT, OUT = range(len(OUTCOMES))
+
+# League-average-ish rates for when nobody has batted yet
+DEFAULT_RATES = np.array([0.085, 0.140, 0.045, 0.004, 0.030, 0.220, 0.476])
+# Pseudo plate appearances of league-average hitting mixed into every
+# hitter, so a 3-for-3 start doesn't simulate as a 1.000 hitter.
+PRIOR_PA = 50
+SIM_CHUNK_GAMES = 20_000
+
+# Bases each runner advances on a hit (the batter takes the hit's base).
+# A single also scores a runner from second.
+BASE_ADVANCE = {SINGLE: 1, DOUBLE: 2, TRIPLE: 3, HOME_RUN: 4}
+
+SimulationResult = namedtuple(
+    "SimulationResult",
+    ["games", "innings", "runs_per_game", "std_error", "distribution", "seconds"],
+)
+
+
+# ----------------------------------------
+# Base / out transitions
+# ----------------------------------------
+
+def _transition(outcome, bases):
+    # bases: bit 0 = runner on first, bit 1 = second, bit 2 = third.
+    # -> (bases after the play, runs scored, outs made)
+    if outcome in (STRIKEOUT, OUT):
+        return bases, 0, 1
+    if outcome == WALK:
+        # Forced runners only
+        if bases & 1 == 0:
+            return bases | 1, 0, 0
+        if bases & 2 == 0:
+            return bases | 3, 0, 0
+        if bases & 4 == 0:
+            return 7, 0, 0
+        return 7, 1, 0
+    advance = BASE_ADVANCE[outcome]
+    if advance == 4:
+        after, runs = 0, 1
+    else:
+        after, runs = 1 << (advance - 1), 0
+    for base in range(3):
+        if not bases >> base & 1:
+            continue
+        step = 2 if outcome == SINGLE and base == 1 else advance
+        if base + step >= 3:
+            runs += 1
+        else:
+            after |= 1 << (base + step)
+    return after, runs, 0
+
+
+def transition_tables():
+    # (next bases, runs, outs), each indexed [outcome, bases]
+    shape = (len(OUTCOMES), 8)
+    next_bases = np.zeros(shape, dtype=np.intp)
+    runs = np.zeros(shape, dtype=np.int64)
+    outs = np.zeros(shape, dtype=np.int64)
+    for outcome in range(len(OUTCOMES)):
+        for bases in range(8):
+            next_bases[outcome, bases], runs[outcome, bases], outs[outcome, bases] = (
+                _transition(outcome, bases)
+            )
+    return next_bases, runs, outs
+
+
+NEXT_BASES, RUNS_SCORED, OUTS_MADE = transition_tables()
+
+
+# ----------------------------------------
+# Outcome probabilities
+# ----------------------------------------
+
+def _outcome_counts(stats, rows):
+    # [len(rows), OUTCOMES] plate-appearance counts from the counters
+    cols = stats.columns()
+    counts = np.zeros((len(rows), len(OUTCOMES)), dtype=np.float64)
+    if not len(rows):
+        return counts
+    counts[:, WALK] = cols["Walks"][rows]
+    counts[:, SINGLE] = cols["Singles"][rows]
+    counts[:, DOUBLE] = cols["Doubles"][rows]
+    counts[:, TRIPLE] = cols["Triples"][rows]
+    counts[:, HOME_RUN] = cols["Home Runs"][rows]
+    counts[:, STRIKEOUT] = cols["Strikeouts"][rows]
+    hits = counts[:, SINGLE:HOME_RUN + 1].sum(axis=1)
+    counts[:, OUT] = cols["At Bats"][rows] - hits - counts[:, STRIKEOUT]
+    # Hand-merged totals can be inconsistent; never count negative events
+    return np.maximum(counts, 0)
+
+
+def league_rates(stats):
+    counts = _outcome_counts(stats, np.arange(len(stats))).sum(axis=0)
+    total = counts.sum()
+    return counts / total if total else DEFAULT_RATES.copy()
+
+
+def outcome_probabilities(stats, names, prior_pa=PRIOR_PA):
+    # [len(names), OUTCOMES] probabilities; unknown names bat league average.
+    league = league_rates(stats)
+    rows = [stats.row_of(name) for name in names]
+    known = [i for i, row in enumerate(rows) if row is not None]
+    counts = np.zeros((len(names), len(OUTCOMES)))
+    counts[known] = _outcome_counts(stats, np.array([rows[i] for i in known], dtype=np.intp))
+    counts += prior_pa * league
+    return counts / counts.sum(axis=1, keepdims=True)
+
+
+# ----------------------------------------
+# Simulation
+# ----------------------------------------
+
+def simulate_games(probs, n_games, innings=9, seed=0):
+    # probs: [lineup slots, OUTCOMES]. -> runs scored in each game.
+    # Every game still batting in the current inning takes one plate
+    # appearance per step; games retire from the step arrays at 3 outs.
+    rng = np.random.default_rng(seed)
+    cumulative = np.cumsum(probs, axis=1)
+    cumulative[:, -1] = 1.0
+    n_slots = len(probs)
+    due_up = np.zeros(n_games, dtype=np.intp)
+    runs = np.zeros(n_games, dtype=np.int64)
+    for _ in range(innings):
+        games = np.arange(n_games)
+        slot = due_up.copy()
+        bases = np.zeros(n_games, dtype=np.intp)
+        outs = np.zeros(n_games, dtype=np.int64)
+        while games.size:
+            draws = rng.random(games.size)
+            outcome = (draws[:, None] >= cumulative[slot, :-1]).sum(axis=1)
+            runs[games] += RUNS_SCORED[outcome, bases]
+            outs += OUTS_MADE[outcome, bases]
+            bases = NEXT_BASES[outcome, bases]
+            slot += 1
+            slot[slot == n_slots] = 0
+            done = outs >= 3
+            if done.any():
+                due_up[games[done]] = slot[done]
+                live = ~done
+                games, slot, bases, outs = games[live], slot[live], bases[live], outs[live]
+    return runs
+
+
+def _simulate_chunk(args):
+    return simulate_games(*args)
+
+
+def simulate_lineup(stats, lineup, n_games=10_000, innings=9, jobs=1, seed=0,
+                    chunk_games=SIM_CHUNK_GAMES, prior_pa=PRIOR_PA):
+    # Expected runs for the lineup in batting order. jobs > 1 runs chunks
+    # in worker processes (0 = all cores).
+    if not lineup:
+        raise ValueError("Set a lineup first.")
+    if n_games < 1:
+        raise ValueError("Simulate at least one game.")
+    probs = outcome_probabilities(stats, lineup, prior_pa)
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    sizes = [min(chunk_games, n_games - start) for start in range(0, n_games, chunk_games)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(probs, size, innings, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+
+    start = time.perf_counter()
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            parts = list(pool.map(_simulate_chunk, tasks))
+    else:
+        parts = [_simulate_chunk(task) for task in tasks]
+    runs = np.concatenate(parts)
+    seconds = time.perf_counter() - start
+
+    return SimulationResult(
+        games=n_games,
+        innings=innings,
+        runs_per_game=float(runs.mean()),
+        std_error=float(runs.std() / np.sqrt(n_games)),
+        distribution=np.bincount(runs),
+        seconds=seconds,
+    )
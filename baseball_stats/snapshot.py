@@ -0,0 +1,327 @@
+# snapshot.py
+#
+# Compact binary snapshot of the full stat state: the counting stats, the
+# play log (redo branch included), the lineup and the current batter. It
+# loads back with almost no parsing, unlike the TXT/CSV exports.
+#
+# Layout (little-endian):
+#
+#   magic           8 bytes, b"BBSNAP\0\1"
+#   header length   uint32
+#   header          JSON: counts, lookup tables and where each section is
+#   sections        raw arrays, each starting on a 64-byte boundary
+#
+# The "columns" section is an int32 (fields x players) block, so a reader
+# can memory-map it and use the columns in place (map_snapshot_columns).
+# Names are NUL-separated UTF-8, followed by their name_key()s unless
+# those are just the names lowercased, so loading skips Unicode
+# normalization. Events are fixed-width records pointing
+# into small tables of players, play types and distinct delta sets (a
+# tap's deltas repeat, so each set is stored once). The base totals the
+# log starts from are not stored: they are the live totals minus the
+# applied events, computed in one vectorized pass on load.
+
+import io
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from .playlog import PlayEvent
+from .store import STAT_DTYPE, STAT_FIELDS, StatsStore
+
+SNAPSHOT_MAGIC = b"BBSNAP\x00\x01"
+SNAPSHOT_FORMAT = 1
+SECTION_ALIGN = 64
+
+EVENT_DTYPE = np.dtype([
+    ("player", "<i4"),      # index into the event player table
+    ("kind", "<u2"),        # index into the (mode, play_type) table
+    ("deltas", "<i4"),      # index into the delta sets
+    ("batter_index", "<i4"),  # -1 for None
+    ("timestamp", "<f8"),
+])
+
+_FIELD_INDEX = {field: i for i, field in enumerate(STAT_FIELDS)}
+_HEADER = struct.Struct("<8sI")
+
+Snapshot = namedtuple(
+    "Snapshot",
+    ["stats", "base", "events", "cursor", "lineup", "current_batter_index"],
+)
+
+
+def _join(strings):
+    joined = "\0".join(strings)
+    if strings and joined.count("\0") != len(strings) - 1:
+        raise ValueError("Names can't contain NUL characters.")
+    return joined
+
+
+def _encode(text):
+    return np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+
+
+def _pack_strings(strings):
+    return _encode(_join(strings))
+
+
+def _unpack_strings(blob, count):
+    return bytes(blob).decode("utf-8").split("\0") if count else []
+
+
+# ----------------------------------------
+# Save
+# ----------------------------------------
+
+def _encode_events(events):
+    players, kinds, delta_sets = {}, {}, {}
+    records = np.empty(len(events), dtype=EVENT_DTYPE)
+    player_ids, kind_ids, delta_ids, batters, times = [], [], [], [], []
+    for player, mode, play_type, deltas, batter_index, timestamp in events:
+        player_ids.append(players.setdefault(player, len(players)))
+        kind_ids.append(kinds.setdefault((mode, play_type), len(kinds)))
+        delta_ids.append(delta_sets.setdefault(deltas, len(delta_sets)))
+        batters.append(-1 if batter_index is None else batter_index)
+        times.append(timestamp)
+    records["player"] = player_ids
+    records["kind"] = kind_ids
+    records["deltas"] = delta_ids
+    records["batter_index"] = batters
+    records["timestamp"] = times
+
+    pairs = [pair for deltas in delta_sets for pair in deltas]
+    offsets = np.zeros(len(delta_sets) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum([len(deltas) for deltas in delta_sets])
+    sections = {
+        "events": records,
+        "event_players": _pack_strings(list(players)),
+        "delta_offsets": offsets,
+        "delta_fields": np.array([_FIELD_INDEX[f] for f, _ in pairs], dtype=np.uint8),
+        "delta_values": np.array([v for _, v in pairs], dtype=np.int64),
+    }
+    return sections, len(players), [list(kind) for kind in kinds]
+
+
+def save_snapshot(game, target):
+    # target: a path or a writable binary file.
+    stats = game.stats
+    base = game.play_log.base
+    events, cursor = game.play_log.history
+    names = stats.names
+    if base.names != names[:len(base)]:
+        raise ValueError("The play log's base roster doesn't match the stats.")
+
+    block = np.empty((len(STAT_FIELDS), len(stats)), dtype=STAT_DTYPE)
+    for i, field in enumerate(STAT_FIELDS):
+        block[i] = stats.column(field)
+    sections, event_players, kinds = _encode_events(events)
+    sections["columns"] = block
+    joined_names = _join(names)
+    joined_keys = _join(stats.name_keys())
+    keys_lowered = joined_keys == joined_names.lower()
+    sections["names"] = _encode(joined_names)
+    sections["keys"] = _encode("" if keys_lowered else joined_keys)
+
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "fields": list(STAT_FIELDS),
+        "players": len(stats),
+        "base_players": len(base),
+        "keys_lowered": keys_lowered,
+        "events": len(events),
+        "cursor": cursor,
+        "event_players": event_players,
+        "kinds": kinds,
+        "lineup": list(game.lineup),
+        "current_batter_index": game.current_batter_index,
+        "sections": {},
+    }
+    # Offsets depend on the header's own length; leave room for them.
+    order = ["columns", "names", "keys", "events", "event_players",
+             "delta_offsets", "delta_fields", "delta_values"]
+    for name in order:
+        header["sections"][name] = [0, sections[name].nbytes]
+    start = _HEADER.size + len(json.dumps(header)) + 32 * len(order)
+    offset = -(-start // SECTION_ALIGN) * SECTION_ALIGN
+    for name in order:
+        header["sections"][name][0] = offset
+        offset += -(-sections[name].nbytes // SECTION_ALIGN) * SECTION_ALIGN
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, "wb") as f:
+            _write(f, header, header_bytes, sections, order)
+    else:
+        _write(target, header, header_bytes, sections, order)
+
+
+def _write(f, header, header_bytes, sections, order):
+    f.write(_HEADER.pack(SNAPSHOT_MAGIC, len(header_bytes)))
+    f.write(header_bytes)
+    position = _HEADER.size + len(header_bytes)
+    for name in order:
+        data = sections[name]
+        if not data.nbytes:
+            continue
+        offset = header["sections"][name][0]
+        f.write(b"\0" * (offset - position))
+        f.write(np.ascontiguousarray(data).reshape(-1).view(np.uint8))
+        position = offset + data.nbytes
+
+
+def snapshot_bytes(game):
+    buffer = io.BytesIO()
+    save_snapshot(game, buffer)
+    return buffer.getvalue()
+
+
+# ----------------------------------------
+# Load
+# ----------------------------------------
+
+def _read_header(buffer):
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Not a baseball stats snapshot.")
+    magic, length = _HEADER.unpack_from(buffer)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a baseball stats snapshot.")
+    header = json.loads(bytes(buffer[_HEADER.size:_HEADER.size + length]))
+    if header["format"] != SNAPSHOT_FORMAT or header["fields"] != list(STAT_FIELDS):
+        raise ValueError("Snapshot was written by an incompatible version.")
+    return header
+
+
+def _section(buffer, header, name, dtype):
+    offset, nbytes = header["sections"][name]
+    dtype = np.dtype(dtype)
+    if not nbytes:
+        return np.empty(0, dtype=dtype)
+    if offset + nbytes > len(buffer):
+        raise ValueError("Snapshot file is truncated.")
+    return np.frombuffer(buffer, dtype=dtype, count=nbytes // dtype.itemsize,
+                         offset=offset)
+
+
+def _columns_block(buffer, header):
+    # (STAT_FIELDS x players) block, read in place
+    block = _section(buffer, header, "columns", STAT_DTYPE)
+    return block.reshape(len(STAT_FIELDS), header["players"])
+
+
+def _open(source, writable=False):
+    # -> buffer; a path is memory-mapped instead of read, or read into a
+    # bytearray when the caller wants to keep (and write) the arrays.
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                raise ValueError("Not a baseball stats snapshot.")
+            if not writable:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = bytearray(size)
+            f.readinto(buffer)
+            return memoryview(buffer)
+    if hasattr(source, "read"):
+        source = source.read()
+    return memoryview(source)
+
+
+def map_snapshot_columns(path):
+    # Read-only, memory-mapped columns straight from the file, without
+    # building a store: -> (names, {field: column}).
+    buffer = _open(path)
+    header = _read_header(buffer)
+    names = _unpack_strings(_section(buffer, header, "names", np.uint8), header["players"])
+    block = _columns_block(buffer, header)
+    return names, {field: block[i] for i, field in enumerate(STAT_FIELDS)}
+
+
+def _delta_tables(buffer, header):
+    return (
+        _section(buffer, header, "delta_offsets", np.int32),
+        _section(buffer, header, "delta_fields", np.uint8),
+        _section(buffer, header, "delta_values", np.int64),
+    )
+
+
+def _decode_events(buffer, header, records, players):
+    kinds = [tuple(kind) for kind in header["kinds"]]
+    offsets, fields, values = (t.tolist() for t in _delta_tables(buffer, header))
+    delta_sets = [
+        tuple((STAT_FIELDS[f], v) for f, v in zip(fields[lo:hi], values[lo:hi]))
+        for lo, hi in zip(offsets, offsets[1:])
+    ]
+    return [
+        PlayEvent(players[p], *kinds[k], delta_sets[d], None if b < 0 else b, ts)
+        for p, k, d, b, ts in zip(
+            records["player"].tolist(), records["kind"].tolist(),
+            records["deltas"].tolist(), records["batter_index"].tolist(),
+            records["timestamp"].tolist(),
+        )
+    ]
+
+
+def _base_store(buffer, header, stats, records, players):
+    # The log's base: live totals minus every applied event, for the
+    # players that existed before the first event. With nothing applied
+    # that is `stats` itself (PlayLog.restore copies it then).
+    n_base = header["base_players"]
+    applied = records[:header["cursor"]]
+    if not len(applied) and n_base == len(stats):
+        return stats
+    base = stats.copy()
+    base.truncate(n_base)
+    if not len(applied):
+        return base
+
+    offsets, fields, values = _delta_tables(buffer, header)
+    player_rows = np.fromiter(
+        (-1 if row is None else row for row in map(stats.row_of, players)),
+        dtype=np.intp, count=len(players),
+    )
+    # One (row, field, value) triple per delta of every applied event
+    sets = applied["deltas"]
+    lengths = np.diff(offsets)[sets]
+    rows = np.repeat(player_rows[applied["player"]], lengths)
+    firsts = np.cumsum(lengths) - lengths
+    positions = np.arange(lengths.sum()) + np.repeat(offsets[:-1][sets] - firsts, lengths)
+    keep = (rows >= 0) & (rows < n_base)
+    rows, fields, values = rows[keep], fields[positions[keep]], values[positions[keep]]
+    base.add_rows(rows, {
+        field: np.where(fields == i, -values, 0)
+        for i, field in enumerate(STAT_FIELDS)
+    })
+    return base
+
+
+def load_snapshot(source):
+    # source: a path, a binary file or bytes -> Snapshot. The columns
+    # section of a file read from a path becomes the store's columns as is.
+    buffer = _open(source, writable=True)
+    header = _read_header(buffer)
+    players = header["players"]
+    joined = bytes(_section(buffer, header, "names", np.uint8)).decode("utf-8")
+    names = joined.split("\0") if players else []
+    if header["keys_lowered"]:
+        keys = joined.lower().split("\0") if players else []
+    else:
+        keys = _unpack_strings(_section(buffer, header, "keys", np.uint8), players)
+    if len(names) != players or len(keys) != players:
+        raise ValueError("Snapshot file is truncated.")
+    block = _columns_block(buffer, header)
+    stats = StatsStore.from_block(names, block, keys)
+
+    records = _section(buffer, header, "events", EVENT_DTYPE)
+    if len(records) != header["events"]:
+        raise ValueError("Snapshot file is truncated.")
+    event_players = _unpack_strings(
+        _section(buffer, header, "event_players", np.uint8), header["event_players"]
+    )
+    events = _decode_events(buffer, header, records, event_players)
+    base = _base_store(buffer, header, stats, records, event_players)
+    return Snapshot(stats, base, events, header["cursor"], header["lineup"],
+                    header["current_batter_index"])
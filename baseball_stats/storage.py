@@ -0,0 +1,386 @@
+# storage.py
+#
+# Durable on-disk journal for the play log: SQLite in WAL mode. Mutations
+# are queued and group-committed by a background writer thread, so a tap
+# never waits on fsync. Startup loads the newest snapshot plus the tail of
+# the event log after it. Finished games (see season.py) are kept in their
+# own table, with the totals at the start of the current game. Each
+# snapshot also keeps the base-out tracker's state at its seq, so startup
+# replays only the events after it; the lineup and the current batter are
+# kept in meta.
+
+import atexit
+import datetime
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .playlog import PlayEvent
+from .season import GameInfo
+from .store import STAT_DTYPE, STAT_FIELDS, StatsStore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    play_type TEXT NOT NULL,
+    deltas TEXT NOT NULL,
+    batter_index INTEGER,
+    ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    seq INTEGER PRIMARY KEY,
+    names TEXT NOT NULL,
+    columns BLOB NOT NULL,
+    base_out TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS games (
+    game_id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    names TEXT NOT NULL,
+    columns BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game_base (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    names TEXT NOT NULL,
+    columns BLOB NOT NULL
+);
+"""
+
+
+def pack_store(stats):
+    names = json.dumps(stats.names)
+    size = len(stats)
+    block = np.empty((len(STAT_FIELDS), size), dtype=STAT_DTYPE)
+    for i, field in enumerate(STAT_FIELDS):
+        block[i] = stats.column(field)
+    return names, block.tobytes()
+
+
+def unpack_store(names, blob):
+    names = json.loads(names)
+    block = np.frombuffer(blob, dtype=STAT_DTYPE).reshape(len(STAT_FIELDS), len(names))
+    return StatsStore.from_columns(
+        names, {field: block[i] for i, field in enumerate(STAT_FIELDS)}
+    )
+
+
+class SQLiteStorage:
+    def __init__(self, path, flush_interval=0.05, batch_size=512, keep_snapshots=4):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.keep_snapshots = keep_snapshots
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(snapshots)")]
+        if "base_out" not in columns:
+            # Journals from before base-out states were kept per snapshot
+            conn.execute("ALTER TABLE snapshots ADD COLUMN base_out TEXT")
+        conn.commit()
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._closed = False
+        # First write error since the last flush()/close(), re-raised there
+        self._error = None
+        self._writer = threading.Thread(
+            target=self._run_writer, name="stats-journal", daemon=True
+        )
+        self._writer.start()
+        # Drain the queue on interpreter exit; the writer is a daemon thread.
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: commits survive a crashed process; only an OS crash
+        # can lose the last few group commits.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ----------------------------------------
+    # Journal interface (called by PlayLog)
+    # ----------------------------------------
+
+    def append(self, seq, event):
+        self._queue.put(("append", seq, event))
+
+    def set_cursor(self, seq):
+        self._queue.put(("cursor", seq))
+
+    def truncate(self, seq):
+        self._queue.put(("truncate", seq))
+
+    def snapshot(self, seq, stats):
+        # stats is a private copy owned by the log; it is never mutated.
+        self._queue.put(("snapshot", seq, stats))
+
+    def reset(self, stats):
+        self._queue.put(("reset", stats))
+
+    def set_base_out(self, seq, state):
+        # baseout.BaseOutTracker.to_state() at the snapshot taken at seq
+        # (0 is the start of the history, after reset()).
+        self._queue.put(("base_out", seq, state))
+
+    # ----------------------------------------
+    # Season interface (called by GameState)
+    # ----------------------------------------
+
+    def save_game(self, info, line):
+        self._queue.put(("game", info, line))
+
+    def delete_game(self, game_id):
+        self._queue.put(("delete_game", game_id))
+
+    def set_game_base(self, stats):
+        # stats is a copy the caller no longer mutates.
+        self._queue.put(("game_base", stats))
+
+    def set_lineup(self, lineup, current_batter_index):
+        self._queue.put(("lineup", lineup, current_batter_index))
+
+    # ----------------------------------------
+    # Loading
+    # ----------------------------------------
+
+    def load(self):
+        self.flush()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+            cursor = int(row[0]) if row else 0
+
+            snap = conn.execute(
+                "SELECT seq, names, columns FROM snapshots WHERE seq <= ? "
+                "ORDER BY seq DESC LIMIT 1",
+                (cursor,),
+            ).fetchone()
+            if snap is None:
+                base_seq, base = 0, StatsStore()
+            else:
+                base_seq, base = snap[0], unpack_store(snap[1], snap[2])
+
+            events = self._events(conn, "seq > ?", (base_seq,))
+        finally:
+            conn.close()
+        return base, base_seq, events, cursor
+
+    def load_lineup(self):
+        # -> (lineup, current batter index); ([], 0) if never saved
+        self.flush()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'lineup'").fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return [], 0
+        saved = json.loads(row[0])
+        return saved["lineup"], saved["current_batter_index"]
+
+    def load_base_out(self):
+        # -> (tracker state at the newest snapshot that has one, or None,
+        # the applied events after it)
+        self.flush()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+            cursor = int(row[0]) if row else 0
+            row = conn.execute(
+                "SELECT seq, base_out FROM snapshots WHERE seq <= ? "
+                "AND base_out IS NOT NULL ORDER BY seq DESC LIMIT 1",
+                (cursor,),
+            ).fetchone()
+            if row is None:
+                # Older journals kept only the start of the history, in meta
+                row = conn.execute(
+                    "SELECT 0, value FROM meta WHERE key = 'base_out'"
+                ).fetchone()
+            since = row[0] if row else 0
+            events = self._events(conn, "seq > ? AND seq <= ?", (since, cursor))
+        finally:
+            conn.close()
+        return json.loads(row[1]) if row else None, events
+
+    def _events(self, conn, where, args):
+        return [
+            PlayEvent(player, mode, play_type,
+                      tuple(tuple(pair) for pair in json.loads(deltas)),
+                      batter_index, ts)
+            for player, mode, play_type, deltas, batter_index, ts in conn.execute(
+                "SELECT player, mode, play_type, deltas, batter_index, ts "
+                f"FROM events WHERE {where} ORDER BY seq",
+                args,
+            )
+        ]
+
+    def load_season(self):
+        # -> ([(GameInfo, line)], totals at the start of the current game
+        # or None)
+        self.flush()
+        conn = self._connect()
+        try:
+            games = [
+                (GameInfo(game_id, datetime.date.fromisoformat(day), opponent),
+                 unpack_store(names, blob))
+                for game_id, day, opponent, names, blob in conn.execute(
+                    "SELECT game_id, date, opponent, names, columns FROM games "
+                    "ORDER BY game_id"
+                )
+            ]
+            row = conn.execute("SELECT names, columns FROM game_base").fetchone()
+        finally:
+            conn.close()
+        return games, unpack_store(*row) if row else None
+
+    # ----------------------------------------
+    # Writer thread
+    # ----------------------------------------
+
+    def flush(self):
+        # Waits for queued writes; doesn't hang if the writer has stopped.
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks and self._writer.is_alive():
+                done.wait(0.1)
+        self._raise_error()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+            self._raise_error()
+
+    def _raise_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+        if not self._writer.is_alive() and not self._closed:
+            raise RuntimeError("The journal writer has stopped.")
+
+    def _run_writer(self):
+        try:
+            self._write_loop()
+        except Exception as e:
+            logger.exception("Journal writer stopped")
+            self._error = e
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            op = self._queue.get()
+            if op is None:
+                self._queue.task_done()
+                break
+            batch = [op]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    op = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._queue.put(None)
+                    self._queue.task_done()
+                    break
+                batch.append(op)
+
+            try:
+                with conn:
+                    for op in batch:
+                        self._apply(conn, op)
+            except Exception as e:
+                logger.exception("Failed to write %d journal ops", len(batch))
+                if self._error is None:
+                    self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _apply(self, conn, op):
+        kind = op[0]
+        if kind == "append":
+            seq, event = op[1], op[2]
+            conn.execute(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (seq, event.player, event.mode, event.play_type,
+                 json.dumps(event.deltas), event.batter_index, event.timestamp),
+            )
+            self._set_cursor(conn, seq)
+        elif kind == "cursor":
+            self._set_cursor(conn, op[1])
+        elif kind == "truncate":
+            conn.execute("DELETE FROM events WHERE seq > ?", (op[1],))
+            conn.execute("DELETE FROM snapshots WHERE seq > ?", (op[1],))
+        elif kind == "snapshot":
+            seq, stats = op[1], op[2]
+            names, blob = pack_store(stats)
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, NULL)",
+                (seq, names, blob),
+            )
+            # Keep the base (seq 0) and the newest few snapshots.
+            conn.execute(
+                "DELETE FROM snapshots WHERE seq > 0 AND seq NOT IN "
+                "(SELECT seq FROM snapshots ORDER BY seq DESC LIMIT ?)",
+                (self.keep_snapshots,),
+            )
+        elif kind == "reset":
+            names, blob = pack_store(op[1])
+            conn.execute("DELETE FROM events")
+            conn.execute("DELETE FROM snapshots")
+            conn.execute("INSERT INTO snapshots VALUES (0, ?, ?, NULL)", (names, blob))
+            # A fresh tracker unless set_base_out() follows
+            conn.execute("DELETE FROM meta WHERE key = 'base_out'")
+            self._set_cursor(conn, 0)
+        elif kind == "lineup":
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('lineup', ?)",
+                (json.dumps({"lineup": op[1], "current_batter_index": op[2]}),),
+            )
+        elif kind == "base_out":
+            conn.execute(
+                "UPDATE snapshots SET base_out = ? WHERE seq = ?",
+                (json.dumps(op[2]), op[1]),
+            )
+        elif kind == "game":
+            info, line = op[1], op[2]
+            names, blob = pack_store(line)
+            conn.execute(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?)",
+                (info.game_id, info.date.isoformat(), info.opponent, names, blob),
+            )
+        elif kind == "delete_game":
+            conn.execute("DELETE FROM games WHERE game_id = ?", (op[1],))
+        elif kind == "game_base":
+            names, blob = pack_store(op[1])
+            conn.execute(
+                "INSERT OR REPLACE INTO game_base VALUES (0, ?, ?)", (names, blob)
+            )
+
+    def _set_cursor(self, conn, seq):
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('cursor', ?)",
+            (seq,),
+        )
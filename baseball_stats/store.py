@@ -0,0 +1,290 @@
+# store.py
+#
+# Columnar player stats store: one NumPy int array per counting stat plus a
+# name -> row index, replacing the old list of per-player dicts.
+
+import itertools
+import unicodedata
+
+import numpy as np
+
+# ----------------------------------------
+# Counting stat fields (column order)
+# ----------------------------------------
+HITTING_FIELDS = (
+    "At Bats", "Singles", "Doubles", "Triples", "Home Runs",
+    "Stolen Bases", "RBIs", "Walks", "Strikeouts",
+)
+PITCHING_FIELDS = (
+    "Pitch_Outs", "Pitch_ER", "Pitch_K", "Pitch_BB", "Pitch_H",
+)
+STAT_FIELDS = HITTING_FIELDS + PITCHING_FIELDS
+
+# Export / summary table abbreviations for the counting stats. Pitch_Outs
+# has none: tables show it as IP.
+COUNT_ABBREVIATIONS = {
+    "AB": "At Bats", "1B": "Singles", "2B": "Doubles", "3B": "Triples",
+    "HR": "Home Runs", "SB": "Stolen Bases", "RBI": "RBIs", "BB": "Walks",
+    "K": "Strikeouts", "ER": "Pitch_ER", "K (P)": "Pitch_K",
+    "BB (P)": "Pitch_BB", "H (P)": "Pitch_H",
+}
+
+STAT_DTYPE = np.int32
+# Largest value a stat column holds
+STAT_MAX = int(np.iinfo(STAT_DTYPE).max)
+
+# Versions are unique across all stores, so (version) alone is a safe cache
+# key for anything derived from a store's contents.
+_versions = itertools.count(1)
+
+
+def name_key(name):
+    # Canonical caseless key, so "José", "JOSE\u0301" and "josé" all map to
+    # the same player. Plain ASCII names skip the Unicode round trip.
+    name = name.strip()
+    if name.isascii():
+        return name.lower()
+    return unicodedata.normalize(
+        "NFC", unicodedata.normalize("NFD", name).casefold()
+    )
+
+
+class StatsStore:
+    def __init__(self, capacity=16):
+        self._capacity = max(int(capacity), 1)
+        self._size = 0
+        self._names = []
+        self._index_map = {}
+        self._pending_keys = None
+        self._columns = {
+            field: np.zeros(self._capacity, dtype=STAT_DTYPE)
+            for field in STAT_FIELDS
+        }
+        self.version = next(_versions)
+
+    @classmethod
+    def from_columns(cls, names, columns):
+        stats = cls(capacity=len(names))
+        for name in names:
+            stats.add_player(name)
+        for field in STAT_FIELDS:
+            if field in columns:
+                stats._columns[field][:len(names)] = columns[field]
+        stats.version = next(_versions)
+        return stats
+
+    @classmethod
+    def from_block(cls, names, block, keys=None):
+        # Bulk load: block[i] is the STAT_FIELDS[i] column for `names`;
+        # keys are their name_key()s when the caller already has them. A
+        # writable block is used as the columns in place, and the name
+        # index is built on the first lookup (see _index).
+        size = len(names)
+        if keys is None:
+            keys = [name_key(name) for name in names]
+        stats = cls()
+        stats._names = list(names)
+        stats._pending_keys = list(keys)
+        if len(stats._pending_keys) != size:
+            raise ValueError("Expected one key per player name.")
+        if size:
+            block = np.asarray(block, dtype=STAT_DTYPE)
+            if not block.flags.writeable:
+                block = block.copy()
+            stats._columns = {field: block[i] for i, field in enumerate(STAT_FIELDS)}
+            stats._capacity = size
+        stats._size = size
+        return stats
+
+    @property
+    def _index(self):
+        # name_key -> row, built from the pending keys of a bulk load the
+        # first time a name is looked up.
+        if self._pending_keys is not None:
+            index = dict(zip(self._pending_keys, range(self._size)))
+            if len(index) != self._size:
+                raise ValueError("Duplicate player names.")
+            self._index_map, self._pending_keys = index, None
+        return self._index_map
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name_key(name) in self._index
+
+    def __iter__(self):
+        for row in range(self._size):
+            yield self.player(row)
+
+    @property
+    def names(self):
+        return list(self._names)
+
+    def name_keys(self):
+        # name_key() of every player, in row order.
+        if self._pending_keys is not None:
+            return list(self._pending_keys)
+        keys = [None] * self._size
+        for key, row in self._index.items():
+            keys[row] = key
+        return keys
+
+    def row_of(self, name):
+        return self._index.get(name_key(name))
+
+    def name_at(self, row):
+        return self._names[row]
+
+    def column(self, field):
+        # Read-only view over the live rows; no copy.
+        view = self._columns[field][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def columns(self):
+        return {field: self.column(field) for field in STAT_FIELDS}
+
+    def player(self, row):
+        p = {"Player": self._names[row]}
+        for field in STAT_FIELDS:
+            p[field] = int(self._columns[field][row])
+        return p
+
+    def copy(self):
+        other = StatsStore(capacity=self._size or 1)
+        other._size = self._size
+        other._names = list(self._names)
+        if self._pending_keys is not None:
+            # Never mutated, so both stores can wait on the same list
+            other._pending_keys = self._pending_keys
+        else:
+            other._index_map = dict(self._index_map)
+        for field, col in self._columns.items():
+            other._columns[field][:self._size] = col[:self._size]
+        other.version = self.version
+        return other
+
+    def _grow(self, needed):
+        new_capacity = self._capacity
+        while new_capacity < needed:
+            new_capacity *= 2
+        if new_capacity == self._capacity:
+            return
+        for field, col in self._columns.items():
+            grown = np.zeros(new_capacity, dtype=STAT_DTYPE)
+            grown[:self._size] = col[:self._size]
+            self._columns[field] = grown
+        self._capacity = new_capacity
+
+    def add_player(self, name):
+        row = self._size
+        index = self._index
+        self._grow(row + 1)
+        self._names.append(name)
+        index[name_key(name)] = row
+        self._size += 1
+        self.version = next(_versions)
+        return row
+
+    def ensure_player(self, name):
+        row = self.row_of(name)
+        if row is None:
+            row = self.add_player(name)
+        return row
+
+    def increment(self, row, field, delta=1):
+        self._columns[field][row] += delta
+        self.version = next(_versions)
+
+    def apply_deltas(self, row, deltas, sign=1):
+        for field, delta in deltas.items():
+            self._columns[field][row] += sign * delta
+        self.version = next(_versions)
+
+    def merge_columns(self, names, columns):
+        # Bulk merge: names[i] gets columns[field][i] added for every field.
+        # Repeated names accumulate. Returns the number of players added.
+        before = self._size
+        row_for = {}
+        for name in names:
+            if name not in row_for:
+                row_for[name] = self.ensure_player(name)
+        rows = np.fromiter(
+            (row_for[name] for name in names), dtype=np.intp, count=len(names)
+        )
+        self.add_rows(rows, columns)
+        return self._size - before
+
+    def add_rows(self, rows, columns):
+        # Bulk add by row: rows[i] gets columns[field][i] added for every
+        # field. Repeated rows accumulate.
+        for field, values in columns.items():
+            np.add.at(self._columns[field], rows, np.asarray(values, dtype=STAT_DTYPE))
+        self.version = next(_versions)
+
+    def truncate(self, size):
+        # Drops every row from `size` on.
+        if size >= self._size:
+            return
+        for name in self._names[size:]:
+            del self._index[name_key(name)]
+        del self._names[size:]
+        for col in self._columns.values():
+            col[size:self._size] = 0
+        self._size = size
+        self.version = next(_versions)
+
+    def rename_player(self, old_name, new_name):
+        row = self.row_of(old_name)
+        if row is None:
+            raise KeyError(old_name)
+        new_key = name_key(new_name)
+        other = self._index.get(new_key)
+        if other is not None and other != row:
+            raise ValueError(f"A player named {new_name!r} already exists.")
+        del self._index[name_key(self._names[row])]
+        self._index[new_key] = row
+        self._names[row] = new_name
+        self.version = next(_versions)
+        return row
+
+    def remove_player(self, name):
+        # Keeps row order (tables list players in insertion order), so the
+        # rows after the removed one shift up by one.
+        row = self.row_of(name)
+        if row is None:
+            raise KeyError(name)
+        last = self._size - 1
+        for col in self._columns.values():
+            col[row:last] = col[row + 1:self._size]
+            col[last] = 0
+        del self._index[name_key(self._names[row])]
+        del self._names[row]
+        for moved in range(row, last):
+            self._index[name_key(self._names[moved])] = moved
+        self._size = last
+        self.version = next(_versions)
+        return row
+
+    def merge_or_add(self, entry):
+        # Same semantics as the old list-based merge: match on the
+        # normalized name, sum every counting stat, else append. Totals
+        # that don't fit a column are refused before anything changes.
+        row = self.row_of(entry["Player"])
+        for field in STAT_FIELDS:
+            total = entry.get(field, 0)
+            if row is not None:
+                total += int(self._columns[field][row])
+            if abs(total) > STAT_MAX:
+                raise ValueError(f"{field} would be larger than {STAT_MAX:,}.")
+        result = "merged"
+        if row is None:
+            row = self.add_player(entry["Player"])
+            result = "added"
+        for field in STAT_FIELDS:
+            value = entry.get(field, 0)
+            if value:
+                self._columns[field][row] += value
+        self.version = next(_versions)
+        return result
@@ -0,0 +1,206 @@
+# summary.py
+#
+# Summary rows, the fixed-width summary table and the TXT/CSV exports.
+# Exports are generators that format EXPORT_CHUNK_ROWS players at a time.
+
+import csv
+import io
+import random
+from datetime import datetime
+from operator import itemgetter
+
+from .formulas import (
+    format_batting_average,
+    format_ip,
+    format_rate,
+    format_three_decimal_rate,
+)
+from .formatting import batch_format_rates
+from .rates import batch_rate_stats
+from .store import COUNT_ABBREVIATIONS
+
+
+SUMMARY_HEADERS = [
+    "Player",
+    # Hitting (MLB-style abbreviations)
+    "AB", "1B", "2B", "3B", "HR",
+    "SB", "RBI", "BB", "K", "AVG", "OBP", "SLG", "OPS",
+    # Pitching
+    "IP", "ER", "K (P)", "BB (P)", "H (P)", "ERA", "WHIP"
+]
+
+
+def build_summary_rows(stats, row_ids=None):
+    # One vectorized pass for every rate column, each formatted a column
+    # at a time, then a plain zip over the columns to build the display
+    # rows. row_ids limits the build to a subset of players (used by the
+    # Live Summary cache).
+    cols = stats.columns()
+    if row_ids is None:
+        names = stats.names
+    else:
+        names = [stats.name_at(i) for i in row_ids]
+        cols = {field: col[row_ids] for field, col in cols.items()}
+    rates = batch_format_rates(batch_rate_stats(cols))
+
+    rows = []
+    for (name, ab, s, d, t, hr, sb, rbi, bb_h, k_h,
+         er, k_p, bb_p, h_p,
+         avg, obp, slg, ops, ip, era, whip) in zip(
+            names,
+            cols["At Bats"].tolist(), cols["Singles"].tolist(),
+            cols["Doubles"].tolist(), cols["Triples"].tolist(),
+            cols["Home Runs"].tolist(), cols["Stolen Bases"].tolist(),
+            cols["RBIs"].tolist(), cols["Walks"].tolist(),
+            cols["Strikeouts"].tolist(),
+            cols["Pitch_ER"].tolist(), cols["Pitch_K"].tolist(),
+            cols["Pitch_BB"].tolist(), cols["Pitch_H"].tolist(),
+            rates["AVG"], rates["OBP"], rates["SLG"], rates["OPS"],
+            rates["IP"], rates["ERA"], rates["WHIP"],
+    ):
+        rows.append({
+            "Player": name,
+            "AB": ab,
+            "1B": s,
+            "2B": d,
+            "3B": t,
+            "HR": hr,
+            "SB": sb,
+            "RBI": rbi,
+            "BB": bb_h,
+            "K": k_h,
+            "AVG": avg,
+            "OBP": obp,
+            "SLG": slg,
+            "OPS": ops,
+            "IP": ip,
+            "ER": er,
+            "K (P)": k_p,
+            "BB (P)": bb_p,
+            "H (P)": h_p,
+            "ERA": era,
+            "WHIP": whip,
+        })
+    return rows
+
+
+def generate_export_filename(stats):
+    names = [n.replace(" ", "_") for n in stats.names]
+    name_part = "_".join(names) if names else "no_players"
+    rand = random.randint(1, 1_000_000)
+    date = datetime.now().strftime("%m-%d-%y")
+    return f"{name_part}_stats_{rand}_{date}.txt"
+
+
+# ----------------------------------------
+# Export helpers (generated in chunks of rows)
+# ----------------------------------------
+
+EXPORT_CHUNK_ROWS = 1000
+
+# Summary table columns backed by a rate formatter (the counting stat
+# columns are COUNT_ABBREVIATIONS)
+SUMMARY_RATE_FORMATS = {
+    "AVG": format_batting_average,
+    "OBP": format_three_decimal_rate,
+    "SLG": format_three_decimal_rate,
+    "OPS": format_three_decimal_rate,
+    "IP": format_ip,
+    "ERA": format_rate,
+    "WHIP": format_rate,
+}
+
+
+def iter_summary_row_chunks(stats, chunk_rows=EXPORT_CHUNK_ROWS):
+    size = len(stats)
+    for start in range(0, size, chunk_rows):
+        yield build_summary_rows(stats, range(start, min(start + chunk_rows, size)))
+
+
+def summary_column_widths(stats):
+    # Widest value per column without formatting every row first: each
+    # formatter is monotonic, so only a column's min and max matter.
+    widths = {h: len(h) for h in SUMMARY_HEADERS}
+    if not len(stats):
+        return widths
+
+    widths["Player"] = max(widths["Player"], max(map(len, stats.names)))
+
+    cols = stats.columns()
+    for header, field in COUNT_ABBREVIATIONS.items():
+        col = cols[field]
+        widths[header] = max(widths[header], len(str(col.min())), len(str(col.max())))
+
+    rates = batch_rate_stats(cols)
+    for header, fmt in SUMMARY_RATE_FORMATS.items():
+        col = rates[header]
+        widths[header] = max(
+            widths[header], len(fmt(float(col.min()))), len(fmt(float(col.max())))
+        )
+    return widths
+
+
+def iter_summary_table(stats):
+    headers = SUMMARY_HEADERS
+    widths = summary_column_widths(stats)
+    col_widths = [widths[h] for h in headers]
+
+    # One format string for the whole row instead of a ljust per cell
+    row_fmt = "\n" + " | ".join(f"{{:<{w}}}" for w in col_widths)
+    values = itemgetter(*headers)
+
+    yield row_fmt[1:].format(*headers)
+    yield "\n" + "-+-".join("-" * w for w in col_widths)
+    for rows in iter_summary_row_chunks(stats):
+        yield "".join([row_fmt.format(*values(row)) for row in rows])
+
+
+def format_summary_table(stats):
+    return "".join(iter_summary_table(stats))
+
+
+# (label, summary column) for each line of a player's TXT record
+TEXT_RECORD_LINES = [
+    ("Player", "Player"),
+    # Hitting (MLB labels)
+    ("AB", "AB"), ("1B", "1B"), ("2B", "2B"), ("3B", "3B"), ("HR", "HR"),
+    ("SB", "SB"), ("RBI", "RBI"), ("BB", "BB"), ("K", "K"),
+    ("AVG", "AVG"), ("OBP", "OBP"), ("SLG", "SLG"), ("OPS", "OPS"),
+    # Pitching
+    ("IP", "IP"), ("ER (P)", "ER"), ("K (P)", "K (P)"), ("BB (P)", "BB (P)"),
+    ("H (P)", "H (P)"), ("ERA", "ERA"), ("WHIP", "WHIP"),
+]
+
+
+def iter_export_text(stats):
+    yield "Baseball Stats Log\n\n"
+
+    # Each record ends in a blank line
+    record_fmt = "".join(f"{label}: {{}}\n" for label, _ in TEXT_RECORD_LINES) + "\n"
+    values = itemgetter(*(column for _, column in TEXT_RECORD_LINES))
+    for rows in iter_summary_row_chunks(stats):
+        yield "".join([record_fmt.format(*values(row)) for row in rows])
+
+    yield "Summary Table:\n\n"
+    yield from iter_summary_table(stats)
+
+
+def build_export_text(stats):
+    return "".join(iter_export_text(stats))
+
+
+def iter_export_csv(stats):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(SUMMARY_HEADERS)
+    for rows in iter_summary_row_chunks(stats):
+        writer.writerows([row[h] for h in SUMMARY_HEADERS] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+EXPORT_FORMATS = {"txt": iter_export_text, "csv": iter_export_csv}
@@ -0,0 +1,89 @@
+# tables.py
+#
+# Paged summary table: sorting and filtering run on the numeric columns
+# server-side, and only the visible page of rows is formatted (through the
+# per-row summary cache) and sent to the browser.
+
+import numpy as np
+
+from .rates import batch_rate_stats
+from .store import COUNT_ABBREVIATIONS, name_key
+from .summary import SUMMARY_HEADERS
+
+TABLE_PAGE_SIZES = (25, 50, 100, 250)
+
+
+def _sort_keys(stats, header, rows):
+    # Numeric sort key for each of `rows`; names sort by their rank.
+    if header == "Player":
+        keys = stats.name_keys()
+        names = np.array([keys[row] for row in rows.tolist()])
+        return np.unique(names, return_inverse=True)[1]
+    if header in COUNT_ABBREVIATIONS:
+        return stats.column(COUNT_ABBREVIATIONS[header])[rows]
+    if header == "IP":
+        return stats.column("Pitch_Outs")[rows]
+    cols = {field: col[rows] for field, col in stats.columns().items()}
+    return batch_rate_stats(cols)[header]
+
+
+class SummaryTableView:
+    def __init__(self, summary_cache):
+        self.summary_cache = summary_cache
+        # (version, query, sort_by, descending) -> (matching rows, sort keys)
+        self._selection = None
+
+    def _select(self, stats, query, sort_by, descending):
+        cache_key = (stats.version, query, sort_by, descending)
+        if self._selection is not None and self._selection[0] == cache_key:
+            return self._selection[1]
+
+        if query:
+            needle = name_key(query)
+            rows = np.fromiter(
+                (row for row, key in enumerate(stats.name_keys()) if needle in key),
+                dtype=np.intp,
+            )
+        else:
+            rows = np.arange(len(stats))
+
+        keys = None
+        if sort_by is not None and len(rows):
+            keys = _sort_keys(stats, sort_by, rows)
+            if descending:
+                keys = -keys.astype(np.float64)
+        self._selection = (cache_key, (rows, keys))
+        return rows, keys
+
+    def page(self, stats, page=0, page_size=50, sort_by=None, descending=False,
+             query=""):
+        # -> (display rows for the page, number of matching players)
+        if sort_by is not None and sort_by not in SUMMARY_HEADERS:
+            raise ValueError(f"Can't sort by {sort_by!r}.")
+        rows, keys = self._select(stats, query.strip(), sort_by, descending)
+        total = len(rows)
+        page = min(max(page, 0), page_count(total, page_size) - 1)
+        start = page * page_size
+        end = min(start + page_size, total)
+        if start >= end:
+            return [], total
+
+        if keys is None:
+            picked = rows[start:end]
+        else:
+            # Only the first `end` positions need ordering: find the
+            # end-th smallest key, then sort everything up to it (all ties
+            # included, so equal keys keep roster order).
+            if end < total:
+                kth = keys[np.argpartition(keys, end - 1)[end - 1]]
+                prefix = np.flatnonzero(keys <= kth)
+            else:
+                prefix = np.arange(total)
+            prefix = prefix[np.lexsort((prefix, keys[prefix]))]
+            picked = rows[prefix[start:end]]
+        return self.summary_cache.rows(stats, picked.tolist()), total
+
+
+def page_count(total, page_size):
+    return max(1, -(-total // page_size))
+
@@ -0,0 +1,80 @@
+# test_app_sessions.py
+#
+# Several browser sessions on one database (app.py with BASEBALL_STATS_DB).
+
+import pathlib
+
+import pytest
+
+st = pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+from baseball_stats.game import GameState
+from baseball_stats.storage import SQLiteStorage
+
+APP = str(pathlib.Path(__file__).resolve().parents[1] / "app.py")
+GAME_TAB = "⚡ Game Mode (Fast Tap)"
+
+
+def open_session(tab):
+    at = AppTest.from_file(APP, default_timeout=60)
+    run = at._run
+
+    def run_on_tab(*args, **kwargs):
+        # AppTest doesn't keep the selected tab between runs
+        at.session_state["active_tab"] = tab
+        return run(*args, **kwargs)
+
+    at._run = run_on_tab
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+
+def tap(at, label):
+    next(b for b in at.button if b.label == label).click().run()
+    assert not at.exception, at.exception
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = tmp_path / "stats.db"
+    monkeypatch.setenv("BASEBALL_STATS_DB", str(path))
+    st.cache_resource.clear()
+    yield path
+    st.cache_resource.clear()
+
+
+def test_sessions_keep_their_own_game_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv("BASEBALL_STATS_DB", raising=False)
+    monkeypatch.delenv("BASEBALL_STATS_SERVER", raising=False)
+    monkeypatch.chdir(tmp_path)
+    a = open_session(GAME_TAB)
+    b = open_session(GAME_TAB)
+    assert a.session_state.game is not b.session_state.game
+    assert a.session_state.game.play_log.journal is None
+    assert not list(tmp_path.iterdir())  # nothing written to disk
+
+
+def test_sessions_share_one_game_and_restore(database):
+    a = open_session(GAME_TAB)
+    b = open_session(GAME_TAB)
+    game = a.session_state.game
+    assert b.session_state.game is game
+
+    game.lineup = ["Alice"]
+    a.run()
+    tap(a, "Home Run")
+    tap(a, "Home Run")
+    game.lineup = ["Bob"]
+    b.run()
+    tap(b, "Single")
+    tap(b, "Single")
+    game.play_log.journal.flush()
+
+    restored = GameState.restore(SQLiteStorage(str(database)))
+    alice = restored.get_player_by_name("Alice")
+    bob = restored.get_player_by_name("Bob")
+    assert alice["Home Runs"] == 2 and alice["At Bats"] == 2
+    assert bob["Singles"] == 2 and bob["At Bats"] == 2
+    assert restored.play_log.seq == 4
@@ -0,0 +1,128 @@
+# test_baseout.py
+#
+# Base-out state and run expectancy across finished games, undo/redo and
+# restarts from the journal.
+
+import datetime
+import sqlite3
+
+import numpy as np
+import pytest
+
+from baseball_stats.baseout import START_STATE
+from baseball_stats.game import GameState
+from baseball_stats.storage import SQLiteStorage
+
+DAY = datetime.date(2024, 5, 4)
+# Ten plays per lap: two half-innings, three runs in the first
+PLAYS = ["Single", "Walk", "Home Run", "Strikeout", "Out", "Out",
+         "Double", "Strikeout", "Out", "Out"]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "stats.db")
+
+
+def play(game, n, start=0):
+    for i in range(start, start + n):
+        game.record_fast_tap_play(f"Batter {i % 9}", PLAYS[i % len(PLAYS)])
+
+
+def restart(game, path):
+    game.play_log.journal.close()
+    return GameState.restore(SQLiteStorage(path))
+
+
+def same_tracker(a, b):
+    (ma, ca), (mb, cb) = a.matrix(), b.matrix()
+    return (a.state == b.state and a.innings == b.innings
+            and np.array_equal(ca, cb) and np.allclose(ma, mb, equal_nan=True))
+
+
+def test_restart_past_a_log_snapshot(db_path):
+    game = GameState.restore(SQLiteStorage(db_path))
+    play(game, 457)  # snapshots at 200 and 400
+    restored = restart(game, db_path)
+    assert restored.play_log.seq == 457
+    assert same_tracker(restored.base_out, game.base_out)
+    assert restored.base_out.innings == 91
+
+    # Undo after the restart walks the same states back
+    for _ in range(3):
+        game.undo_last_play()
+        restored.undo_last_play()
+        assert same_tracker(restored.base_out, game.base_out)
+
+
+def test_restart_after_a_history_reset(db_path):
+    game = GameState.restore(SQLiteStorage(db_path))
+    play(game, 25)
+    game.rename_player("Batter 0", "Ace")  # new history, same tracker
+    play(game, 4, start=25)
+    restored = restart(game, db_path)
+    assert same_tracker(restored.base_out, game.base_out)
+    assert restored.base_out.innings == 5
+
+
+def test_finish_game_undo_and_restart(db_path):
+    game = GameState.restore(SQLiteStorage(db_path))
+    play(game, 14)
+    innings = game.base_out.innings
+    matrix = game.base_out.matrix()
+    game.finish_game(DAY, "Hawks")
+    assert game.base_out.state == START_STATE
+    assert game.base_out.innings == innings
+
+    # Undo/redo can't reach the filed game, so neither moves the tracker
+    assert game.undo_last_play() is None
+    assert game.redo_last_play() is None
+    assert game.base_out.state == START_STATE
+    assert game.base_out.innings == innings
+
+    play(game, 3)
+    after = game.base_out.state
+    game.undo_last_play()
+    game.redo_last_play()
+    assert game.base_out.state == after
+
+    restored = restart(game, db_path)
+    assert same_tracker(restored.base_out, game.base_out)
+    np.testing.assert_array_equal(restored.base_out.matrix()[1], matrix[1])
+    restored.finish_game(DAY, "Owls")
+    assert restart(restored, db_path).base_out.state == START_STATE
+
+
+def test_restart_replays_only_the_plays_after_the_newest_snapshot(db_path):
+    game = GameState.restore(SQLiteStorage(db_path))
+    play(game, 457)
+    game.play_log.journal.flush()
+    state, events = game.play_log.journal.load_base_out()
+    assert state is not None and len(events) == 57
+
+    # Undone past the newest snapshot: the one before it is used
+    for _ in range(60):
+        game.undo_last_play()
+    restored = restart(game, db_path)
+    assert len(restored.play_log.journal.load_base_out()[1]) == 197
+    assert same_tracker(restored.base_out, game.base_out)
+
+
+def test_restart_from_a_journal_without_snapshot_states(db_path):
+    # Older journals: no base_out column, the starting state in meta
+    game = GameState.restore(SQLiteStorage(db_path))
+    play(game, 5)
+    game.rename_player("Batter 0", "Ace")
+    play(game, 230, start=5)
+    game.play_log.journal.close()
+    conn = sqlite3.connect(db_path)
+    with conn:
+        state = conn.execute("SELECT base_out FROM snapshots WHERE seq = 0").fetchone()[0]
+        conn.execute("INSERT INTO meta VALUES ('base_out', ?)", (state,))
+        conn.execute("ALTER TABLE snapshots DROP COLUMN base_out")
+    conn.close()
+
+    restored = GameState.restore(SQLiteStorage(db_path))
+    assert same_tracker(restored.base_out, game.base_out)
+    play(restored, 200, start=235)  # states are kept from here on
+    assert len(restart(restored, db_path).play_log.journal.load_base_out()[1]) == 30
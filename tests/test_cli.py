@@ -0,0 +1,45 @@
+# test_cli.py
+
+import pytest
+
+from baseball_stats import cli
+from baseball_stats.game import GameState
+from baseball_stats.storage import SQLiteStorage
+
+
+@pytest.fixture
+def game_files(tmp_path):
+    (tmp_path / "a.csv").write_text("Player,AB,1B\nAlice,4,2\n")
+    (tmp_path / "b.csv").write_text("Player,AB,1B\nAlice,3,1\nBob,2,0\n")
+    (tmp_path / "huge.csv").write_text("Player,AB\n\"" + "x" * 200_000 + "\",1\n")
+    (tmp_path / "no_player.csv").write_text("Name,AB\nDan,1\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_aggregate_skips_malformed_files(game_files, jobs):
+    stats, reports = cli.aggregate([str(game_files)], jobs=jobs)
+    errors = {path.rsplit("/", 1)[-1]: report for path, report in reports
+              if isinstance(report, str)}
+    assert sorted(errors) == ["huge.csv", "no_player.csv"]
+    assert errors["huge.csv"].startswith("Malformed CSV")
+    assert stats.names == ["Alice", "Bob"]
+    assert stats.player(stats.row_of("Alice"))["At Bats"] == 7
+
+
+def test_aggregate_command_reports_failures(game_files, tmp_path, capsys):
+    out = tmp_path / "season.csv"
+    assert cli.main(["aggregate", str(game_files), "--csv", str(out)]) == 1
+    assert "Aggregated 2 files, 2 players." in capsys.readouterr().err
+    assert out.read_text().splitlines()[1].startswith("Alice,")
+
+
+def test_simulate_uses_the_lineup_saved_in_the_database(tmp_path, capsys):
+    path = str(tmp_path / "game.db")
+    game = GameState.restore(SQLiteStorage(path))
+    game.lineup = ["Ann", "Bo"]
+    for play_type in ("Single", "Out", "Walk", "Strikeout"):
+        game.record_fast_tap_play(game.lineup[game.current_batter_index], play_type)
+    game.play_log.journal.close()
+    assert cli.main(["simulate", "--db", path, "--games", "200"]) == 0
+    assert "Lineup: Ann, Bo" in capsys.readouterr().out
@@ -0,0 +1,168 @@
+# test_export.py
+#
+# TXT / CSV exports must match the original app.py output byte for byte.
+# The reference below is the export code from app.py before the stats
+# moved into baseball_stats (formulas, table layout and CSV loop).
+
+import csv
+import io
+
+import numpy as np
+import pytest
+
+from baseball_stats.store import STAT_FIELDS, StatsStore
+from baseball_stats.summary import build_export_text, iter_export_csv
+
+
+# ----------------------------------------
+# Reference: the original app.py
+# ----------------------------------------
+
+def calculate_batting_average(s, d, t, hr, ab):
+    hits = s + d + t + hr
+    return hits / ab if ab > 0 else 0.0
+
+def format_batting_average(avg):
+    return f".{int(round(avg * 1000)):03d}"
+
+def calculate_ip(outs):
+    return outs / 3.0
+
+def format_ip(ip):
+    return f"{ip:.1f}"
+
+def calculate_era(er, outs):
+    ip = calculate_ip(outs)
+    return (9.0 * er / ip) if ip > 0 else 0.0
+
+def calculate_whip(bb, h, outs):
+    ip = calculate_ip(outs)
+    return ((bb + h) / ip) if ip > 0 else 0.0
+
+def calculate_obp(s, d, t, hr, bb, ab):
+    hits = s + d + t + hr
+    denom = ab + bb
+    return hits / denom if denom > 0 else 0.0
+
+def calculate_slg(s, d, t, hr, ab):
+    total_bases = s + 2 * d + 3 * t + 4 * hr
+    return total_bases / ab if ab > 0 else 0.0
+
+def format_three_decimal_rate(val):
+    return f".{int(round(val * 1000)):03d}"
+
+def format_rate(val):
+    return f"{val:.2f}"
+
+HEADERS = [
+    "Player",
+    "AB", "1B", "2B", "3B", "HR",
+    "SB", "RBI", "BB", "K", "AVG", "OBP", "SLG", "OPS",
+    "IP", "ER", "K (P)", "BB (P)", "H (P)", "ERA", "WHIP"
+]
+
+
+def reference_row(p):
+    s, d, t, hr = p["Singles"], p["Doubles"], p["Triples"], p["Home Runs"]
+    ab, bb_h = p["At Bats"], p["Walks"]
+    obp = calculate_obp(s, d, t, hr, bb_h, ab)
+    slg = calculate_slg(s, d, t, hr, ab)
+    outs = p["Pitch_Outs"]
+    return [
+        p["Player"], ab, s, d, t, hr, p["Stolen Bases"], p["RBIs"], bb_h,
+        p["Strikeouts"],
+        format_batting_average(calculate_batting_average(s, d, t, hr, ab)),
+        format_three_decimal_rate(obp),
+        format_three_decimal_rate(slg),
+        format_three_decimal_rate(obp + slg),
+        format_ip(calculate_ip(outs)),
+        p["Pitch_ER"], p["Pitch_K"], p["Pitch_BB"], p["Pitch_H"],
+        format_rate(calculate_era(p["Pitch_ER"], outs)),
+        format_rate(calculate_whip(p["Pitch_BB"], p["Pitch_H"], outs)),
+    ]
+
+
+def reference_table(stats):
+    rows = [dict(zip(HEADERS, reference_row(p))) for p in stats]
+    header_row = dict(zip(HEADERS, HEADERS))
+    col_widths = [
+        max(len(str(row.get(h, h))) for row in rows + [header_row])
+        for h in HEADERS
+    ]
+
+    def row_fmt(row_dict):
+        return " | ".join(
+            f"{str(row_dict.get(h, '')).ljust(w)}"
+            for h, w in zip(HEADERS, col_widths)
+        )
+
+    table = [row_fmt(header_row)]
+    table.append("-+-".join("-" * w for w in col_widths))
+    for row in rows:
+        table.append(row_fmt(row))
+    return "\n".join(table)
+
+
+def reference_text(stats):
+    lines = ["Baseball Stats Log\n"]
+    labels = ["AB", "1B", "2B", "3B", "HR", "SB", "RBI", "BB", "K", "AVG",
+              "OBP", "SLG", "OPS", "IP", "ER (P)", "K (P)", "BB (P)", "H (P)",
+              "ERA", "WHIP"]
+    for p in stats:
+        lines.append(f"Player: {p['Player']}")
+        values = reference_row(p)[1:]
+        for label, value in zip(labels, values):
+            lines.append(f"{label}: {value}")
+        lines[-1] += "\n"
+    lines.append("Summary Table:\n")
+    lines.append(reference_table(stats))
+    return "\n".join(lines)
+
+
+def reference_csv(stats):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADERS)
+    for p in stats:
+        writer.writerow(reference_row(p))
+    return buffer.getvalue()
+
+
+# ----------------------------------------
+# Tests
+# ----------------------------------------
+
+def random_store(n, seed):
+    rng = np.random.default_rng(seed)
+    names = ["Ana, Jr.", 'Bo "Big" Lee', "José", "Zoë Ünal", "x" * 40]
+    names += [f"Player {i}" for i in range(n - len(names))]
+    stats = StatsStore()
+    for i, name in enumerate(names):
+        entry = {"Player": name}
+        if i % 7:  # some players with no stats at all
+            for field in STAT_FIELDS:
+                entry[field] = int(rng.integers(0, 6 if field != "At Bats" else 40))
+            entry["At Bats"] = max(entry["At Bats"], entry["Singles"] + entry["Doubles"]
+                                   + entry["Triples"] + entry["Home Runs"])
+        stats.merge_or_add(entry)
+    return stats
+
+
+@pytest.mark.parametrize("n, seed", [(0, 0), (5, 1), (60, 2), (1500, 3)])
+def test_exports_match_the_original_app(n, seed):
+    stats = random_store(n, seed) if n else StatsStore()
+    players = list(stats)
+    assert build_export_text(stats) == reference_text(players)
+    assert "".join(iter_export_csv(stats)) == reference_csv(players)
+
+
+def test_rate_edge_cases_match():
+    stats = StatsStore()
+    # OPS over 1, perfect averages, a pitcher with no outs, partial innings
+    stats.merge_or_add({"Player": "Slugger", "At Bats": 3, "Home Runs": 3, "Walks": 2})
+    stats.merge_or_add({"Player": "Opener", "Pitch_ER": 4, "Pitch_BB": 2})
+    stats.merge_or_add({"Player": "Closer", "Pitch_Outs": 7, "Pitch_H": 1, "Pitch_ER": 1})
+    stats.merge_or_add({"Player": "Rounder", "At Bats": 8, "Singles": 1})
+    players = list(stats)
+    assert build_export_text(stats) == reference_text(players)
+    assert "".join(iter_export_csv(stats)) == reference_csv(players)
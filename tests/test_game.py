@@ -0,0 +1,48 @@
+# test_game.py
+#
+# GameState: finished games and the undo history.
+
+import datetime
+
+import pytest
+
+from baseball_stats.game import GameState
+
+DAY = datetime.date(2024, 5, 4)
+
+
+def test_undo_stops_at_a_finished_game():
+    game = GameState()
+    game.record_fast_tap_play("Alice", "Single")
+    game.record_fast_tap_play("Alice", "Home Run")
+    game.finish_game(DAY, "Hawks")
+
+    assert not game.play_log.can_undo
+    assert game.undo_last_play() is None
+    assert game.get_player_by_name("Alice")["At Bats"] == 2
+    assert not len(game.current_game_line())
+
+    game.record_fast_tap_play("Alice", "Strikeout")
+    assert game.undo_last_play().play_type == "Strikeout"
+    assert game.undo_last_play() is None
+    assert not len(game.current_game_line())
+    with pytest.raises(ValueError):
+        game.finish_game(DAY, "Owls")
+
+    game.record_fast_tap_play("Alice", "Walk")
+    game.finish_game(DAY, "Owls")
+    first, second = (game.season.game(info.game_id) for info in game.season.games())
+    assert first.player(0)["At Bats"] == 2
+    assert second.player(0)["At Bats"] == 0
+    assert second.player(0)["Walks"] == 1
+    assert game.get_player_by_name("Alice")["At Bats"] == 2
+
+
+def test_merge_entries_that_would_overflow_are_refused():
+    game = GameState()
+    game.record_merge_entry({"Player": "Ann", "At Bats": 2_000_000_000})
+    for at_bats in (2_000_000_000, 3 * 10 ** 9):
+        with pytest.raises(ValueError):
+            game.record_merge_entry({"Player": "Ann", "At Bats": at_bats})
+    assert game.get_player_by_name("Ann")["At Bats"] == 2_000_000_000
+    assert len(game.play_log) == 1
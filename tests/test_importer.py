@@ -0,0 +1,72 @@
+# test_importer.py
+
+import io
+
+from baseball_stats.importer import STAT_MAX, import_csv
+from baseball_stats.store import StatsStore
+
+
+def run_import(stats, text):
+    return import_csv(stats, io.StringIO(text))
+
+
+def messages(report):
+    return [(error.line, error.player, error.message) for error in report.errors]
+
+
+def test_rows_are_validated_and_reported_by_line():
+    stats = StatsStore()
+    report = run_import(stats, (
+        "Player,AB,1B,BB\n"
+        "Alice,4,2,1\n"
+        "Bob,1,5,0\n"
+        "Cara,-1,0,0\n"
+        "Dan,x,0,0\n"
+        ",3,1,0\n"
+        "Eve,0,0,0\n"
+    ))
+    assert report.rows_read == 6 and report.rows_imported == 1
+    assert messages(report) == [
+        (3, "Bob", "Too many hits for At Bats."),
+        (4, "Cara", "Stats can't be negative."),
+        (5, "Dan", "Stats must be whole numbers."),
+        (6, "", "Missing player name."),
+        (7, "Eve", "Please enter stats for a new player."),
+    ]
+    assert stats.names == ["Alice"]
+
+
+def test_values_past_the_column_limit_are_rejected():
+    stats = StatsStore()
+    report = run_import(stats, (
+        "Player,AB\n"
+        "Alice,3000000000\n"
+        "Bob,99999999999999999999999\n"
+        f"Cara,{STAT_MAX}\n"
+    ))
+    assert [(line, player) for line, player, _ in messages(report)] == [(2, "Alice"), (3, "Bob")]
+    assert stats.player(stats.row_of("Cara"))["At Bats"] == STAT_MAX
+
+
+def test_totals_that_would_overflow_are_rejected():
+    stats = StatsStore()
+    run_import(stats, "Player,AB\nAlice,2000000000\n")
+    report = run_import(stats, (
+        "Player,AB\n"
+        "alice,147483648\n"   # one past the limit with the existing total
+        "Alice,100\n"         # still fits once the row above is rejected
+        "Bob,2000000000\n"
+        "BOB,2000000000\n"    # repeated names accumulate within a file
+    ))
+    assert [(line, message) for line, _, message in messages(report)] == [
+        (2, f"Totals would be larger than {STAT_MAX:,}."),
+        (5, f"Totals would be larger than {STAT_MAX:,}."),
+    ]
+    assert stats.player(stats.row_of("Alice"))["At Bats"] == 2000000100
+    assert stats.player(stats.row_of("Bob"))["At Bats"] == 2000000000
+
+
+def test_ip_becomes_outs():
+    stats = StatsStore()
+    run_import(stats, "Player,IP,ER\nPat,2.3,1\n")
+    assert stats.player(stats.row_of("Pat"))["Pitch_Outs"] == 7
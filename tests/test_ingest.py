@@ -0,0 +1,60 @@
+# test_ingest.py
+#
+# Ingest feeds against a live scoring server on a free port.
+
+import asyncio
+
+import pytest
+
+from baseball_stats import cli, server as server_module
+from baseball_stats.game import GameState
+from baseball_stats.ingest import IngestClient, ingest_plays
+from baseball_stats.server import INGEST_MAX_EVENTS, ScoringServer
+
+
+def run_feed(plays, **kwargs):
+    game = GameState()
+
+    async def main():
+        server = await ScoringServer(game, port=0).start()
+        try:
+            return await ingest_plays(plays, port=server.port, **kwargs)
+        finally:
+            await server.close()
+
+    return game, asyncio.run(main())
+
+
+def test_rejected_plays_are_reported():
+    plays = [("Alice", "Single"), ("", "Single"), ("Bob", "Homer"), ("Bob", "Walk")]
+    game, result = run_feed(plays, batch_events=3)
+    assert (result.sent, result.accepted, result.errors) == (4, 2, [])
+    assert [index for index, _ in result.rejected] == [1, 2]
+    assert game.stats.names == ["Alice", "Bob"]
+
+
+def test_refused_batch_counts_as_rejected(monkeypatch):
+    monkeypatch.setattr(server_module, "INGEST_MAX_EVENTS", 3)
+    plays = [("Alice", "Single")] * 5
+    game, result = run_feed(plays, batch_events=4)
+    assert (result.sent, result.accepted) == (5, 1)
+    assert result.errors == ["Batches are limited to 3 events."]
+    assert [index for index, _ in result.rejected] == [0, 1, 2, 3]
+    assert game.get_player_by_name("Alice")["Singles"] == 1
+
+
+def test_batch_over_the_server_limit_is_refused_up_front(capsys):
+    with pytest.raises(ValueError):
+        IngestClient(batch_events=INGEST_MAX_EVENTS + 1)
+    assert cli.main(["ingest", "--synthetic", "10", "--batch", "20000"]) == 2
+    assert "--batch" in capsys.readouterr().err
+
+
+def test_malformed_entries_are_rejected_by_index():
+    plays = [("Alice", "Single"), ("B", ["x"]), ("Bob", "Walk", {"m": 1}),
+             (["Bob"], "Single"), ("Cy", "Double")]
+    game, result = run_feed(plays, batch_events=10)
+    assert (result.sent, result.accepted, result.errors) == (5, 2, [])
+    assert [index for index, _ in result.rejected] == [1, 2, 3]
+    assert game.stats.names == ["Alice", "Cy"]
+    assert game.play_log.seq == 2
@@ -0,0 +1,79 @@
+# test_leaders.py
+#
+# Leaderboard heaps against a plain full sort of the league, after random
+# taps, undos and redos.
+
+import random
+
+import numpy as np
+import pytest
+
+from baseball_stats.game import GameState
+from baseball_stats.leaders import LEADERBOARDS
+from baseball_stats.playlog import PLAY_DELTAS
+from baseball_stats.rates import batch_rate_stats
+
+PLAYS = [(mode, play) for mode, plays in PLAY_DELTAS.items() for play in plays]
+
+
+def full_sort(game, board, k):
+    # Every qualifying row sorted by value, ties by row: [(row, value)]
+    leaders = game.leaders
+    spec = LEADERBOARDS[board]
+    cols = {field: np.asarray(col) for field, col in game.stats.columns().items()}
+    values = spec.value(cols, batch_rate_stats(cols))
+    ok = spec.qualifies(cols, leaders.min_pa, int(round(leaders.min_ip * 3)))
+    rows = np.flatnonzero(ok).tolist()
+    sign = -1 if spec.descending else 1
+    rows.sort(key=lambda row: (sign * values[row], row))
+    return [(row, values[row].item()) for row in rows[:k]]
+
+
+def check_boards(game, k):
+    for board in LEADERBOARDS:
+        assert game.leaders.top(game.stats, board, k) == full_sort(game, board, k), board
+
+
+@pytest.mark.parametrize("min_pa, min_ip", [(1, 0.3), (10, 3.0)])
+def test_boards_match_a_full_sort_after_taps_and_undos(min_pa, min_ip):
+    rng = random.Random(7)
+    game = GameState()
+    game.leaders.set_qualifiers(min_pa, min_ip)
+    # Few players and few play kinds, so values tie often
+    players = [f"Player {i}" for i in range(12)]
+    for step in range(600):
+        roll = rng.random()
+        if roll < 0.15:
+            game.undo_last_play()
+        elif roll < 0.2:
+            game.redo_last_play()
+        else:
+            mode, play = rng.choice(PLAYS)
+            game.record_fast_tap_play(rng.choice(players), play, mode=mode)
+        if step % 7 == 0:
+            check_boards(game, rng.choice([1, 3, 10, 50]))
+    check_boards(game, 50)
+
+
+def test_boards_follow_removed_players_and_new_qualifiers():
+    game = GameState()
+    for i in range(5):
+        for _ in range(i + 1):
+            game.record_fast_tap_play(f"Player {i}", "Home Run")
+    check_boards(game, 10)
+    game.remove_player("Player 2")
+    check_boards(game, 10)
+    game.leaders.set_qualifiers(1, 0.3)
+    check_boards(game, 10)
+
+
+def test_rows_rank_and_format():
+    game = GameState()
+    game.leaders.set_qualifiers(1, 0.3)
+    for name, plays in [("Ann", ["Single", "Out", "Out"]), ("Bo", ["Double", "Out"])]:
+        for play in plays:
+            game.record_fast_tap_play(name, play)
+    assert game.leaderboard("AVG", 2) == [
+        {"Rank": 1, "Player": "Bo", "AVG": ".500"},
+        {"Rank": 2, "Player": "Ann", "AVG": ".333"},
+    ]
@@ -0,0 +1,50 @@
+# test_optimize.py
+#
+# Batting-order search against trying every order of a short lineup.
+
+import itertools
+
+import numpy as np
+import pytest
+
+from baseball_stats.optimize import expected_runs, optimize_lineup
+from baseball_stats.simulate import outcome_probabilities
+from baseball_stats.store import StatsStore
+
+HITTERS = {
+    "Slugger": {"At Bats": 40, "Home Runs": 9, "Doubles": 4, "Singles": 5,
+                "Walks": 8, "Strikeouts": 12},
+    "Slap": {"At Bats": 50, "Singles": 19, "Doubles": 2, "Walks": 2, "Strikeouts": 4},
+    "Walker": {"At Bats": 30, "Singles": 6, "Walks": 22, "Strikeouts": 8},
+    "Gap": {"At Bats": 45, "Singles": 8, "Doubles": 9, "Triples": 2, "Strikeouts": 10},
+    "Weak": {"At Bats": 60, "Singles": 6, "Strikeouts": 28},
+}
+
+
+@pytest.fixture
+def stats():
+    stats = StatsStore()
+    for name, counts in HITTERS.items():
+        stats.merge_or_add(dict(counts, Player=name))
+    return stats
+
+
+@pytest.mark.parametrize("starts", [1, 4])
+def test_finds_the_best_of_every_order(stats, starts):
+    lineup = ["Weak", "Gap", "Walker", "Slap", "Slugger"]
+    probs = outcome_probabilities(stats, lineup)
+    orders = list(itertools.permutations(range(len(lineup))))
+    values = expected_runs(probs[np.array(orders)])
+    best = orders[int(np.argmax(values))]
+
+    result = optimize_lineup(stats, lineup, starts=starts)
+    assert result.lineup == [lineup[i] for i in best]
+    assert result.runs_per_game == pytest.approx(values.max(), abs=1e-12)
+    assert result.current_runs_per_game == pytest.approx(values[0], abs=1e-12)
+
+
+def test_chunks_give_the_same_runs():
+    rng = np.random.default_rng(5)
+    probs = rng.random((70, 9, 7))
+    probs /= probs.sum(axis=2, keepdims=True)
+    assert np.array_equal(expected_runs(probs, chunk=70), expected_runs(probs, chunk=8))
@@ -0,0 +1,105 @@
+# test_playlog.py
+#
+# PlayLog: undo/redo, the redo branch, and rebuilding totals from the log.
+
+import random
+
+import pytest
+
+from baseball_stats.playlog import PLAY_DELTAS, PlayLog, make_play_event
+from baseball_stats.store import STAT_FIELDS, StatsStore
+
+HITTING = list(PLAY_DELTAS["hitting"])
+
+
+def tap(log, stats, player, play_type, mode="hitting"):
+    return log.append(make_play_event(player, mode, play_type), stats)
+
+
+def totals(stats):
+    # By name, players with stats only: undo keeps the row of a player its
+    # event added (with zero stats), so rows can differ from a rebuild.
+    players = (stats.player(row) for row in range(len(stats)))
+    return {p.pop("Player"): p for p in players if any(p[f] for f in STAT_FIELDS)}
+
+
+def test_undo_redo():
+    stats = StatsStore()
+    log = PlayLog(base=stats)
+    tap(log, stats, "Ann", "Single")
+    tap(log, stats, "Ann", "Home Run")
+    tap(log, stats, "Bo", "Pitch Inning Complete", mode="pitching")
+
+    assert log.undo(stats).play_type == "Pitch Inning Complete"
+    assert stats.player(1)["Pitch_Outs"] == 0
+    assert log.undo(stats).play_type == "Home Run"
+    ann = stats.player(0)
+    assert (ann["At Bats"], ann["Home Runs"]) == (1, 0)
+    assert log.can_undo and log.can_redo
+    assert log.last_event.play_type == "Single"
+
+    assert log.redo(stats).play_type == "Home Run"
+    assert stats.player(0)["Home Runs"] == 1
+    assert log.undo(stats) and log.undo(stats)
+    assert log.undo(stats) is None
+    assert stats.player(0)["At Bats"] == 0 and len(log) == 0
+
+
+def test_new_play_drops_the_redo_branch():
+    stats = StatsStore()
+    log = PlayLog(base=stats)
+    for play_type in ("Single", "Double", "Triple"):
+        tap(log, stats, "Ann", play_type)
+    log.undo(stats)
+    log.undo(stats)
+    tap(log, stats, "Ann", "Walk")
+    assert not log.can_redo
+    assert log.redo(stats) is None
+    assert [e.play_type for e in log.events] == ["Single", "Walk"]
+    ann = stats.player(0)
+    assert (ann["At Bats"], ann["Doubles"], ann["Triples"], ann["Walks"]) == (1, 0, 0, 1)
+
+
+@pytest.mark.parametrize("snapshot_every", [1, 3, 200])
+def test_rebuild_matches_live_totals(snapshot_every):
+    rng = random.Random(snapshot_every)
+    stats = StatsStore()
+    log = PlayLog(base=stats, snapshot_every=snapshot_every, max_snapshots=2)
+    for _ in range(500):
+        roll = rng.random()
+        if roll < 0.2:
+            log.undo(stats)
+        elif roll < 0.3:
+            log.redo(stats)
+        else:
+            tap(log, stats, f"P{rng.randrange(6)}", rng.choice(HITTING))
+        assert totals(log.rebuild()) == totals(stats)
+
+
+def test_restore_from_a_snapshot():
+    stats = StatsStore()
+    log = PlayLog(base=stats, snapshot_every=4)
+    for i in range(10):
+        tap(log, stats, "Ann", HITTING[i % len(HITTING)])
+    log.undo(stats)
+    events, cursor = log.history
+
+    # What storage keeps: the snapshot at seq 8 and the events after it
+    restored, rebuilt = PlayLog.restore(log._snapshots[8], 8, events[8:], log.seq)
+    assert totals(rebuilt) == totals(stats)
+    assert restored.seq == 9 and restored.can_redo
+    restored.redo(rebuilt)
+    log.redo(stats)
+    assert totals(rebuilt) == totals(stats)
+    # Undo reaches back to the snapshot, not past it
+    assert [restored.undo(rebuilt) is not None for _ in range(3)] == [True, True, False]
+
+
+def test_reset_starts_a_new_history():
+    stats = StatsStore()
+    log = PlayLog(base=stats)
+    tap(log, stats, "Ann", "Single")
+    log.reset(stats)
+    assert not log.can_undo and log.seq == 0
+    assert totals(log.base) == totals(stats)
+    assert log.undo(stats) is None and stats.player(0)["Singles"] == 1
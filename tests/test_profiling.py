@@ -0,0 +1,46 @@
+# test_profiling.py
+#
+# Per-rerun profiler: full script runs and fragment reruns.
+
+from baseball_stats.profiling import Profiler
+
+
+def sections(profiler):
+    return {row["Section"]: row["Samples"] for row in profiler.summary_rows()}
+
+
+def test_fragment_rerun_is_a_run_of_its_own():
+    profiler = Profiler(enabled=True)
+    # Full script run: the fragment is part of it
+    profiler.start_run()
+    with profiler.fragment_run(), profiler.section("fragment"):
+        pass
+    profiler.end_run()
+    # The fragment rerunning alone
+    with profiler.fragment_run(), profiler.section("fragment"):
+        pass
+    assert profiler.counters["reruns"] == 1
+    assert profiler.counters["fragment reruns"] == 1
+    assert sections(profiler) == {"fragment": 2, "fragment rerun": 1, "rerun": 1}
+
+
+def test_fragment_run_ends_when_the_fragment_raises(tmp_path):
+    log = tmp_path / "profile.jsonl"
+    profiler = Profiler(enabled=True, log_path=str(log))
+    try:
+        with profiler.fragment_run():
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    profiler.start_run()
+    profiler.end_run()
+    assert profiler.counters["fragment reruns"] == 1
+    assert "reruns interrupted" not in profiler.counters
+    assert [line.count('"kind": "fragment rerun"') for line in log.read_text().splitlines()] == [1, 0]
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.fragment_run(), profiler.section("fragment"):
+        pass
+    assert not profiler.summary_rows() and not profiler.counters
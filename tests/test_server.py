@@ -0,0 +1,130 @@
+# test_server.py
+#
+# Request validation in ScoringServer.dispatch: a bad message is refused
+# before anything changes.
+
+import pytest
+
+from baseball_stats.game import GameState
+from baseball_stats.importer import STAT_MAX
+from baseball_stats.playlog import PlayLog, make_play_event
+from baseball_stats.server import ScoringServer
+from baseball_stats.store import StatsStore
+
+
+@pytest.fixture
+def server():
+    game = GameState()
+    game.record_merge_entry({"Player": "Alice", "At Bats": 3, "Singles": 1})
+    return ScoringServer(game)
+
+
+def request(server, op, **fields):
+    return server.dispatch(dict(fields, op=op, id=1))
+
+
+def unchanged(server):
+    game = server.game
+    return (game.stats.names == ["Alice"] and len(game.play_log) == 1
+            and game.get_player_by_name("Alice")["At Bats"] == 3)
+
+
+@pytest.mark.parametrize("player", [None, 7, ["Alice"], "", "   "])
+def test_tap_needs_a_player_name(server, player):
+    response = request(server, "tap", player=player, play_type="Single")
+    assert not response["ok"]
+    assert unchanged(server)
+
+
+@pytest.mark.parametrize("fields", [
+    {"play_type": "Homer"},
+    {"play_type": "Single", "mode": "pitching"},
+    {"play_type": "Single", "mode": ["hitting"]},
+    {"play_type": ["Single"]},
+])
+def test_tap_needs_a_known_play(server, fields):
+    response = request(server, "tap", player="Bob", **fields)
+    assert not response["ok"]
+    assert unchanged(server)
+
+
+def test_tap(server):
+    response = request(server, "tap", player="Bob", play_type="Double")
+    assert response["ok"]
+    assert server.game.get_player_by_name("Bob")["Doubles"] == 1
+
+
+@pytest.mark.parametrize("entry, error", [
+    ("Bob", "Expected an entry object."),
+    ({"At Bats": 1}, "Missing player name."),
+    ({"Player": 5, "At Bats": 1}, "Missing player name."),
+    ({"Player": "Bob", "At Bats": "1"}, "Stats must be whole numbers."),
+    ({"Player": "Bob", "At Bats": 1.5}, "Stats must be whole numbers."),
+    ({"Player": "Bob", "At Bats": True}, "Stats must be whole numbers."),
+    ({"Player": "Bob", "At Bats": None}, "Stats must be whole numbers."),
+    ({"Player": "Bob", "Walks": -1}, "Stats can't be negative."),
+    ({"Player": "Bob", "Walks": 10 ** 30}, f"Stats can't be larger than {STAT_MAX:,}."),
+    ({"Player": "Bob", "At Bats": 1, "Singles": 2}, "Too many hits for At Bats."),
+    ({"Player": "Bob"}, "Please enter stats for a new player."),
+    ({"Player": "alice", "At Bats": STAT_MAX}, f"Totals would be larger than {STAT_MAX:,}."),
+])
+def test_merge_is_validated(server, entry, error):
+    response = request(server, "merge", entry=entry)
+    assert not response["ok"]
+    assert response["error"] == error
+    assert unchanged(server)
+
+
+def test_merge(server):
+    response = request(server, "merge", entry={"Player": "alice", "At Bats": 2, "Home Runs": 2})
+    assert response["ok"] and response["result"] == "merged"
+    alice = server.game.get_player_by_name("Alice")
+    assert (alice["At Bats"], alice["Home Runs"]) == (5, 2)
+
+
+def test_failed_append_leaves_no_trace():
+    stats = StatsStore()
+    log = PlayLog(base=stats)
+    log.append(make_play_event("Alice", "hitting", "Single"), stats)
+    bad = make_play_event("Bob", "merge", "Add/Merge",
+                          deltas={"At Bats": 1, "Nope": 1})
+    with pytest.raises(KeyError):
+        log.append(bad, stats)
+    assert stats.names == ["Alice"]
+    assert len(log) == 1 and not log.can_redo
+    assert stats.player(0) == log.rebuild().player(0)
+
+
+def test_ingest_rejects_malformed_entries_without_losing_the_rest(server):
+    pushes = []
+    server.push = lambda kind, **fields: pushes.append((kind, fields))
+    events = [["Bob", "Single"], ["B", ["x"]], 5, ["Cy", "Walk", ["hitting"]],
+              ["Cy", "Single", "hitting", "x"], ["Cy", "Out"]]
+    response = request(server, "ingest", events=events)
+    assert response["ok"] and response["accepted"] == 2
+    assert [i for i, _ in response["rejected"]] == [1, 2, 3, 4]
+    assert server.game.play_log.seq == 3
+    assert [kind for kind, _ in pushes] == ["plays"]
+    assert len(pushes[0][1]["events"]) == 2
+
+
+@pytest.mark.parametrize("index", ["x", None, 1.5, -1, [0]])
+def test_lineup_is_unchanged_by_a_bad_batter_index(server, index):
+    server.game.lineup = ["Alice", "Bob"]
+    server.game.current_batter_index = 1
+    pushes = []
+    server.push = lambda kind, **fields: pushes.append(kind)
+    response = request(server, "lineup", lineup=["Cy", "Dee", "Eve"],
+                       current_batter_index=index)
+    assert not response["ok"]
+    assert server.game.lineup == ["Alice", "Bob"]
+    assert server.game.current_batter_index == 1
+    assert not request(server, "batter", current_batter_index=index)["ok"]
+    assert server.game.current_batter_index == 1
+    assert pushes == []
+
+
+def test_lineup(server):
+    response = request(server, "lineup", lineup=["Cy", "Dee"], current_batter_index=1)
+    assert response["ok"]
+    assert (server.game.lineup, server.game.current_batter_index) == (["Cy", "Dee"], 1)
@@ -0,0 +1,42 @@
+# test_simulate.py
+#
+# Monte Carlo simulator against the exact Markov chain in optimize.py.
+
+import numpy as np
+import pytest
+
+from baseball_stats.optimize import expected_runs
+from baseball_stats.simulate import outcome_probabilities, simulate_lineup
+from baseball_stats.store import StatsStore
+
+HITTERS = {
+    "Slugger": {"At Bats": 40, "Home Runs": 8, "Doubles": 4, "Singles": 6,
+                "Walks": 10, "Strikeouts": 12},
+    "Slap": {"At Bats": 50, "Singles": 18, "Doubles": 2, "Walks": 3, "Strikeouts": 4},
+    "Walker": {"At Bats": 30, "Singles": 6, "Walks": 20, "Strikeouts": 8},
+    "Weak": {"At Bats": 60, "Singles": 7, "Strikeouts": 25},
+}
+
+
+@pytest.fixture
+def stats():
+    stats = StatsStore()
+    for name, counts in HITTERS.items():
+        stats.merge_or_add(dict(counts, Player=name))
+    return stats
+
+
+@pytest.mark.parametrize("innings", [1, 9])
+def test_mean_matches_the_markov_chain(stats, innings):
+    lineup = list(HITTERS)
+    result = simulate_lineup(stats, lineup, n_games=60_000, innings=innings, seed=11)
+    exact = expected_runs(outcome_probabilities(stats, lineup)[None], innings)[0]
+    assert abs(result.runs_per_game - exact) < 4 * result.std_error
+
+
+def test_results_depend_on_the_seed_only(stats):
+    lineup = list(HITTERS)
+    a = simulate_lineup(stats, lineup, n_games=5_000, seed=2, chunk_games=1_000)
+    b = simulate_lineup(stats, lineup, n_games=5_000, seed=2, chunk_games=1_000, jobs=2)
+    assert a.runs_per_game == b.runs_per_game
+    assert np.array_equal(a.distribution, b.distribution)
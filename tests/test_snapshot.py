@@ -0,0 +1,88 @@
+# test_snapshot.py
+#
+# Binary snapshots: everything a GameState saves comes back, including
+# the play log's redo branch and the base totals it starts from.
+
+import io
+
+import pytest
+
+from baseball_stats.game import GameState
+from baseball_stats.snapshot import load_snapshot, map_snapshot_columns, snapshot_bytes
+from baseball_stats.store import STAT_FIELDS
+
+
+def players(stats):
+    return [stats.player(row) for row in range(len(stats))]
+
+
+def sample_game():
+    game = GameState()
+    game.record_merge_entry({"Player": "Straße", "At Bats": 10, "Singles": 3, "Pitch_Outs": 7})
+    game.rename_player("Straße", "Strasse Jr.")  # history restarts: a player in the base
+    game.lineup = ["Strasse Jr.", "José", "Zoë"]
+    game.record_fast_tap_play("José", "Home Run")
+    game.record_fast_tap_play("Zoë", "Walk")
+    game.record_fast_tap_play("Strasse Jr.", "Pitch Inning Complete", mode="pitching")
+    game.record_merge_entry({"Player": "josé", "RBIs": 4, "Pitch_H": 2})
+    game.record_fast_tap_play("Zoë", "Triple")
+    game.undo_last_play()
+    game.undo_last_play()  # a two-play redo branch
+    return game
+
+
+@pytest.mark.parametrize("via", ["bytes", "file", "path"])
+def test_round_trip(tmp_path, via):
+    game = sample_game()
+    if via == "bytes":
+        source = snapshot_bytes(game)
+    elif via == "file":
+        source = io.BytesIO()
+        game.save_snapshot(source)
+        source.seek(0)
+    else:
+        source = tmp_path / "game.bbsnap"
+        game.save_snapshot(str(source))
+        source = str(source)
+
+    loaded = GameState()
+    loaded.load_snapshot(source)
+    assert players(loaded.stats) == players(game.stats)
+    assert loaded.play_log.history == game.play_log.history
+    assert players(loaded.play_log.base) == players(game.play_log.base)
+    assert loaded.lineup == game.lineup
+    assert loaded.current_batter_index == game.current_batter_index
+
+    # The redo branch replays, and undo walks back to the same base
+    for _ in range(2):
+        assert loaded.redo_last_play() == game.redo_last_play()
+    assert players(loaded.stats) == players(game.stats)
+    while game.undo_last_play():
+        loaded.undo_last_play()
+    assert not loaded.play_log.can_undo
+    assert players(loaded.stats) == players(game.stats)
+
+
+def test_empty_game():
+    snap = load_snapshot(snapshot_bytes(GameState()))
+    assert len(snap.stats) == 0 and snap.events == [] and snap.cursor == 0
+
+
+def test_mapped_columns(tmp_path):
+    game = sample_game()
+    path = str(tmp_path / "game.bbsnap")
+    game.save_snapshot(path)
+    names, columns = map_snapshot_columns(path)
+    assert names == game.stats.names
+    for field in STAT_FIELDS:
+        assert columns[field].tolist() == game.stats.column(field).tolist()
+
+
+def test_rejects_other_files():
+    data = snapshot_bytes(sample_game())
+    with pytest.raises(ValueError):
+        load_snapshot(b"Player,AB\nAnn,1\n")
+    with pytest.raises(ValueError):
+        load_snapshot(b"")
+    with pytest.raises(ValueError):
+        load_snapshot(data[:len(data) // 2])
@@ -0,0 +1,143 @@
+# test_storage.py
+
+import datetime
+import io
+
+import pytest
+
+from baseball_stats.game import GameState
+from baseball_stats.playlog import PLAY_DELTAS, make_play_event
+from baseball_stats.storage import SQLiteStorage
+
+HITTING = list(PLAY_DELTAS["hitting"])
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "stats.db"))
+    yield storage
+    try:
+        storage.close()
+    except Exception:
+        pass
+
+
+def test_write_error_is_raised_from_flush(storage):
+    # Deltas json can't encode: a TypeError inside the writer thread
+    event = make_play_event("Alice", "merge", "Add/Merge", deltas={"At Bats": object()})
+    storage.append(1, event)
+    with pytest.raises(TypeError):
+        storage.flush()
+    # The writer survives and later writes still land
+    storage.append(1, make_play_event("Alice", "hitting", "Single"))
+    storage.flush()
+    assert len(storage.load()[2]) == 1
+
+
+def test_stopped_writer_doesnt_hang_flush_or_close(tmp_path):
+    class BrokenStorage(SQLiteStorage):
+        def _write_loop(self):
+            raise OSError("disk went away")
+
+    storage = BrokenStorage(str(tmp_path / "stats.db"))
+    storage._writer.join(5)
+    storage.set_cursor(1)
+    with pytest.raises(OSError):
+        storage.flush()
+    with pytest.raises(RuntimeError):
+        storage.flush()
+    storage.close()
+
+
+# ----------------------------------------
+# Restoring a GameState from the journal
+# ----------------------------------------
+
+def restart(game, path):
+    game.play_log.journal.close()
+    return GameState.restore(SQLiteStorage(path))
+
+
+def same_state(a, b):
+    return (a.stats.names == b.stats.names
+            and all(a.stats.player(i) == b.stats.player(i) for i in range(len(a.stats)))
+            and a.play_log.seq == b.play_log.seq
+            and a.play_log.can_undo == b.play_log.can_undo
+            and a.play_log.can_redo == b.play_log.can_redo)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "game.db")
+
+
+def test_restore_plays_with_undo_and_redo(db_path):
+    game = GameState.restore(SQLiteStorage(db_path))
+    for i in range(430):  # past two log snapshots
+        game.record_fast_tap_play(f"P{i % 5}", HITTING[i % len(HITTING)])
+    for _ in range(40):  # back across the snapshot at 400
+        game.undo_last_play()
+    game.redo_last_play()
+    restored = restart(game, db_path)
+    assert restored.play_log.seq == 391
+    assert same_state(restored, game)
+
+    # The redo branch survived the restart
+    assert restored.redo_last_play() == game.redo_last_play()
+    assert same_state(restored, game)
+    # ... and a new play still drops it, in the journal too
+    restored.record_fast_tap_play("P0", "Walk")
+    again = restart(restored, db_path)
+    assert same_state(again, restored)
+    assert not again.play_log.can_redo
+
+
+def test_restore_after_roster_edits_and_a_finished_game(db_path):
+    game = GameState.restore(SQLiteStorage(db_path))
+    game.record_merge_entry({"Player": "Ann", "At Bats": 4, "Singles": 2})
+    game.record_fast_tap_play("Bo", "Double")
+    game.finish_game(datetime.date(2024, 5, 4), "Hawks")
+    game.rename_player("Ann", "Annie")
+    game.record_fast_tap_play("Annie", "Home Run")
+    game.remove_player("Bo")
+
+    restored = restart(game, db_path)
+    assert same_state(restored, game)
+    assert restored.stats.names == ["Annie"]
+    assert [(g.opponent, g.date) for g in restored.season.games()] == [
+        ("Hawks", datetime.date(2024, 5, 4))
+    ]
+    line = restored.current_game_line()
+    assert line.names == ["Annie"] and line.player(0)["Home Runs"] == 1
+
+
+def test_restore_after_loading_a_snapshot(db_path):
+    source = GameState()
+    for play_type in ("Single", "Double", "Triple"):
+        source.record_fast_tap_play("Ann", play_type)
+    source.undo_last_play()
+    buffer = io.BytesIO()
+    source.save_snapshot(buffer)
+
+    game = GameState.restore(SQLiteStorage(db_path))
+    game.record_fast_tap_play("Bo", "Walk")
+    buffer.seek(0)
+    game.load_snapshot(buffer)
+    restored = restart(game, db_path)
+    assert same_state(restored, source)
+    assert restored.redo_last_play().play_type == "Triple"
+
+
+def test_restore_lineup_and_current_batter(db_path):
+    game = GameState.restore(SQLiteStorage(db_path))
+    game.lineup = ["Ann", "Bo", "Cy"]
+    game.record_fast_tap_play("Ann", "Single")
+    game.record_fast_tap_play("Bo", "Walk")
+    restored = restart(game, db_path)
+    assert restored.lineup == ["Ann", "Bo", "Cy"]
+    assert restored.current_batter_index == 2
+
+    restored.rename_player("Bo", "Bob")
+    restored.undo_last_play()  # nothing to undo after the rename
+    again = restart(restored, db_path)
+    assert (again.lineup, again.current_batter_index) == (["Ann", "Bob", "Cy"], 2)
@@ -0,0 +1,127 @@
+# test_store.py
+#
+# StatsStore: merging, renaming, removing and the name_key matching rules.
+
+import numpy as np
+import pytest
+
+from baseball_stats.store import STAT_FIELDS, STAT_MAX, StatsStore, name_key
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Theo", "theo"),
+    ("  Theo ", "THEO"),
+    ("José", "JOSÉ"),
+    ("José", "josé"),
+    ("Straße", "STRASSE"),
+])
+def test_name_key_matches(a, b):
+    assert name_key(a) == name_key(b)
+
+
+@pytest.mark.parametrize("a, b", [("Theo", "Theodore"), ("Jose", "José"), ("Jo Ann", "JoAnn")])
+def test_name_key_keeps_different_names_apart(a, b):
+    assert name_key(a) != name_key(b)
+
+
+def test_merge_or_add():
+    stats = StatsStore(capacity=1)
+    assert stats.merge_or_add({"Player": "José", "At Bats": 3, "Singles": 1}) == "added"
+    assert stats.merge_or_add({"Player": " JOSÉ", "At Bats": 2, "Walks": 1}) == "merged"
+    assert stats.merge_or_add({"Player": "Bo", "Pitch_Outs": 4}) == "added"
+    assert stats.names == ["José", "Bo"]  # first spelling is kept
+    jose = stats.player(stats.row_of("josé"))
+    assert (jose["At Bats"], jose["Singles"], jose["Walks"]) == (5, 1, 1)
+    assert stats.player(1) == dict({f: 0 for f in STAT_FIELDS}, Player="Bo", Pitch_Outs=4)
+
+
+def test_merge_or_add_refuses_totals_past_the_column_limit():
+    stats = StatsStore()
+    stats.merge_or_add({"Player": "Ann", "At Bats": 2_000_000_000})
+    with pytest.raises(ValueError):
+        stats.merge_or_add({"Player": "ann", "Walks": 1, "At Bats": 2_000_000_000})
+    with pytest.raises(ValueError):
+        stats.merge_or_add({"Player": "Bo", "At Bats": 3 * 10 ** 9})
+    assert stats.names == ["Ann"]
+    assert stats.player(0)["At Bats"] == 2_000_000_000 and stats.player(0)["Walks"] == 0
+    stats.merge_or_add({"Player": "Ann", "At Bats": STAT_MAX - 2_000_000_000})
+    assert stats.player(0)["At Bats"] == STAT_MAX
+
+
+def test_merge_columns_accumulates_repeated_names():
+    stats = StatsStore()
+    stats.merge_or_add({"Player": "Ann", "At Bats": 1})
+    added = stats.merge_columns(["ann", "Cy", "CY", "Dee"],
+                                {"At Bats": [2, 3, 4, 5]})
+    assert added == 2
+    assert stats.names == ["Ann", "Cy", "Dee"]
+    assert stats.column("At Bats").tolist() == [3, 7, 5]
+
+
+def test_rename():
+    stats = StatsStore()
+    for name in ("Ann", "Bo"):
+        stats.merge_or_add({"Player": name, "At Bats": 1})
+    version = stats.version
+    assert stats.rename_player("ann", "Annie") == 0
+    assert stats.version != version
+    assert stats.names == ["Annie", "Bo"]
+    assert "Ann" not in stats and stats.row_of("ANNIE") == 0
+
+    stats.rename_player("Annie", "ANNIE")  # same player, new spelling
+    assert stats.names == ["ANNIE", "Bo"]
+    with pytest.raises(ValueError):
+        stats.rename_player("ANNIE", "bo")
+    with pytest.raises(KeyError):
+        stats.rename_player("Cy", "Dee")
+
+
+def test_remove_keeps_row_order():
+    stats = StatsStore()
+    for i, name in enumerate(["Ann", "Bo", "Cy", "Dee"]):
+        stats.merge_or_add({"Player": name, "At Bats": i + 1})
+    assert stats.remove_player("bo") == 1
+    assert stats.names == ["Ann", "Cy", "Dee"]
+    assert [stats.row_of(n) for n in ("Ann", "Cy", "Dee")] == [0, 1, 2]
+    assert stats.column("At Bats").tolist() == [1, 3, 4]
+    assert "Bo" not in stats
+    with pytest.raises(KeyError):
+        stats.remove_player("Bo")
+
+    # The freed slot is clean for the next player
+    stats.merge_or_add({"Player": "Eve", "Walks": 1})
+    assert stats.player(3)["At Bats"] == 0
+
+
+def test_copy_is_independent():
+    stats = StatsStore()
+    stats.merge_or_add({"Player": "Ann", "At Bats": 1})
+    other = stats.copy()
+    stats.increment(0, "At Bats", 5)
+    stats.add_player("Bo")
+    assert other.names == ["Ann"] and other.player(0)["At Bats"] == 1
+
+
+def test_column_views_are_read_only():
+    stats = StatsStore()
+    stats.merge_or_add({"Player": "Ann", "At Bats": 1})
+    with pytest.raises(ValueError):
+        stats.column("At Bats")[0] = 9
+
+
+def test_from_block_uses_the_block_and_indexes_names_on_first_lookup():
+    block = np.zeros((len(STAT_FIELDS), 2), dtype=np.int32)
+    block[0] = [3, 4]
+    stats = StatsStore.from_block(["Ann", "José"], block)
+    other = stats.copy()
+    stats.increment(stats.row_of("JOSÉ"), "At Bats")
+    assert block[0].tolist() == [3, 5]
+    assert other.row_of("josé") == 1 and other.player(1)["At Bats"] == 4
+    assert stats.add_player("Bo") == 2 and stats.name_keys() == ["ann", "josé", "bo"]
+
+
+def test_from_block_refuses_duplicate_names_on_lookup():
+    block = np.zeros((len(STAT_FIELDS), 2), dtype=np.int32)
+    stats = StatsStore.from_block(["Ann", "ANN"], block)
+    with pytest.raises(ValueError):
+        stats.row_of("Ann")
@@ -0,0 +1,91 @@
+# test_tables.py
+#
+# Paged summary table: page edges, filters and stable sorting against a
+# plain sort of the whole roster.
+
+import random
+
+import pytest
+
+from baseball_stats.game import GameState
+from baseball_stats.rates import batch_rate_stats
+from baseball_stats.store import COUNT_ABBREVIATIONS
+from baseball_stats.tables import page_count
+
+
+@pytest.fixture(scope="module")
+def game():
+    rng = random.Random(3)
+    game = GameState()
+    # Few plays each, so many players tie on every column
+    for i in range(137):
+        name = f"{rng.choice(['Ann', 'Bo', 'Cy', 'Di'])} {i:03d}"
+        game.stats.add_player(name)
+        for _ in range(rng.randrange(4)):
+            game.record_fast_tap_play(name, rng.choice(["Single", "Home Run", "Out", "Walk"]))
+    return game
+
+
+def expected_order(game, sort_by, descending, query=""):
+    # Names of every matching player, stable-sorted the slow way
+    stats = game.stats
+    rows = [row for row, key in enumerate(stats.name_keys()) if query.lower() in key]
+    if sort_by is None:
+        return [stats.name_at(row) for row in rows]
+    if sort_by == "Player":
+        values = stats.name_keys()
+    elif sort_by in COUNT_ABBREVIATIONS:
+        values = stats.column(COUNT_ABBREVIATIONS[sort_by]).tolist()
+    else:
+        values = batch_rate_stats(stats.columns())[sort_by].tolist()
+    if descending:
+        # Reversing a stable sort would reverse the ties too
+        rows.sort(key=lambda row: values[row], reverse=True)
+    else:
+        rows.sort(key=lambda row: values[row])
+    return [stats.name_at(row) for row in rows]
+
+
+def all_pages(game, page_size, **kwargs):
+    names = []
+    for page in range(page_count(game.summary_page(0, page_size, **kwargs)[1], page_size)):
+        rows, _ = game.summary_page(page, page_size, **kwargs)
+        assert len(rows) <= page_size
+        names += [row["Player"] for row in rows]
+    return names
+
+
+@pytest.mark.parametrize("sort_by", [None, "Player", "HR", "AB", "AVG", "IP"])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("page_size", [25, 50, 137, 250])
+def test_pages_match_a_stable_full_sort(game, sort_by, descending, page_size):
+    assert all_pages(game, page_size, sort_by=sort_by, descending=descending) == \
+        expected_order(game, sort_by, descending)
+
+
+def test_filter_pages(game):
+    assert all_pages(game, 25, sort_by="HR", descending=True, query=" bo ") == \
+        expected_order(game, "HR", True, query="bo")
+
+
+def test_page_edges(game):
+    total = len(game.stats)
+    last = page_count(total, 25) - 1
+    rows, count = game.summary_page(last, 25)
+    assert count == total and len(rows) == total - last * 25
+    # Past either end clamps to the first/last page
+    assert game.summary_page(last + 5, 25)[0] == rows
+    assert game.summary_page(-3, 25)[0] == game.summary_page(0, 25)[0]
+    # An exact multiple of the page size has no empty trailing page
+    assert page_count(50, 25) == 2 and page_count(51, 25) == 3
+
+
+def test_empty_filter_and_empty_roster(game):
+    assert game.summary_page(0, 25, sort_by="AVG", query="nobody") == ([], 0)
+    assert GameState().summary_page(2, 25, sort_by="HR") == ([], 0)
+    assert page_count(0, 25) == 1
+
+
+def test_unknown_sort_column(game):
+    with pytest.raises(ValueError):
+        game.summary_page(0, 25, sort_by="Height")